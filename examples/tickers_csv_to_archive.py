@@ -0,0 +1,23 @@
+import ztom
+import sys
+
+"""
+Converts the tickers csv file (for example saved by tickers_to_csv.py) to the binary tick archive, which could be used
+for offline mode instead of csv file:
+
+    exchange.set_offline_mode("markets.json", "tickers.tka")
+
+Usage:
+    python tickers_csv_to_archive.py tickers.csv [tickers.tka]
+"""
+
+csv_file = sys.argv[1] if len(sys.argv) > 1 else "tickers.csv"
+archive_file = sys.argv[2] if len(sys.argv) > 2 else None
+
+print("Converting {}...".format(csv_file))
+archive_file = ztom.convert_tickers_csv(csv_file, archive_file)
+
+archive = ztom.TickArchive(archive_file)
+print("... done: {} fetches, {} tickers, {} symbols saved to {}".format(len(archive), len(archive.records),
+                                                                       len(archive.symbols), archive_file))
+archive.close()
@@ -40,7 +40,7 @@ if append_tickers:
 
 
 ex = ztom.ccxtExchangeWrapper.load_from_id(exchange_id)  # type: ztom.ccxtExchangeWrapper
-ex.enable_requests_throttle()
+ex.enable_requests_throttle(wait=True)  # requests will wait for the throttle's budget
 ex.load_markets()
 
 markets_to_save = dict()
@@ -59,12 +59,10 @@ print("Init exchange")
 for i in range(0, number_of_fetches):
 
     if i > 0:
-        sleep_time = ex.requests_throttle.sleep_time()
-
         print("Request in current period {}/{} sleeping for {} ".format(
             ex.requests_throttle.total_requests_current_period,
             ex.requests_throttle.requests_per_period,
-            sleep_time))
+            ex.requests_throttle.sleep_time()))
 
     print("Fetching tickers {}/{}...".format(i + 1, number_of_fetches))
     tickers = ex.fetch_tickers()  # type: dict
@@ -4,4 +4,14 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import ztom
\ No newline at end of file
+import ztom
+
+
+def offline_exchange(exchange_id: str = "binance"):
+    """
+    returns the exchange wrapper in offline mode with the markets loaded from the test data
+    """
+    ex = ztom.ccxtExchangeWrapper.load_from_id(exchange_id)
+    ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+    ex.load_markets()
+    return ex
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+from .context import ztom
+from unittest.mock import MagicMock
+import asyncio
+import ccxt
+import time
+import unittest
+
+
+class FakeCcxt(object):
+    """
+    ccxt exchange object which returns the canned responses and rate limit headers
+    """
+
+    def __init__(self):
+        self.last_response_headers = dict()
+        self.headers = list()  # headers to be returned by the next requests
+        self.errors = list()  # errors to be raised by the next requests
+
+    def _response(self):
+        self.last_response_headers = self.headers.pop(0) if len(self.headers) > 0 else dict()
+        if len(self.errors) > 0:
+            error = self.errors.pop(0)
+            if error is not None:
+                raise error
+
+    def fetch_bids_asks(self, symbols=None, params=None):
+        self._response()
+        return {"ETH/BTC": {"symbol": "ETH/BTC", "ask": 0.08, "bid": 0.079}}
+
+    def create_order(self, symbol, order_type, side, amount, price=None, params=None):
+        self._response()
+        return {"id": "1", "status": "open", "amount": amount, "price": price, "filled": 0.0,
+                "timestamp": int(time.time() * 1000), "info": {"cummulativeQuoteQty": "0"}}
+
+
+class FakeAsyncCcxt(object):
+    """
+    async ccxt exchange object which receives the responses of concurrent requests like ccxt does: the headers are passed
+    to on_rest_response and saved to last_response_headers, then the response is returned after the await
+    """
+
+    def __init__(self):
+        self.last_response_headers = dict()
+
+    def on_rest_response(self, code, reason, url, method, headers, body, *args):
+        return body
+
+    async def fetch_balance(self, headers):
+        self.on_rest_response(200, "OK", "url", "GET", headers, "")
+        self.last_response_headers = headers
+        await asyncio.sleep(0)  # the response of the concurrent request is received here
+        return headers
+
+
+class AdaptiveThrottleTestSuite(unittest.TestCase):
+
+    def _exchange(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.markets = ex.load_markets_from_json_file("test_data/markets.json")
+        ex._ccxt = FakeCcxt()
+        return ex
+
+    def test_used_weight_from_headers(self):
+        ex = self._exchange()
+        ex.enable_adaptive_throttle()
+
+        self.assertTrue(ex.adaptive_throttle)
+        self.assertIsInstance(ex.requests_throttle, ztom.CompositeThrottle)
+
+        # other clients have used 500 of weight
+        ex._ccxt.headers.append({"X-MBX-USED-WEIGHT-1M": "502"})
+        ex.fetch_tickers()
+        self.assertEqual(502, ex.requests_throttle.total_requests_current_period)
+
+        # exchange counts less than we do
+        ex._ccxt.headers.append({"x-mbx-used-weight-1m": "503", "x-mbx-order-count-10s": "1",
+                                 "x-mbx-order-count-1d": "10"})
+        ex.place_limit_order(ztom.TradeOrder.create_limit_order_from_start_amount("ETH/BTC", "ETH", 1, "BTC", 0.08))
+
+        self.assertEqual(503, ex.requests_throttle.total_requests_current_period)
+        self.assertEqual(1, ex.requests_throttle.buckets["orders_10s"].total_requests_current_period)
+        self.assertEqual(10, ex.requests_throttle.buckets["orders_day"].total_requests_current_period)
+
+        ex._ccxt.headers.append({"x-mbx-used-weight-1m": "1"})
+        ex.fetch_tickers()
+        self.assertEqual(1, ex.requests_throttle.total_requests_current_period)
+        self.assertEqual(0, ex.requests_throttle.sleep_time())
+
+        # reported weight exceeds the limit
+        ex._ccxt.headers.append({"x-mbx-used-weight-1m": "1200"})
+        ex.fetch_tickers()
+        self.assertGreater(ex.requests_throttle.sleep_time(), 50)
+
+    def test_headers_ignored_if_not_adaptive(self):
+        ex = self._exchange()
+        ex.enable_requests_limits()
+
+        ex._ccxt.headers.append({"x-mbx-used-weight-1m": "502"})
+        ex.fetch_tickers()
+        self.assertEqual(2, ex.requests_throttle.total_requests_current_period)
+
+    def test_backoff_on_rate_limit_errors(self):
+        ex = self._exchange()
+        ex.enable_adaptive_throttle()
+
+        ex._ccxt.errors = [ccxt.RateLimitExceeded("429"), ccxt.DDoSProtection("418")]
+
+        with self.assertRaises(ccxt.RateLimitExceeded):
+            ex.fetch_tickers()
+
+        self.assertEqual(1, ex.rate_limit_errors)
+        self.assertAlmostEqual(ex.RATE_LIMIT_BACKOFF_SECONDS, ex.requests_throttle.sleep_time(), 1)
+
+        with self.assertRaises(ccxt.DDoSProtection):
+            ex.fetch_tickers()
+
+        self.assertEqual(2, ex.rate_limit_errors)
+        self.assertAlmostEqual(ex.RATE_LIMIT_BACKOFF_SECONDS * 2, ex.requests_throttle.sleep_time(), 1)
+
+        # Retry-After header
+        ex._ccxt.errors = [ccxt.RateLimitExceeded("429")]
+        ex._ccxt.headers = [{"Retry-After": "30"}]
+
+        with self.assertRaises(ccxt.RateLimitExceeded):
+            ex.fetch_tickers()
+
+        self.assertAlmostEqual(30, ex.requests_throttle.sleep_time(), 1)
+
+        # successful request resets the errors counter
+        ex.requests_throttle.backoff_until = 0
+        ex.fetch_tickers()
+        self.assertEqual(0, ex.rate_limit_errors)
+        self.assertEqual(0, ex.requests_throttle.sleep_time())
+
+    def test_concurrent_requests_headers(self):
+        ex = self._exchange()
+        ex.enable_adaptive_throttle()
+        ex._on_rate_limit_headers = MagicMock()
+        exchange = FakeAsyncCcxt()
+
+        async def request(weight):
+            with ex._rate_limit_feedback(exchange):
+                return await exchange.fetch_balance({"x-mbx-used-weight-1m": weight})
+
+        async def requests():
+            return await asyncio.gather(request("10"), request("20"))
+
+        ztom.utils.event_loop().run_until_complete(requests())
+
+        self.assertEqual({"x-mbx-used-weight-1m": "20"}, exchange.last_response_headers)
+        self.assertListEqual([{"x-mbx-used-weight-1m": "10"}, {"x-mbx-used-weight-1m": "20"}],
+                             [c[0][0] for c in ex._on_rate_limit_headers.call_args_list])
+
+    def test_window_throttle_used_requests(self):
+        throttle = ztom.WindowThrottle(10, 100)
+        throttle.add_request(1, requests=3)
+        throttle.add_request(2, requests=2)
+
+        throttle.set_used_requests(10, 3)
+        self.assertEqual(10, throttle.total_requests_current_period)
+        self.assertEqual(3, len(throttle))
+
+        # the oldest requests are removed
+        throttle.set_used_requests(6, 4)
+        self.assertEqual(6, throttle.total_requests_current_period)
+        self.assertListEqual([{"timestamp": 2, "request_type": "single", "added": 2},
+                              {"timestamp": 3, "request_type": "correction", "added": 0}],
+                             throttle.requests_current_period)
+
+        throttle.set_used_requests(0, 5)
+        self.assertEqual(0, throttle.total_requests_current_period)
+        self.assertEqual(0, len(throttle))
+
+        throttle.backoff(5, 10)
+        self.assertEqual(3, throttle.sleep_time(12))
+        self.assertEqual(0, throttle.sleep_time(15))
+
+
+if __name__ == '__main__':
+    unittest.main()
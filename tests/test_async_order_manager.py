@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from .context import ztom as zt
+import asyncio
+import time
+import uuid
+import unittest
+
+
+class FakeAsyncExchange(zt.ccxtExchangeWrapper):
+    """
+    online wrapper with the async requests which take REQUEST_TIME seconds. Orders are filled on the first update.
+    """
+    REQUEST_TIME = 0.1
+
+    def __init__(self):
+        super().__init__("binance")
+        self.requests = list()
+
+    async def _create_order_async(self, symbol, order_type, side, amount, price=None):
+        self.requests.append("create_order")
+        await asyncio.sleep(self.REQUEST_TIME)
+        return {"id": str(uuid.uuid4()), "status": "open", "amount": amount, "price": price, "filled": 0.0,
+                "cost": 0.0, "timestamp": int(time.time() * 1000)}
+
+    async def _fetch_order_async(self, order):
+        self.requests.append("fetch_order")
+        await asyncio.sleep(self.REQUEST_TIME)
+        return {"id": order.id, "status": "closed", "amount": order.amount, "price": order.price,
+                "filled": order.amount, "cost": order.amount * order.price}
+
+
+class AsyncOrderManagerTestSuite(unittest.TestCase):
+
+    def test_same_results_as_sync_manager(self):
+        results = list()
+
+        for om_class in (zt.ActionOrderManager, zt.AsyncActionOrderManager):
+            ex = zt.ccxtExchangeWrapper.load_from_id("binance")
+            ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+            tickers = ex.fetch_tickers()
+
+            order1 = zt.ActionOrder.create_from_start_amount(symbol="BTC/USDT", start_currency="BTC",
+                                                             amount_start=1, dest_currency="USDT",
+                                                             price=tickers["BTC/USDT"]["ask"])
+            order2 = zt.FokOrder.create_from_start_amount("USD/RUB", "USD", 1, "RUB", 70, max_order_updates=3)
+            order3 = zt.ActionOrder.create_from_start_amount("ABC/XYZ", "ABC", 1, "XYZ", 0.1)
+
+            om = om_class(ex)
+            om.add_order(order1)
+            om.add_order(order2)
+            om.add_order(order3)
+
+            states = list()
+            i = 0
+            while len(om.get_open_orders()) > 0:
+                om.proceed_orders()
+                if i == 5:
+                    order1.force_close()
+
+                states.append([(o.status, o.order_command, o.filled, o.filled_dest_amount) for o in om.orders])
+                i += 1
+
+            results.append(states)
+
+            self.assertIn("#force_close", order1.tags)
+            self.assertAlmostEqual(0.5, order1.filled, delta=0.0001)
+            self.assertAlmostEqual(1, order3.filled, delta=0.0001)
+
+        self.assertListEqual(results[0], results[1])
+
+    def test_concurrent_requests(self):
+        ex = FakeAsyncExchange()
+        ex.markets = ex.load_markets_from_json_file("test_data/markets.json")
+
+        om = zt.AsyncActionOrderManager(ex)
+        om.request_trades = False
+
+        orders = [zt.ActionOrder.create_from_start_amount("ETH/BTC", "ETH", 1, "BTC", 0.08) for _ in range(10)]
+        for o in orders:
+            om.add_order(o)
+
+        async def proceed():
+            started = time.time()
+            await om.proceed_orders_async()
+            created = time.time()
+            await om.proceed_orders_async()
+            return created - started, time.time() - created
+
+        create_time, update_time = asyncio.run(proceed())
+
+        # 10 orders requests are made concurrently
+        self.assertLess(create_time, FakeAsyncExchange.REQUEST_TIME * 5)
+        self.assertLess(update_time, FakeAsyncExchange.REQUEST_TIME * 5)
+
+        self.assertEqual(10, ex.requests.count("create_order"))
+        self.assertEqual(10, ex.requests.count("fetch_order"))
+        self.assertFalse(om.have_open_orders())
+
+        for o in orders:
+            self.assertEqual("closed", o.status)
+            self.assertEqual(1, o.filled)
+            self.assertAlmostEqual(0.08, o.filled_dest_amount, 8)
+
+    def test_throttle_spreads_requests(self):
+        ex = FakeAsyncExchange()
+        ex.markets = ex.load_markets_from_json_file("test_data/markets.json")
+        ex.enable_requests_throttle(1, 20)  # 0.05s for request
+
+        om = zt.AsyncActionOrderManager(ex)
+        om.request_trades = False
+
+        for _ in range(5):
+            om.add_order(zt.ActionOrder.create_from_start_amount("ETH/BTC", "ETH", 1, "BTC", 0.08))
+
+        started = time.time()
+        asyncio.run(om.proceed_orders_async())
+
+        self.assertEqual(5, len(ex.requests_throttle.requests_current_period))
+        self.assertGreaterEqual(time.time() - started, 4 * 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
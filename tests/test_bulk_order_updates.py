@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+from .context import ztom, offline_exchange
+from unittest.mock import MagicMock, call
+import ccxt
+import collections
+import unittest
+
+
+class BulkOrderUpdatesTestSuite(unittest.TestCase):
+
+    def test_offline_open_orders(self):
+        ex = offline_exchange()
+
+        orders = [ztom.TradeOrder.create_limit_order_from_start_amount(symbol, "BTC", 1, symbol.split("/")[0], 0.08)
+                  for symbol in ("ETH/BTC", "ETH/BTC", "TRX/BTC")]
+
+        for o in orders:
+            ex.add_offline_order_data(o, 3)
+
+        # not placed orders are not open
+        self.assertListEqual([], ex.fetch_open_orders())
+
+        for o in orders:
+            o.update_order_from_exchange_resp(ex.place_limit_order(o))
+
+        open_orders = ex.fetch_open_orders("ETH/BTC")
+        self.assertListEqual([orders[0].id, orders[1].id], [o["id"] for o in open_orders])
+        self.assertEqual("open", open_orders[0]["status"])
+
+        ex.get_order_update = MagicMock(wraps=ex.get_order_update)
+        ex.fetch_open_orders = MagicMock(wraps=ex.fetch_open_orders)
+
+        # second update is still open. For binance the open orders are fetched by symbols
+        updates = ex.get_open_orders_updates(orders)
+        self.assertListEqual([call("ETH/BTC"), call("TRX/BTC")],
+                             ex.fetch_open_orders.call_args_list)
+        ex.get_order_update.assert_not_called()
+        self.assertEqual("open", updates[orders[2].id]["status"])
+        for o in orders:
+            o.update_order_from_exchange_resp(updates[o.id])
+
+        # third update closes orders: they are not in open orders and fetched individually
+        updates = ex.get_open_orders_updates(orders[:2])
+        ex.fetch_open_orders.assert_called_with("ETH/BTC")
+        self.assertEqual(2, ex.get_order_update.call_count)
+        self.assertListEqual(["closed", "closed"], [updates[o.id]["status"] for o in orders[:2]])
+        self.assertEqual(orders[0].amount, updates[orders[0].id]["filled"])
+
+    def test_partial_updates(self):
+        ex = offline_exchange()
+
+        orders = [ztom.TradeOrder.create_limit_order_from_start_amount(symbol, "BTC", 1, symbol.split("/")[0], 0.08)
+                  for symbol in ("ETH/BTC", "ETH/BTC", "TRX/BTC")]
+
+        for o in orders:
+            ex.add_offline_order_data(o, 1)
+            o.update_order_from_exchange_resp(ex.place_limit_order(o))
+
+        get_order_update = ex.get_order_update
+
+        def failing_update(order, priority=None):
+            if order.id == orders[0].id:
+                raise ccxt.NetworkError("update failed")
+            return get_order_update(order, priority)
+
+        ex.get_order_update = MagicMock(side_effect=failing_update)
+
+        # all orders are closed: failed update is not in the results
+        updates = ex.get_open_orders_updates(orders)
+        self.assertListEqual([orders[1].id, orders[2].id], list(updates))
+        self.assertEqual("closed", updates[orders[1].id]["status"])
+
+        # closed orders are left to the caller
+        self.assertDictEqual({}, ex.get_open_orders_updates([orders[0]], update_closed=False))
+
+    def test_order_manager_partial_bulk_updates(self):
+        ex = offline_exchange()
+        om = ztom.ActionOrderManager(ex)
+        om.bulk_order_updates = True
+        om.offline_order_updates = 3
+        om.retry_policy = ztom.RetryPolicy(max_attempts=3, base_delay=0, jitter=0)
+
+        orders = [ztom.ActionOrder.create_from_start_amount(symbol, "BTC", 1, symbol.split("/")[0], 0.08)
+                  for symbol in ("ETH/BTC", "TRX/BTC")]
+        for o in orders:
+            om.add_order(o)
+
+        om.proceed_orders()  # created
+
+        fetch_open_orders = ex.fetch_open_orders
+        get_order_update = ex.get_order_update
+        fails = collections.Counter()
+
+        def failing_fetch_open_orders(symbol=None, priority=None):
+            if symbol == "TRX/BTC" and fails["fetch"] < 1:
+                fails["fetch"] += 1
+                raise ccxt.NetworkError("fetch open orders failed")
+            return fetch_open_orders(symbol, priority)
+
+        def failing_update(order, priority=None):
+            if fails["update"] < 1:
+                fails["update"] += 1
+                raise ccxt.NetworkError("update failed")
+            return get_order_update(order, priority)
+
+        ex.fetch_open_orders = MagicMock(side_effect=failing_fetch_open_orders)
+        ex.get_order_update = MagicMock(side_effect=failing_update)
+
+        # ETH/BTC order is updated from the bulk result, TRX/BTC order - by its own request with the retry
+        om.proceed_orders()
+        self.assertEqual(2, ex.fetch_open_orders.call_count)
+        self.assertEqual(2, ex.get_order_update.call_count)
+        self.assertListEqual([o.amount / 3 for o in orders], [o.filled for o in orders])
+
+        # closed orders are fetched individually with the retry policy
+        while om.have_open_orders():
+            om.proceed_orders()
+
+        self.assertListEqual(["closed", "closed"], [o.status for o in orders])
+        self.assertListEqual([o.amount for o in orders], [o.filled for o in orders])
+
+    def test_order_manager_bulk_updates(self):
+        results = dict()
+
+        for bulk in (False, True):
+            ex = offline_exchange()
+            ex.enable_requests_throttle()
+            om = ztom.ActionOrderManager(ex)
+            om.bulk_order_updates = bulk
+            om.offline_order_updates = 5
+
+            orders = [ztom.ActionOrder.create_from_start_amount(symbol, "BTC", 1, symbol.split("/")[0], 0.08)
+                      for symbol in ("ETH/BTC", "TRX/BTC") * 5]
+            for o in orders:
+                om.add_order(o)
+
+            ex.get_order_update = MagicMock(wraps=ex.get_order_update)
+
+            while om.have_open_orders():
+                om.proceed_orders()
+
+            results[bulk] = {"filled": [o.filled for o in orders],
+                             "status": [o.status for o in orders],
+                             "order_updates": ex.get_order_update.call_count}
+
+        self.assertListEqual(results[False]["filled"], results[True]["filled"])
+        self.assertListEqual(["closed"] * 10, results[True]["status"])
+        self.assertEqual(50, results[False]["order_updates"])
+        self.assertEqual(10, results[True]["order_updates"])  # only the final fetch of closed orders
+
+
+if __name__ == '__main__':
+    unittest.main()
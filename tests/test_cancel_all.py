@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+from .context import ztom, offline_exchange
+from unittest.mock import MagicMock
+import ccxt
+import collections
+import threading
+import unittest
+
+
+class CancelAllTestSuite(unittest.TestCase):
+
+    def _manager_with_open_orders(self, ex):
+        om = ztom.ActionOrderManager(ex)
+        om.offline_order_updates = 5
+
+        orders = [ztom.ActionOrder.create_from_start_amount(symbol, "BTC", 1, symbol.split("/")[0], 0.08)
+                  for symbol in ("ETH/BTC", "TRX/BTC") * 5]
+        for o in orders:
+            om.add_order(o)
+
+        om.proceed_orders()  # create
+        om.proceed_orders()  # partially filled
+
+        return om, orders
+
+    def test_cancel_all(self):
+        ex = offline_exchange()
+        om, orders = self._manager_with_open_orders(ex)
+
+        filled = [o.filled for o in orders]
+        self.assertTrue(all(f > 0 for f in filled))
+        self.assertListEqual(["open"] * 10, [o.get_active_order().status for o in orders])
+
+        cancel_order = ex.cancel_order
+        barrier = threading.Barrier(2, timeout=5)
+
+        def concurrent_cancel(order):
+            barrier.wait()  # broken if cancels are sequential
+            return cancel_order(order)
+
+        ex.cancel_order = MagicMock(side_effect=concurrent_cancel)
+        ex.get_orders_trades_results = MagicMock(wraps=ex.get_orders_trades_results)
+
+        closed = om.cancel_all()
+
+        self.assertFalse(barrier.broken)
+        self.assertEqual(10, ex.cancel_order.call_count)
+        ex.get_orders_trades_results.assert_called_once()
+
+        self.assertListEqual(sorted(o.id for o in orders), sorted(o.id for o in closed))
+        self.assertListEqual(closed, om.get_closed_orders())
+        self.assertFalse(om.have_open_orders())
+
+        for o, f in zip(orders, filled):
+            self.assertEqual("closed", o.status)
+            self.assertIn("#force_close", o.tags)
+            self.assertEqual("canceled", o.orders_history[-1].status)
+            self.assertEqual(f, o.filled)
+
+    def test_flatten_via_cancel_all_orders(self):
+        ex = offline_exchange()
+        om, orders = self._manager_with_open_orders(ex)
+
+        # not placed order is closed without requests
+        not_placed = ztom.ActionOrder.create_from_start_amount("ETH/BTC", "BTC", 1, "ETH", 0.08)
+        om.add_order(not_placed)
+
+        ex.cancel_order = MagicMock(wraps=ex.cancel_order)
+        ex.cancel_all_orders = MagicMock(wraps=ex.cancel_all_orders)
+
+        closed = om.flatten()
+
+        self.assertEqual(11, len(closed))
+        ex.cancel_order.assert_not_called()
+        self.assertListEqual(["ETH/BTC", "TRX/BTC"], sorted(c[0][0] for c in ex.cancel_all_orders.call_args_list))
+        self.assertListEqual(["closed"] * 11, [o.status for o in orders + [not_placed]])
+        self.assertEqual(0, not_placed.filled)
+
+    def test_cancel_all_with_deferred_retries(self):
+        ex = offline_exchange()
+        om, orders = self._manager_with_open_orders(ex)
+        om.defer_retries = True
+
+        failures = {"cancel": collections.Counter(), "update": collections.Counter()}
+        cancel_order = ex.cancel_order
+        get_order_update = ex.get_order_update
+
+        def failing(request, name, times):
+            def call(order):
+                failures[name][order.id] += 1
+                if failures[name][order.id] <= times:
+                    raise ccxt.NetworkError("{} failed".format(name))
+                return request(order)
+            return call
+
+        # the first requests of cancel_all and the first retries of cancel_order() fail
+        ex.cancel_order = MagicMock(side_effect=failing(cancel_order, "cancel", 2))
+        ex.get_order_update = MagicMock(side_effect=failing(get_order_update, "update", 2))
+
+        closed = om.cancel_all()
+
+        self.assertEqual(10, len(closed))
+        self.assertFalse(om.have_open_orders())
+        self.assertListEqual(["canceled"] * 10, [o.orders_history[-1].status for o in orders])
+        self.assertTrue(om.defer_retries)
+        self.assertDictEqual(dict(), om._deferred_retries)
+
+    def test_orders_trades_results_by_symbol(self):
+        ex = offline_exchange()
+
+        orders = list()
+        for i in range(3):
+            o = ztom.TradeOrder.create_limit_order_from_start_amount("ETH/BTC", "BTC", 1, "ETH", 0.08)
+            o.id = str(i)
+            o.timestamp = 1000 + i
+            o.filled = 2
+            orders.append(o)
+
+        trades = [{"order": str(i), "amount": 1, "price": 0.08, "cost": 0.08, "side": "buy",
+                   "fee": {"currency": "BNB", "cost": 0.001}} for i in (0, 0, 1, 1, 2)]
+
+        ex._fetch_symbol_trades = MagicMock(return_value=trades)
+        ex.offline = False
+        ex.amount_to_precision = lambda symbol, amount: amount
+        ex.price_to_precision = lambda symbol, price: price
+
+        results = ex.get_orders_trades_results(orders)
+
+        ex._fetch_symbol_trades.assert_called_once_with("ETH/BTC", 1000)
+        self.assertListEqual(["0", "1"], sorted(results.keys()))  # order "2" trades do not match it's filled amount
+        self.assertEqual(2, results["0"]["filled"])
+        self.assertEqual(2, len(results["1"]["trades"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
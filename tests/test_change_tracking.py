@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from .context import ztom
+import copy
+import unittest
+
+
+class ChangeTrackingTestSuite(unittest.TestCase):
+
+    def test_trade_order_changes(self):
+        order = ztom.TradeOrder("limit", "ETH/BTC", 1, "sell", 0.08)
+        v = order.version
+
+        self.assertGreater(v, 0)
+        self.assertTrue(order.is_dirty())
+        order.clear_dirty()
+        self.assertEqual(0, order.dirty)
+
+        order.update_order_from_exchange_resp({"id": "123", "status": "open", "filled": 0.5, "cost": 0.04})
+
+        self.assertGreater(order.version, v)
+        changes = order.changes_since(v)
+        self.assertDictEqual({"id": "123", "status": "open", "filled": 0.5, "cost": 0.04},
+                             {key: changes[key] for key in ("id", "status", "filled", "cost")})
+        self.assertTrue(order.is_dirty("filled"))
+        self.assertFalse(order.is_dirty("amount"))
+        self.assertIn("status", order.dirty_fields())
+
+        v = order.version
+        order.clear_dirty()
+
+        # same values - no changes
+        order.update_order_from_exchange_resp({"id": "123", "status": "open", "filled": 0.5, "cost": 0.04})
+        self.assertEqual(v, order.version)
+        self.assertDictEqual(dict(), order.changes_since(v))
+        self.assertDictEqual(dict(), order.changes_since_clear())
+
+        order.status = "closed"
+        self.assertListEqual(["status"], order.changed_fields_since(v))
+        self.assertEqual(order.version, order.version_of("status", "filled"))
+
+        # tracking data is not in report and not shared between copies
+        self.assertNotIn("_version", order.report())
+        self.assertNotIn("_field_versions", order.report())
+        order_copy = copy.copy(order)
+        order_copy.filled = 1
+        self.assertListEqual(["status"], order.changed_fields_since(v))
+        self.assertListEqual(["status", "filled"], order_copy.changed_fields_since(v))
+
+    def test_untracked_fields(self):
+        order = ztom.ActionOrder("ETH/BTC", 1, 0.08, "buy")
+        v = order.version
+
+        order.set_clock(ztom.VirtualClock())
+        order.set_command_listener(lambda o: None)
+        self.assertEqual(v, order.version)
+        self.assertTrue(order.UNTRACKED_FIELDS.isdisjoint(order.report()))
+
+        with self.assertRaises(TypeError):
+            type("BadOrder", (ztom.TradeOrder,), {"UNTRACKED_FIELDS": frozenset({"status"})})
+
+    def test_action_order_changes(self):
+        ao = ztom.ActionOrder.create_from_start_amount("ADA/ETH", "ADA", 1000, "ETH", 0.32485131)
+        v = ao.version
+
+        ao.update_from_exchange({"status": "open", "filled": 10, "cost": 0})
+        changes = ao.changes_since(v)
+        self.assertEqual(10, changes["filled"])
+        self.assertEqual(10, changes["filled_start_amount"])
+        self.assertNotIn("status", changes)
+
+        v = ao.version
+        ao.update_from_exchange({"status": "open", "filled": 10, "cost": 0})
+        self.assertFalse(ao.changed_from_last_update)
+        self.assertDictEqual(dict(), ao.changes_since(v))
+
+    def test_order_manager_changed_orders(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+
+        om = ztom.ActionOrderManager(ex)
+        om.offline_order_zero_fill_updates = 2
+
+        order = ztom.ActionOrder.create_from_start_amount("ETH/BTC", "ETH", 1, "BTC", 0.08)
+        om.add_order(order)
+
+        om.proceed_orders()  # created
+        self.assertListEqual([order], om.get_changed_orders())
+
+        om.proceed_orders()  # zero fill update
+        self.assertListEqual([], om.get_changed_orders())
+
+        while om.have_open_orders():
+            om.proceed_orders()
+
+        self.assertListEqual([order], om.get_changed_orders())
+        self.assertEqual("closed", order.status)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+from .context import ztom
+from unittest.mock import MagicMock, patch
+import ccxt
+import unittest
+
+
+class VirtualClockTestSuite(unittest.TestCase):
+
+    def tearDown(self):
+        ztom.set_clock(None)
+
+    def _backtest(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ex.load_markets()
+        ex.fetch_tickers()
+
+        om = ztom.ActionOrderManager(ex)
+        om.offline_order_updates = 5
+        order = ztom.ActionOrder("ETH/BTC", 1, 0.08, "buy")
+        om.add_order(order)
+
+        while om.have_open_orders():
+            om.proceed_orders()
+
+        return ex, order
+
+    def test_virtual_clock(self):
+        clock = ztom.VirtualClock(100)
+
+        self.assertEqual(100, clock.time())
+        self.assertEqual(110, clock.advance(10))
+        self.assertEqual(110, clock.set_time(50))  # time does not go back
+        self.assertEqual(120, clock.set_time(120))
+
+        with patch("time.sleep") as sleep:
+            clock.sleep(3600)
+            sleep.assert_not_called()
+        self.assertEqual(3720, clock.time())
+        self.assertEqual(3720, clock.now().timestamp())
+
+        previous = ztom.set_clock(clock)
+        self.assertFalse(previous.virtual)
+        self.assertIs(clock, ztom.get_clock())
+
+        timer = ztom.Timer()
+        clock.advance(1.5)
+        timer.notch("step")
+        self.assertDictEqual({"step": 1.5}, dict(timer.results_dict()))
+
+    def test_throttle_acquire(self):
+        clock = ztom.VirtualClock()
+        throttle = ztom.WindowThrottle(period=1, requests_per_period=2)
+        throttle.clock = clock
+        throttle._condition.wait = MagicMock(wraps=throttle._condition.wait)
+
+        for _ in range(5):
+            self.assertTrue(throttle.acquire("single"))
+
+        throttle._condition.wait.assert_not_called()  # only the virtual time is waited
+        self.assertEqual(2.0, clock.time())
+        self.assertListEqual([2.0], [r["timestamp"] for r in throttle.requests_current_period])
+
+        self.assertTrue(throttle.acquire("single"))
+        self.assertFalse(throttle.acquire("single", timeout=0.5))
+        self.assertEqual(2.5, clock.time())
+
+    def test_offline_exchange_timestamps(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        clock = ztom.VirtualClock()
+        ex.set_clock(clock)
+        ex.enable_requests_throttle(1, 2, wait=True)
+        self.assertIs(clock, ex.requests_throttle.clock)
+
+        tickers = ex.fetch_tickers()
+        timestamp = max(t["timestamp"] for t in tickers.values()) / 1000
+        self.assertEqual(timestamp, clock.time())
+
+        ex.load_markets()
+        ex.offline_use_last_tickers = True
+        for _ in ex._offline_tickers:
+            ex.fetch_tickers()
+        self.assertGreater(clock.time(), timestamp)
+
+        # throttle waits advance the clock
+        order = ztom.TradeOrder("limit", "ETH/BTC", 1.0, "buy", 0.08)
+        ex.add_offline_order_data(order, 2)
+        now = clock.time()
+        ex.requests_throttle.add_request(requests=2)
+        resp = ex.place_limit_order(order)
+
+        self.assertEqual(now, resp["timestamp_open"]["request_placed"])
+        self.assertEqual(now + 1, resp["timestamp_open"]["request_received"])
+        self.assertEqual(int(now * 1000), resp["timestamp"])  # offline order data were created at now
+
+    def test_deterministic_backtest(self):
+        results = list()
+        for _ in range(2):
+            ztom.set_clock(ztom.VirtualClock())
+            ex, order = self._backtest()
+            results.append((order.timestamp, order.timestamp_close,
+                            [o.timestamp_open for o in order.orders_history]))
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(1527000539.98, results[0][0])
+
+    def test_wrapper_clock(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ex.load_markets()
+        clock = ztom.VirtualClock(1000)
+        ex.set_clock(clock)
+
+        scheduler = ztom.OrderPollScheduler(min_interval=1, max_interval=1)
+        om = ztom.ActionOrderManager(ex, poll_scheduler=scheduler)
+        om.offline_order_updates = 5
+
+        order = ztom.ActionOrder("ETH/BTC", 1, 0.08, "buy")
+        om.add_order(order)
+        self.assertEqual(1000, order.timestamp)
+
+        ex.set_market_data_transport(ztom.SimulatedMarketDataTransport())
+        for time_func in (scheduler.time_func, om.data_providers.time_func, ex.market_data_stream.cache.time_func):
+            self.assertEqual(1000, time_func())
+
+        while om.have_open_orders():
+            clock.advance(1)
+            om.proceed_orders()
+
+        self.assertEqual(clock.time(), order.timestamp_close)
+        self.assertGreater(order.timestamp_close, 1000)
+
+        # explicitly set time function is not replaced
+        scheduler = ztom.OrderPollScheduler(time_func=lambda: 5)
+        ztom.ActionOrderManager(ex, poll_scheduler=scheduler)
+        self.assertEqual(5, scheduler.time_func())
+
+    def test_retry_delay(self):
+        clock = ztom.VirtualClock()
+        ztom.set_clock(clock)
+
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ex.load_markets()
+        ex.fetch_tickers()
+        now = clock.time()
+
+        om = ztom.ActionOrderManager(ex, retry_policy=ztom.RetryPolicy.fixed(3, 60))
+        om.offline_order_updates = 5
+        order = ztom.ActionOrder("ETH/BTC", 1, 0.08, "buy")
+        om.add_order(order)
+
+        place_limit_order = ex.place_limit_order
+
+        def flaky_place_limit_order(o):
+            if ex.place_limit_order.call_count == 1:
+                raise ccxt.NetworkError("timeout")
+            return place_limit_order(o)
+
+        ex.place_limit_order = MagicMock(side_effect=flaky_place_limit_order)
+
+        with patch("time.sleep") as sleep:
+            om.proceed_orders()
+            sleep.assert_not_called()
+
+        self.assertEqual(now + 60, clock.time())
+        self.assertEqual(2, ex.place_limit_order.call_count)
+        self.assertEqual("open", order.get_active_order().status)
+
+    def test_bot_trade_results_retry_delay(self):
+        bot = ztom.Bot("_config_default.json", "_log_default.log")
+        bot.exchange = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        clock = ztom.VirtualClock()
+        bot.exchange.set_clock(clock)
+        bot.max_trades_updates = 3
+        bot.request_sleep = 30
+
+        bot.exchange.get_trades_results = MagicMock(side_effect=[ccxt.NetworkError("timeout"), [{"amount": 1}]])
+
+        with patch("time.sleep") as sleep:
+            results = bot.get_trade_results(ztom.TradeOrder("limit", "ETH/BTC", 1.0, "buy", 0.08))
+            sleep.assert_not_called()
+
+        self.assertListEqual([{"amount": 1}], results)
+        self.assertEqual(30, clock.time())
+
+
+if __name__ == '__main__':
+    unittest.main()
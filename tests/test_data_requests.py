@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+from .context import ztom
+from ztom import data_requests
+import unittest
+
+
+class DataRequestsTestSuite(unittest.TestCase):
+
+    def test_compile_command(self):
+        command = data_requests.compile_command("hold tickers ETH/BTC ask; ma 5 ;")
+
+        self.assertEqual("hold", command.action)
+        self.assertListEqual(["tickers ETH/BTC ask", "ma 5"], command.data_requests)
+        self.assertEqual("tickers", command.requests[0].key)
+        self.assertEqual(("ETH/BTC", "ask"), command.requests[0].params)
+        self.assertEqual("ETH/BTC ask", command.requests[0].params_str)
+
+        # cached by command string
+        self.assertIs(command, data_requests.compile_command("hold tickers ETH/BTC ask; ma 5 ;"))
+        self.assertIs(command.requests[1], data_requests.compile_data_request("ma 5"))
+
+        self.assertIsNone(data_requests.compile_command("cancel").data_requests)
+        self.assertTupleEqual(tuple(), data_requests.compile_command("cancel").requests)
+
+    def test_value_from_path(self):
+        src = {"tickers": {"ETH/BTC": {"ask": 1, "bid": 2}}}
+
+        self.assertEqual(1, data_requests.value_from_path(src, ["tickers", "ETH/BTC", "ask"]))
+        self.assertEqual(2, data_requests.value_from_path(src, ["TICKERS", "eth/btc", "Bid"]))
+        self.assertIs(src["tickers"], data_requests.value_from_path(src, ["tickers"]))
+        self.assertIsNone(data_requests.value_from_path(src, ["tickers", "BTC/USDT"]))
+        self.assertIsNone(data_requests.value_from_path(src, ["tickers", "ETH/BTC", "ask", "x"]))
+
+    def test_registry_cache(self):
+        now = [100.0]
+        calls = list()
+
+        def depth(params):
+            calls.append(params)
+            return {params.split(" ")[0]: {"bids": len(calls)}}
+
+        registry = ztom.DataProviderRegistry(time_func=lambda: now[0])
+        registry.register("depth", depth, cost=5, key_params=1)
+        registry.register("ma", lambda params: {params: 10}, freshness=1.0)
+
+        request = data_requests.compile_data_request("depth ETH/BTC bids")
+
+        # no caching outside the tick for zero freshness
+        self.assertEqual(1, registry.value(request))
+        self.assertEqual(2, registry.value(request))
+
+        registry.start_tick()
+        self.assertEqual(3, registry.value(request))
+        self.assertEqual(3, registry.value(data_requests.compile_data_request("DEPTH ETH/BTC BIDS")))
+        self.assertDictEqual({"bids": 3}, registry.value(data_requests.compile_data_request("depth ETH/BTC")))
+        registry.end_tick()
+
+        self.assertEqual(3, len(calls))
+        self.assertEqual(15, registry.spent_cost)
+        self.assertEqual(2, registry.cache_hits)
+
+        # fresh values are shared between ticks
+        ma = data_requests.compile_data_request("ma 5")
+        self.assertEqual(10, registry.value(ma))
+        now[0] += 0.5
+        self.assertEqual(10, registry.value(ma))
+        self.assertEqual(4, registry.calls)
+
+        now[0] += 1
+        registry.value(ma)
+        self.assertEqual(5, registry.calls)
+
+        with self.assertRaises(KeyError):
+            registry.value(data_requests.compile_data_request("unknown"))
+
+    def test_order_manager_data_provider(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ex.load_markets()
+
+        om = ztom.ActionOrderManager(ex)
+
+        calls = list()
+
+        def ma(params):
+            calls.append(params)
+            return {"ETH/BTC": {"5": 0.08, "10": 0.081}}
+
+        om.register_data_provider("ma", ma, key_params=0)
+
+        orders = [ztom.ActionOrder("ETH/BTC", 1, 0.08, "buy") for _ in range(5)]
+        for i, o in enumerate(orders):
+            om.add_order(o)
+            o.order_command = "new ma ETH/BTC {}".format([5, 10][i % 2])
+
+        om.proceed_orders()
+
+        self.assertEqual(1, len(calls))
+        self.assertListEqual([0.08, 0.081, 0.08, 0.081, 0.08], [o.market_data[0] for o in orders])
+
+        # data_for_orders has the priority over providers
+        for o in orders:
+            o.order_command = "hold MA ETH/BTC 5"
+        om.data_for_orders = {"ma": {"ETH/BTC": {"5": 1}}}
+        om.proceed_orders()
+
+        self.assertEqual(1, len(calls))
+        self.assertListEqual([1] * 5, [o.market_data[0] for o in orders])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -682,6 +682,66 @@ class ExchageWrapperTestSuite(unittest.TestCase):
 
         self.assertDictEqual(ew.REQUEST_TYPE_WIGHTS, ew.requests_throttle.request_weights)
 
+    def test_window_throttle(self):
+        ew = ztom.ccxtExchangeWrapper("binance")
+        ew.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+
+        ew.enable_requests_throttle(10, 100, window="sliding")
+        self.assertIsInstance(ew.requests_throttle, ztom.WindowThrottle)
+        self.assertTrue(ew.requests_throttle.sliding)
+        self.assertDictEqual(ew.REQUEST_TYPE_WIGHTS, ew.requests_throttle.request_weights)
+
+        ew.load_markets()
+        ew.fetch_tickers()
+        self.assertEqual(2, len(ew.requests_throttle.requests_current_period))
+        self.assertEqual(2, ew.requests_throttle.total_requests_current_period)
+
+        ew.enable_requests_throttle(window="fixed")
+        self.assertFalse(ew.requests_throttle.sliding)
+
+        with self.assertRaises(ztom.ExchangeWrapperError):
+            ew.enable_requests_throttle(window="bad")
+
+    def test_requests_limits(self):
+        ew = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ew.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ew.enable_requests_limits()
+
+        self.assertIsInstance(ew.requests_throttle, ztom.CompositeThrottle)
+        self.assertListEqual(["weight", "orders_10s", "orders_day"], list(ew.requests_throttle.buckets.keys()))
+        self.assertEqual(1200, ew.requests_throttle.requests_per_period)
+        self.assertDictEqual(ew.REQUEST_TYPE_WIGHTS, ew.requests_throttle.request_weights)
+
+        ew.load_markets()
+        ew.fetch_tickers()
+        order = ztom.TradeOrder.create_limit_order_from_start_amount("ETH/BTC", "ETH", 1, "BTC", 0.08)
+        ew.add_offline_order_data(order, 1)
+        ew.place_limit_order(order)
+
+        self.assertEqual(40 + 2 + 1, ew.requests_throttle.total_requests_current_period)
+        self.assertEqual(1, ew.requests_throttle.buckets["orders_10s"].total_requests_current_period)
+        self.assertEqual(1, ew.requests_throttle.buckets["orders_day"].total_requests_current_period)
+
+        # generic wrapper without declared limits
+        ew = ztom.ccxtExchangeWrapper("binance")
+        ew.enable_requests_limits()
+        self.assertListEqual(["weight"], list(ew.requests_throttle.buckets.keys()))
+        self.assertEqual(ew.REQUESTS_PER_PERIOD, ew.requests_throttle.requests_per_period)
+
+    def test_throttle_wait(self):
+        ew = ztom.ccxtExchangeWrapper("binance")
+        ew.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ew.enable_requests_throttle(1, 20, wait=True)  # 0.05s for request
+        self.assertTrue(ew.throttle_wait)
+
+        started = time.time()
+        ew.load_markets()
+        ew.fetch_tickers()
+        ew.fetch_tickers()
+
+        self.assertGreaterEqual(time.time() - started, 2 * 0.05 - 0.01)
+        self.assertEqual(3, len(ew.requests_throttle.requests_current_period))
+
     def test_throttle_generic(self):
         ew = ztom.ccxtExchangeWrapper("binance")
         ew.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
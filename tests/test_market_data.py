@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+from .context import ztom
+import asyncio
+import time
+import unittest
+
+
+class MarketDataTestSuite(unittest.TestCase):
+
+    def test_cache(self):
+        now = [100.0]
+        cache = ztom.MarketDataCache(time_func=lambda: now[0])
+
+        self.assertTrue(cache.update({"channel": "tickers", "symbol": "ETH/BTC", "data": {"ask": 1, "bid": 0.9}}))
+        self.assertTrue(cache.update({"channel": "order_book", "symbol": "ETH/BTC",
+                                      "data": {"asks": [[1, 1]], "bids": [[0.9, 1]]}}))
+        self.assertFalse(cache.update({"channel": "trades", "symbol": "ETH/BTC", "data": {}}))
+
+        self.assertDictEqual({"ask": 1, "bid": 0.9}, cache.get_ticker("ETH/BTC", 1))
+        self.assertDictEqual({"ETH/BTC": {"ask": 1, "bid": 0.9}}, cache.get_tickers(1))
+        self.assertListEqual([[1, 1]], cache.get_order_book("ETH/BTC", 1)["asks"])
+        self.assertIsNone(cache.get_ticker("XYZ/BTC", 1))
+
+        now[0] = 101.5
+        self.assertIsNone(cache.get_ticker("ETH/BTC", 1))
+        self.assertIsNone(cache.get_tickers(1))
+        self.assertIsNone(cache.get_order_book("ETH/BTC", 1))
+        self.assertIsNotNone(cache.get_ticker("ETH/BTC", 2))
+
+        # ticker of symbol without changes is taken while the stream is alive
+        cache.update({"channel": "tickers", "symbol": "TRX/BTC", "data": {"ask": 2, "bid": 1.9}})
+        self.assertIsNone(cache.get_ticker("ETH/BTC", 1))
+        self.assertDictEqual({"ask": 1, "bid": 0.9}, cache.get_last_ticker("ETH/BTC", 1))
+        now[0] = 103
+        self.assertIsNone(cache.get_last_ticker("ETH/BTC", 1))
+
+    def test_transport_interface(self):
+        class TickersTransport(ztom.MarketDataTransport):
+            async def receive(self):
+                return None
+
+        # transport without subscribe() fails on creation instead of the first call
+        with self.assertRaises(TypeError):
+            TickersTransport()
+
+        with self.assertRaises(TypeError):
+            ztom.MarketDataTransport()
+
+    def test_simulated_stream(self):
+        tickers = ztom.ccxtExchangeWrapper.load_tickers_from_csv("test_data/tickers.csv")
+        transport = ztom.SimulatedMarketDataTransport(tickers)
+        stream = ztom.MarketDataStream(transport)
+        stream.subscribe("tickers", "ETH/BTC")
+
+        asyncio.run(stream.run())
+
+        self.assertListEqual(["ETH/BTC"], list(stream.cache.tickers.keys()))
+        self.assertDictEqual(tickers[max(tickers.keys())]["ETH/BTC"], stream.cache.tickers["ETH/BTC"])
+        self.assertFalse(stream.running)
+
+    def test_exchange_wrapper_tickers_from_stream(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")  # type: ztom.ccxtExchangeWrapper
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ex.enable_requests_throttle()
+
+        with self.assertRaises(ztom.ExchangeWrapperError):
+            ex.subscribe_tickers()
+
+        # the whole offline tickers are streamed in one go
+        transport = ztom.SimulatedMarketDataTransport({0: ex._offline_tickers[0]})
+        stream = ex.set_market_data_transport(transport, max_age=60)
+        ex.subscribe_tickers()
+
+        deadline = time.time() + 5
+        while stream.cache.get_tickers(60) is None and time.time() < deadline:
+            time.sleep(0.01)
+        ex.stop_market_data()
+
+        tickers = ex.fetch_tickers()
+        self.assertEqual(ex._offline_tickers[0]["ETH/BTC"]["ask"], tickers["ETH/BTC"]["ask"])
+        self.assertEqual(ex._offline_tickers[0]["ETH/BTC"]["ask"], ex.fetch_tickers("ETH/BTC")["ETH/BTC"]["ask"])
+
+        # cached ticker of symbol does not drop the other tickers
+        self.assertSetEqual(set(tickers), set(ex.tickers))
+
+        # offline tickers were not requested and only load_markets request was counted
+        self.assertEqual(0, ex._offline_tickers_current_index)
+        self.assertEqual(1, len(ex.requests_throttle.requests_current_period))
+
+        # stale cache - tickers are fetched
+        ex.market_data_max_age = 0
+        time.sleep(0.01)
+        ex.fetch_tickers()
+        self.assertEqual(1, ex._offline_tickers_current_index)
+
+    def test_exchange_wrapper_order_book_from_stream(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")  # type: ztom.ccxtExchangeWrapper
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        order_books = ex.load_offline_order_books_from_csv("test_data/order_books.csv")
+
+        transport = ztom.SimulatedMarketDataTransport(order_books={"ETH/BTC": order_books["ETH/BTC"][0:1]})
+        stream = ex.set_market_data_transport(transport, max_age=60)
+        ex.subscribe_order_book("ETH/BTC", start=False)
+        asyncio.run(stream.run())
+
+        order_book = ex.fetch_order_book("ETH/BTC")
+        self.assertEqual("ETH/BTC", order_book["symbol"])
+        self.assertListEqual(order_books["ETH/BTC"][0]["asks"], order_book["asks"])
+        self.assertNotIn("ETH/BTC", ex._offline_order_books_current_index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+from .context import ztom, offline_exchange
+import unittest
+
+
+class OfflineMatchingEngineTestSuite(unittest.TestCase):
+
+    def _exchange(self, tickers: list, engine: ztom.OfflineMatchingEngine):
+        ex = offline_exchange()
+        ex._offline_tickers = {i: {"ETH/BTC": dict(zip(("ask", "askVolume", "bid", "bidVolume"), t))}
+                               for i, t in enumerate(tickers)}
+        ex.offline_use_last_tickers = True
+        ex.set_offline_matching_engine(engine)
+        return ex
+
+    def _updates(self, ex, order, n):
+        """
+        moves the market data one step forward and updates the order n times
+        """
+        result = list()
+        for _ in range(n):
+            ex.fetch_tickers()
+            order.update_order_from_exchange_resp(ex.get_order_update(order))
+            result.append((order.status, order.filled))
+        return result
+
+    def test_maker_fills(self):
+        ex = self._exchange([(0.081, 0.4, 0.079, 10), (0.0805, 1, 0.079, 10), (0.080, 0.3, 0.079, 10),
+                             (0.080, 5, 0.079, 10)], ztom.OfflineMatchingEngine())
+        ex.fetch_tickers()
+
+        order = ztom.TradeOrder("limit", "ETH/BTC", 1.0, "buy", 0.08)
+        order.update_order_from_exchange_resp(ex.place_limit_order(order))
+        self.assertEqual("open", order.status)
+        self.assertEqual(0, order.filled)
+
+        # fills are matched against the replayed market data, not moved by the update requests
+        order.update_order_from_exchange_resp(ex.get_order_update(order))
+        order.update_order_from_exchange_resp(ex.get_order_update(order))
+        self.assertEqual(0, order.filled)
+
+        self.assertListEqual([("open", 0), ("open", 0.3), ("closed", 1.0), ("closed", 1.0)],
+                             self._updates(ex, order, 4))
+
+        results = ex.get_trades_results(order)
+        self.assertEqual(2, len(results["trades"]))
+        self.assertEqual(1.0, results["filled"])
+        self.assertAlmostEqual(0.08, results["price"])
+        self.assertListEqual(["maker", "maker"], [t["takerOrMaker"] for t in results["trades"]])
+
+    def test_taker_fill_and_latency(self):
+        tickers = [(0.081, 0.4, 0.079, 10), (0.0805, 2, 0.079, 10), (0.0805, 2, 0.079, 10)]
+
+        ex = self._exchange(tickers, ztom.OfflineMatchingEngine())
+        ex.fetch_tickers()
+        order = ztom.TradeOrder("limit", "ETH/BTC", 1.0, "buy", 0.0812)
+        resp = ex.place_limit_order(order)
+        order.update_order_from_exchange_resp(resp)
+
+        self.assertEqual(0.4, order.filled)
+        self.assertAlmostEqual(0.4 * 0.081, order.cost)
+        self.assertListEqual([("closed", 1.0)], self._updates(ex, order, 1))
+        self.assertAlmostEqual(0.4 * 0.081 + 0.6 * 0.0812, order.cost)
+
+        # the order gets to the book on the next step
+        ex = self._exchange(tickers, ztom.OfflineMatchingEngine(latency_steps=1))
+        ex.fetch_tickers()
+        order = ztom.TradeOrder("limit", "ETH/BTC", 1.0, "buy", 0.0812)
+        order.update_order_from_exchange_resp(ex.place_limit_order(order))
+
+        self.assertEqual(0, order.filled)
+        self.assertListEqual([("closed", 1.0)], self._updates(ex, order, 1))
+        self.assertAlmostEqual(0.0805, order.cost)
+
+    def test_consumed_liquidity(self):
+        # the same crossing level stays in the book: it's volume is matched only once
+        ex = self._exchange([(0.08, 1.0, 0.079, 10)] * 4 + [(0.08, 1.5, 0.079, 10)], ztom.OfflineMatchingEngine())
+        ex.fetch_tickers()
+
+        order = ztom.TradeOrder("limit", "ETH/BTC", 3.0, "buy", 0.08)
+        order.update_order_from_exchange_resp(ex.place_limit_order(order))
+        self.assertEqual(1.0, order.filled)
+
+        self.assertListEqual([("open", 1.0)] * 3 + [("open", 1.5)], self._updates(ex, order, 4))
+
+    def test_queue_position(self):
+        tickers = [(0.09, 1, 0.079, 10), (0.09, 1, 0.079, 8), (0.09, 1, 0.079, 5), (0.09, 1, 0.079, 1)]
+
+        ex = self._exchange(tickers, ztom.OfflineMatchingEngine(queue_position=0.5))
+        ex.fetch_tickers()
+        order = ztom.TradeOrder("limit", "ETH/BTC", 1.0, "buy", 0.079)
+        order.update_order_from_exchange_resp(ex.place_limit_order(order))
+        self.assertListEqual([("open", 0), ("open", 0), ("closed", 1.0)], self._updates(ex, order, 3))
+
+        # last in the queue: the volume ahead is not traded till the end of data, so the order stays open
+        ex = self._exchange(tickers, ztom.OfflineMatchingEngine(queue_position=1))
+        ex.fetch_tickers()
+        order = ztom.TradeOrder("limit", "ETH/BTC", 1.0, "buy", 0.079)
+        order.update_order_from_exchange_resp(ex.place_limit_order(order))
+        self.assertListEqual([("open", 0)] * 5, self._updates(ex, order, 5))
+        self.assertListEqual([order.id], [o["id"] for o in ex.fetch_open_orders("ETH/BTC")])
+
+        order.update_order_from_exchange_resp(ex.cancel_order(order))
+        self.assertEqual("canceled", ex.get_order_update(order)["status"])
+
+    def test_order_manager(self):
+        ex = self._exchange([(0.081, 0.4, 0.079, 10), (0.0805, 1, 0.079, 10), (0.080, 0.3, 0.079, 10),
+                             (0.080, 5, 0.079, 10)], ztom.OfflineMatchingEngine())
+        ex.fetch_tickers()
+
+        om = ztom.ActionOrderManager(ex)
+        order = ztom.ActionOrder("ETH/BTC", 1.0, 0.08, "buy")
+        om.add_order(order)
+        om.proceed_orders()
+
+        filled = [order.filled]
+        while om.have_open_orders():
+            ex.fetch_tickers()
+            om.proceed_orders()
+            filled.append(order.filled)
+
+        self.assertListEqual([0, 0, 0.3, 1.0], filled)
+        self.assertEqual("closed", order.status)
+        self.assertAlmostEqual(0.08, order.filled_price)
+
+    def test_polling_frequency(self):
+        tickers = [(0.081, 0.4, 0.079, 10), (0.0805, 1, 0.079, 10), (0.080, 0.3, 0.079, 10), (0.080, 5, 0.079, 10)]
+        ex = self._exchange(tickers, ztom.OfflineMatchingEngine())
+        ex.fetch_tickers()
+
+        orders = [ztom.TradeOrder("limit", "ETH/BTC", 1.0, "buy", 0.08) for _ in range(2)]
+        for o in orders:
+            o.update_order_from_exchange_resp(ex.place_limit_order(o))
+
+        # first order is polled on every step, second one - only at the end of data
+        self.assertListEqual([("open", 0), ("open", 0.3), ("closed", 1.0)], self._updates(ex, orders[0], 3))
+        orders[1].update_order_from_exchange_resp(ex.get_order_update(orders[1]))
+
+        self.assertEqual(orders[0].filled, orders[1].filled)
+        self.assertEqual(orders[0].cost, orders[1].cost)
+        self.assertEqual("closed", orders[1].status)
+
+    def test_order_events(self):
+        ex = self._exchange([(0.081, 0.4, 0.079, 10), (0.0805, 1, 0.079, 10), (0.080, 0.3, 0.079, 10),
+                             (0.080, 5, 0.079, 10)], ztom.OfflineMatchingEngine())
+        ex.fetch_tickers()
+
+        order = ztom.TradeOrder("limit", "ETH/BTC", 1.0, "buy", 0.08)
+        order.update_order_from_exchange_resp(ex.place_limit_order(order))
+
+        # events are sent only on the changes of the matched order's state
+        events = list()
+        for _ in range(4):
+            events.extend(ex._offline_next_orders_updates(open_only=False))
+            events.extend(ex._offline_next_orders_updates(open_only=False))
+            ex.fetch_tickers()
+
+        self.assertListEqual([("open", 0), ("open", 0.3), ("closed", 1.0)],
+                             [(e["status"], e["filled"]) for e in events])
+        self.assertSetEqual({order.id}, {e["id"] for e in events})
+
+    def test_day_of_ticks(self):
+        steps = 86400
+        ex = self._exchange([(0.09, 1, 0.079, 10)] * (steps - 1) + [(0.08, 10, 0.079, 10)],
+                            ztom.OfflineMatchingEngine(max_steps=steps))
+        ex.fetch_tickers()
+
+        # placing does not precompute the fills
+        order = ztom.TradeOrder("limit", "ETH/BTC", 1.0, "buy", 0.08)
+        order.update_order_from_exchange_resp(ex.place_limit_order(order))
+        data = ex._offline_orders_data[order.internal_id]["_offline_order"]
+        self.assertEqual(1, data["matching"].next_step)
+        self.assertEqual("open", order.status)
+
+        # the order is matched against all the steps replayed since the previous fetch
+        ex._offline_tickers_current_index = steps // 2
+        order.update_order_from_exchange_resp(ex.get_order_update(order))
+        self.assertEqual(steps // 2, data["matching"].next_step)
+        self.assertEqual("open", order.status)
+
+        ex._offline_tickers_current_index = steps
+        order.update_order_from_exchange_resp(ex.get_order_update(order))
+        self.assertEqual(steps, data["matching"].next_step)
+        self.assertEqual("closed", order.status)
+        self.assertEqual(1, len(data["updates"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+from .context import ztom
+from unittest.mock import patch
+import csv
+import numpy as np
+import os
+import tempfile
+import unittest
+
+
+class OrderBooksColumnsTestSuite(unittest.TestCase):
+
+    def test_load(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        order_books = ex.load_offline_order_books_from_csv("test_data/order_books.csv")
+        columns = ex.load_offline_order_books_from_csv("test_data/order_books.csv", columnar=True)
+
+        self.assertIs(columns, ex._offline_order_books)
+        self.assertListEqual(list(order_books.keys()), list(columns.keys()))
+
+        for symbol, books in order_books.items():
+            self.assertIsInstance(columns[symbol], ztom.OrderBooksColumns)
+            self.assertEqual(len(books), len(columns[symbol]))
+
+            for book, columns_book in zip(books, columns[symbol]):
+                self.assertListEqual(book["asks"], columns_book["asks"].tolist())
+                self.assertListEqual(book["bids"], columns_book["bids"].tolist())
+
+        eth_btc = columns["ETH/BTC"]
+        self.assertTrue(np.shares_memory(eth_btc.asks, eth_btc[4]["asks"]))
+        self.assertEqual(0.092306, eth_btc[4]["asks"][0][0])
+        self.assertEqual(0.092306, eth_btc.ask_prices[eth_btc.ask_offsets[4]])
+        self.assertEqual(len(eth_btc) - 1, len(eth_btc[1:]))
+
+        with self.assertRaises(IndexError):
+            eth_btc[len(eth_btc)]
+
+        array_order_book = eth_btc.order_book(4)
+        order_book = ztom.OrderBook("ETH/BTC", order_books["ETH/BTC"][4]["asks"], order_books["ETH/BTC"][4]["bids"])
+        self.assertIsInstance(array_order_book, ztom.ArrayOrderBook)
+        self.assertEqual(order_book.get_depth(1, "buy", "base").total_price,
+                         array_order_book.get_depth(1, "buy", "base").total_price)
+
+    def test_offline_fetch(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets_binance.json", "test_data/tickers_binance.csv")
+        ex.fetch_tickers()
+        ex.load_offline_order_books_from_csv("test_data/order_books.csv", columnar=True)
+
+        order_books = ex.get_order_books_async(["ETH/BTC", "WAVES/ETH", "AMB/ETH"])
+
+        self.assertEqual(10, len(order_books[0]["asks"]))
+        self.assertEqual(False, order_books[0]["from_ticker"])
+        self.assertEqual(0.008239, order_books[1]["bids"][2][0])
+        self.assertEqual(True, order_books[2]["from_ticker"])
+
+        with self.assertRaises(ztom.ExchangeWrapperOfflineFetchError):
+            ex.fetch_order_book("WAVES/ETH")
+
+    def test_offline_fetch_lists(self):
+        order_books = list()
+        for columnar in (False, True):
+            ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+            ex.set_offline_mode("test_data/markets_binance.json", "test_data/tickers_binance.csv")
+            ex.load_offline_order_books_from_csv("test_data/order_books.csv", columnar=columnar)
+            order_books.append([ex.fetch_order_book("ETH/BTC") for _ in range(len(ex._offline_order_books["ETH/BTC"]))])
+
+        # columnar storage gives the same order books as the list loader
+        for book, columns_book in zip(*order_books):
+            self.assertIsInstance(columns_book["asks"], list)
+            self.assertListEqual(book["asks"], columns_book["asks"])
+            self.assertListEqual(book["bids"], columns_book["bids"])
+
+    def test_many_fetches(self):
+        fetches = 20000
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "order_books.csv")
+            with open(file_name, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["fetch", "symbol", "ask", "ask-qty", "bid", "bid-qty"])
+                for i in range(fetches):
+                    for level in range(2):
+                        writer.writerow([i, "ETH/BTC", 0.08 + level / 1000, i, 0.079 - level / 1000, 1])
+
+            ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+            with patch("csv.reader", wraps=csv.reader) as reader:
+                columns = ex.load_offline_order_books_from_csv(file_name, columnar=True)
+                reader.assert_called_once()  # single pass
+
+            self.assertEqual(fetches, len(columns["ETH/BTC"]))
+            self.assertEqual(fetches * 2, len(columns["ETH/BTC"].asks))
+            self.assertListEqual([[0.08, 12345], [0.081, 12345]], columns["ETH/BTC"][12345]["asks"].tolist())
+
+            order_books = ex.load_offline_order_books_from_csv(file_name)
+            self.assertEqual(fetches, len(order_books["ETH/BTC"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
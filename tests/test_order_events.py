@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from .context import ztom, offline_exchange
+from unittest.mock import MagicMock
+import time
+import unittest
+
+
+class OrderEventsTestSuite(unittest.TestCase):
+
+    def test_transport_interface(self):
+        class SubscribeOnlyTransport(ztom.OrderEventsTransport):
+            async def subscribe(self, params: dict = None):
+                pass
+
+        with self.assertRaises(TypeError):
+            SubscribeOnlyTransport()
+
+    def test_simulated_order_events(self):
+        ex = offline_exchange()
+
+        orders = [ztom.TradeOrder.create_limit_order_from_start_amount("ETH/BTC", "BTC", 1, "ETH", 0.08)
+                  for _ in range(2)]
+        for o in orders:
+            ex.add_offline_order_data(o, 3)
+
+        ex.set_order_events_transport(ztom.SimulatedOrderEventsTransport(ex, close_when_idle=True))
+
+        # no events for not placed orders
+        ztom.event_loop().run_until_complete(ex.order_events_stream.run())
+        self.assertListEqual([], ex.pop_order_events())
+
+        orders[0].update_order_from_exchange_resp(ex.place_limit_order(orders[0]))
+
+        ex.set_order_events_transport(ztom.SimulatedOrderEventsTransport(ex, close_when_idle=True))
+        ztom.event_loop().run_until_complete(ex.order_events_stream.run())
+
+        events = ex.pop_order_events()
+        self.assertEqual(3, len(events))
+        self.assertSetEqual({orders[0].id}, {e["id"] for e in events})
+        self.assertListEqual(["open", "open", "closed"], [e["status"] for e in events])
+        self.assertEqual(orders[0].amount, events[-1]["filled"])
+        self.assertListEqual([], ex.pop_order_events())
+
+    def test_order_manager_applies_events(self):
+        ex = offline_exchange()
+        om = ztom.ActionOrderManager(ex)
+        om.offline_order_updates = 5
+        om.enable_order_events(reconcile_interval=1000)
+
+        orders = [ztom.ActionOrder.create_from_start_amount(symbol, "BTC", 1, symbol.split("/")[0], 0.08)
+                  for symbol in ("ETH/BTC", "TRX/BTC")]
+        for o in orders:
+            om.add_order(o)
+
+        om.proceed_orders()  # created
+
+        ex.get_order_update = MagicMock(wraps=ex.get_order_update)
+
+        ex.set_order_events_transport(ztom.SimulatedOrderEventsTransport(ex, close_when_idle=True))
+        ztom.event_loop().run_until_complete(ex.order_events_stream.run())
+
+        om.proceed_orders()
+
+        ex.get_order_update.assert_not_called()
+        self.assertEqual(2, om.order_events_applied)
+        self.assertListEqual(orders, om.get_closed_orders())
+        self.assertListEqual(orders, om.get_changed_orders())
+
+        for o in orders:
+            self.assertEqual("closed", o.status)
+            self.assertAlmostEqual(o.amount, o.filled)
+
+    def test_order_events_in_background(self):
+        ex = offline_exchange()
+        om = ztom.ActionOrderManager(ex)
+        om.offline_order_updates = 5
+        om.enable_order_events(reconcile_interval=1000)
+
+        ex.set_order_events_transport(ztom.SimulatedOrderEventsTransport(ex, interval=0.001))
+        ex.subscribe_order_events()
+
+        order = ztom.ActionOrder.create_from_start_amount("ETH/BTC", "BTC", 1, "ETH", 0.08)
+        om.add_order(order)
+
+        ex.get_order_update = MagicMock(wraps=ex.get_order_update)
+
+        start = time.time()
+        while om.have_open_orders() and time.time() - start < 5:
+            om.proceed_orders()
+            time.sleep(0.001)
+
+        ex.stop_order_events()
+
+        self.assertEqual("closed", order.status)
+        self.assertAlmostEqual(order.amount, order.filled)
+        ex.get_order_update.assert_not_called()
+        self.assertFalse(ex.order_events_stream.running)
+
+    def test_offline_orders_data_lock(self):
+        ex = offline_exchange()
+
+        order = ztom.TradeOrder.create_limit_order_from_start_amount("ETH/BTC", "BTC", 1, "ETH", 0.08)
+        ex.add_offline_order_data(order, 3)
+        order.update_order_from_exchange_resp(ex.place_limit_order(order))
+
+        ex.set_order_events_transport(ztom.SimulatedOrderEventsTransport(ex, close_when_idle=True))
+
+        # the background transport does not consume the updates while the offline orders data is used here
+        with ex._offline_orders_lock:
+            ex.subscribe_order_events()
+            ex.order_events_stream._thread.join(0.05)
+            self.assertTrue(ex.order_events_stream._thread.is_alive())
+            self.assertEqual(0, ex.order_events_stream.received_count)
+
+            ex.get_order_update(order)
+
+        ex.order_events_stream._thread.join(5)
+
+        self.assertListEqual(["open", "closed"], [e["status"] for e in ex.pop_order_events()])
+
+
+if __name__ == '__main__':
+    unittest.main()
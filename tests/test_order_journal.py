@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+from .context import ztom, offline_exchange
+from ztom import order_journal
+import json
+import os
+import tempfile
+import unittest
+
+
+class OrderJournalTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "orders.journal")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _manager(self, ex, journal):
+        om = ztom.ActionOrderManager(ex, journal=journal)
+        om.offline_order_updates = 5
+        return om
+
+    def test_order_state(self):
+        order = ztom.RecoveryOrder("ETH/BTC", "ETH", 1, "BTC", 0.08)
+        order.active_trade_order.update_order_from_exchange_resp({"id": "1", "status": "open", "filled": 0.5,
+                                                                  "info": {"raw": 1}})
+        order.tags.append("#test")
+        order.set_clock(ztom.VirtualClock())
+        order.set_command_listener(lambda o: None)
+
+        # runtime attributes are not journaled
+        state = order_journal.order_state(order)
+        self.assertTrue(ztom.RecoveryOrder.UNTRACKED_FIELDS.isdisjoint(state["state"]))
+        self.assertTrue(ztom.TradeOrder.UNTRACKED_FIELDS.isdisjoint(state["state"]["active_trade_order"]))
+
+        restored = order_journal.order_from_state(state)
+        self.assertIsNone(restored._clock)
+
+        self.assertIsInstance(restored, ztom.RecoveryOrder)
+        self.assertEqual(order, restored)
+        self.assertEqual(order.best_dest_amount, restored.best_dest_amount)
+        self.assertListEqual(["#test"], restored.tags)
+
+        self.assertEqual("1", restored.get_active_order().id)
+        self.assertEqual(0.5, restored.get_active_order().filled)
+        self.assertEqual(order.get_active_order().internal_id, restored.get_active_order().internal_id)
+        self.assertIsNone(restored.get_active_order().info)
+
+        with self.assertRaises(TypeError):
+            order_journal.order_from_state({"class": "ztom.trade_orders.TradeOrder", "state": {}})
+
+    def test_restore_manager(self):
+        reference_ex = offline_exchange()
+        reference_om = self._manager(reference_ex, None)
+
+        ex = offline_exchange()
+        om = self._manager(ex, ztom.OrderJournal(self.path))
+
+        for manager in (reference_om, om):
+            for symbol in ("ETH/BTC", "TRX/BTC") * 2:
+                manager.add_order(ztom.ActionOrder.create_from_start_amount(symbol, "BTC", 1, symbol.split("/")[0],
+                                                                            0.08))
+
+        for _ in range(3):
+            om.proceed_orders()
+
+        ids = [o.id for o in om.orders]
+        filled = [o.filled for o in om.orders]
+        self.assertTrue(all(f > 0 for f in filled))
+
+        # process is "killed" without closing the journal
+        restored_om = self._manager(ex, ztom.OrderJournal(self.path))
+        restored = restored_om.restore_from_journal()
+
+        self.assertListEqual(ids, [o.id for o in restored])
+        for f, o in zip(filled, restored_om.orders):
+            self.assertGreater(o.filled, f)  # reconciled with the exchange
+
+        while restored_om.have_open_orders():
+            restored_om.proceed_orders()
+
+        while reference_om.have_open_orders():
+            reference_om.proceed_orders()
+
+        self.assertListEqual([o.filled for o in reference_om.orders], [o.filled for o in restored_om.orders])
+        self.assertListEqual(["closed"] * 4, [o.status for o in restored_om.orders])
+
+        # closed orders are restored as closed
+        closed_om = self._manager(ex, ztom.OrderJournal(self.path))
+        closed_om.restore_from_journal()
+        self.assertFalse(closed_om.have_open_orders())
+        self.assertEqual(4, len(closed_om.orders))
+
+    def test_snapshot_and_torn_record(self):
+        journal = ztom.OrderJournal(self.path, buffer_size=2, snapshot_every=3)
+        orders = [ztom.ActionOrder("ETH/BTC", 1, 0.08, "buy") for _ in range(3)]
+
+        for o in orders:
+            self.assertTrue(journal.record(o))
+            self.assertFalse(journal.record(o))  # not changed
+
+        self.assertTrue(journal.snapshot_due())
+        journal.snapshot(orders[:2])
+
+        with open(self.path) as f:
+            self.assertEqual(1, len(f.readlines()))
+
+        orders[0].filled = 0.5
+        journal.record(orders[0])
+        journal.flush()
+
+        with open(self.path, "a") as f:
+            f.write('{"t": "order", "order": {"cla')
+
+        states = ztom.OrderJournal.replay(self.path)
+        self.assertListEqual([orders[0].id, orders[1].id], list(states.keys()))
+        self.assertEqual(0.5, states[orders[0].id]["state"]["filled"])
+
+        # records are appended after the torn one is removed
+        journal.close()
+        journal = ztom.OrderJournal(self.path)
+        orders[1].filled = 0.7
+        journal.record(orders[1])
+        journal.close()
+
+        states = ztom.OrderJournal.replay(self.path)
+        self.assertEqual(0.7, states[orders[1].id]["state"]["filled"])
+
+    def test_orders_history_records(self):
+        journal = ztom.OrderJournal(self.path)
+        order = ztom.ActionOrder("ETH/BTC", 1, 0.08, "buy")
+
+        def records():
+            with open(self.path) as f:
+                return [r["order"] for r in map(json.loads, f) if r["t"] == "order"]
+
+        for i in range(3):
+            trade_order = ztom.TradeOrder("limit", "ETH/BTC", 0.1, "buy", 0.08)
+            trade_order.status = "closed"
+            order.orders_history.append(trade_order)
+            order.filled = (i + 1) / 10
+            journal.record(order)
+            journal.flush()
+
+        # every closed trade order is written once
+        ids = [o.internal_id for o in order.orders_history]
+        self.assertListEqual([ids[:1], ids[:2], ids], [r["state"]["orders_history"] for r in records()])
+        self.assertListEqual([ids[:1], ids[1:2], ids[2:]],
+                             [[o["internal_id"] for o in r["closed_orders"]] for r in records()])
+
+        state = ztom.OrderJournal.replay(self.path)[order.id]
+        self.assertListEqual(ids, [o["internal_id"] for o in state["state"]["orders_history"]])
+        self.assertNotIn("closed_orders", state)
+
+        journal.snapshot([order])
+        self.assertListEqual(ztom.OrderJournal.replay(self.path)[order.id]["state"]["orders_history"],
+                             state["state"]["orders_history"])
+
+        # the history is referenced from the snapshot
+        order.filled = 0.5
+        journal.record(order)
+        journal.close()
+        self.assertListEqual([], records()[-1]["closed_orders"])
+
+        restored = ztom.OrderJournal(self.path).load_orders()[0]
+        self.assertEqual(0.5, restored.filled)
+        self.assertListEqual(ids, [o.internal_id for o in restored.orders_history])
+
+    def test_snapshot_keeps_closed_orders(self):
+        journal = ztom.OrderJournal(self.path)
+        orders = [ztom.ActionOrder("ETH/BTC", 1, 0.08, "buy") for _ in range(3)]
+
+        for o in orders:
+            journal.record(o)
+
+        orders[2].status = "closed"
+        journal.record(orders[2])
+
+        # orders closed since the previous snapshot are in the snapshot with the open ones
+        journal.snapshot(orders[:2])
+        states = ztom.OrderJournal.replay(self.path)
+        self.assertListEqual([o.id for o in orders], list(states.keys()))
+        self.assertEqual("closed", states[orders[2].id]["state"]["status"])
+
+        journal.snapshot(orders[:2])
+        self.assertListEqual([o.id for o in orders[:2]], list(ztom.OrderJournal.replay(self.path).keys()))
+
+    def test_not_serializable_state(self):
+        journal = ztom.OrderJournal(self.path)
+        order = ztom.ActionOrder("ETH/BTC", 1, 0.08, "buy")
+        order.tags.append(object())
+
+        with self.assertRaises(ztom.OrderJournalError):
+            journal.record(order)
+
+        with self.assertRaises(ztom.OrderJournalError):
+            journal.snapshot([order])
+
+    def test_malformed_record(self):
+        journal = ztom.OrderJournal(self.path)
+        order = ztom.ActionOrder("ETH/BTC", 1, 0.08, "buy")
+        journal.record(order)
+        journal.close()
+
+        with open(self.path, "a") as f:
+            f.write('{"t": "order", "order": {"cla\n')
+
+        with open(self.path, "a") as f:
+            f.write('{"t": "order", "order": {"cla')
+
+        with self.assertRaises(ztom.OrderJournalError):
+            ztom.OrderJournal.replay(self.path)
+
+    def test_group_fsync(self):
+        now = [0.0]
+        journal = ztom.OrderJournal(self.path, fsync_interval=1.0, time_func=lambda: now[0])
+        order = ztom.ActionOrder("ETH/BTC", 1, 0.08, "buy")
+
+        for i in range(5):
+            order.filled = i / 10
+            journal.record(order)
+            journal.flush()
+            now[0] += 0.3
+
+        self.assertEqual(2, journal.fsync_count)
+        journal.close()
+        self.assertEqual(3, journal.fsync_count)
+        self.assertEqual(0.4, ztom.OrderJournal.replay(self.path)[order.id]["state"]["filled"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+from .context import ztom as zt
+import threading
+import time
+import uuid
+import unittest
+
+
+class FakeBlockingExchange(zt.ccxtExchangeWrapper):
+    """
+    online wrapper with the blocking requests which take REQUEST_TIME seconds. Orders are filled on the first update.
+    """
+    REQUEST_TIME = 0.1
+
+    def __init__(self):
+        super().__init__("binance")
+        self.requests = list()
+        self.concurrent_requests = 0
+        self.max_seen_concurrent_requests = 0
+        self._counter_lock = threading.Lock()
+
+    def _request(self, request_type):
+        with self._counter_lock:
+            self.requests.append(request_type)
+            self.concurrent_requests += 1
+            self.max_seen_concurrent_requests = max(self.max_seen_concurrent_requests, self.concurrent_requests)
+
+        time.sleep(self.REQUEST_TIME)
+
+        with self._counter_lock:
+            self.concurrent_requests -= 1
+
+    def _create_order(self, symbol, order_type, side, amount, price=None):
+        self._request("create_order")
+        return {"id": str(uuid.uuid4()), "status": "open", "amount": amount, "price": price, "filled": 0.0,
+                "cost": 0.0, "timestamp": int(time.time() * 1000)}
+
+    def _fetch_order(self, order):
+        self._request("fetch_order")
+        return {"id": order.id, "status": "closed", "amount": order.amount, "price": order.price,
+                "filled": order.amount, "cost": order.amount * order.price}
+
+
+class OrderManagerExecutorTestSuite(unittest.TestCase):
+
+    def test_bad_max_workers(self):
+        ex = zt.ccxtExchangeWrapper.load_from_id("binance")
+        with self.assertRaises(zt.OwaManagerError):
+            zt.ActionOrderManager(ex, max_workers=0)
+
+    def test_same_results_as_sequential_mode(self):
+        results = list()
+
+        for max_workers in (None, 4):
+            ex = zt.ccxtExchangeWrapper.load_from_id("binance")
+            ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+            tickers = ex.fetch_tickers()
+
+            order1 = zt.ActionOrder.create_from_start_amount(symbol="BTC/USDT", start_currency="BTC",
+                                                             amount_start=1, dest_currency="USDT",
+                                                             price=tickers["BTC/USDT"]["ask"])
+            order2 = zt.FokOrder.create_from_start_amount("USD/RUB", "USD", 1, "RUB", 70, max_order_updates=3)
+            order3 = zt.ActionOrder.create_from_start_amount("ABC/XYZ", "ABC", 1, "XYZ", 0.1)
+
+            om = zt.ActionOrderManager(ex, max_workers=max_workers)
+            om.add_order(order1)
+            om.add_order(order2)
+            om.add_order(order3)
+
+            states = list()
+            i = 0
+            while len(om.get_open_orders()) > 0:
+                om.proceed_orders()
+                if i == 5:
+                    order1.force_close()
+
+                states.append([(o.status, o.order_command, o.filled, o.filled_dest_amount) for o in om.orders])
+                i += 1
+
+            om.shutdown_executor()
+            results.append(states)
+
+            self.assertIn("#force_close", order1.tags)
+            self.assertAlmostEqual(0.5, order1.filled, delta=0.0001)
+            self.assertAlmostEqual(1, order3.filled, delta=0.0001)
+
+        self.assertListEqual(results[0], results[1])
+
+    def test_concurrent_requests(self):
+        ex = FakeBlockingExchange()
+        ex.markets = ex.load_markets_from_json_file("test_data/markets.json")
+
+        om = zt.ActionOrderManager(ex, max_workers=10)
+        om.request_trades = False
+
+        orders = [zt.ActionOrder.create_from_start_amount("ETH/BTC", "ETH", 1, "BTC", 0.08) for _ in range(10)]
+        for o in orders:
+            om.add_order(o)
+
+        started = time.time()
+        om.proceed_orders()
+        om.proceed_orders()
+        om.shutdown_executor()
+
+        # 2 passes of 10 orders requests are made concurrently
+        self.assertLess(time.time() - started, FakeBlockingExchange.REQUEST_TIME * 10)
+
+        self.assertEqual(10, ex.requests.count("create_order"))
+        self.assertEqual(10, ex.requests.count("fetch_order"))
+        self.assertFalse(om.have_open_orders())
+
+        for o in orders:
+            self.assertEqual("closed", o.status)
+            self.assertEqual(1, o.filled)
+
+    def test_exchange_concurrent_requests_limit(self):
+        ex = FakeBlockingExchange()
+        ex.markets = ex.load_markets_from_json_file("test_data/markets.json")
+        ex.enable_requests_throttle(60, 1000)
+        ex.set_max_concurrent_requests(2)
+
+        om = zt.ActionOrderManager(ex, max_workers=8)
+        om.request_trades = False
+
+        for _ in range(8):
+            om.add_order(zt.ActionOrder.create_from_start_amount("ETH/BTC", "ETH", 1, "BTC", 0.08))
+
+        om.proceed_orders()
+        om.shutdown_executor()
+
+        self.assertEqual(2, ex.max_seen_concurrent_requests)
+        self.assertEqual(8, len(ex.requests_throttle.requests_current_period))
+        self.assertEqual(8, ex.requests_throttle.total_requests_current_period)
+
+        with self.assertRaises(zt.ExchangeWrapperError):
+            ex.set_max_concurrent_requests(0)
+
+    def test_throttle_threads(self):
+        throttle = zt.Throttle(60, 100000)
+
+        def add_requests():
+            for _ in range(1000):
+                throttle.add_request(request_type="single")
+
+        threads = [threading.Thread(target=add_requests) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(8000, len(throttle.requests_current_period))
+        self.assertEqual(8000, throttle.total_requests_current_period)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -364,6 +364,45 @@ class OrderManagerTestSuite(unittest.TestCase):
 
         self.assertLess(0, order_data[4]["filled"])
 
+    def test_om_data_requests_batching(self):
+        ex = zt.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ex.load_markets()
+
+        om = zt.ActionOrderManager(ex)
+
+        orders = [ActionOrder("ETH/BTC", 1, 0.08, "buy") for _ in range(10)]
+        for o in orders:
+            om.add_order(o)
+            o.order_command = "new tickers ETH/BTC ask"
+
+        ex.fetch_tickers = MagicMock(wraps=ex.fetch_tickers)
+
+        # same symbol for all orders - single request for the symbol
+        om.proceed_orders()
+        ex.fetch_tickers.assert_called_once_with("ETH/BTC")
+        for o in orders:
+            self.assertEqual(0.082975, o.market_data[0])
+        self.assertDictEqual(dict(), om._prepared_data_for_orders)
+
+        # several symbols - single bulk request
+        ex.fetch_tickers.reset_mock()
+        for i, o in enumerate(orders):
+            o.order_command = "hold tickers {} bid".format(["ETH/BTC", "TRX/BTC"][i % 2])
+
+        om.proceed_orders()
+        ex.fetch_tickers.assert_called_once_with()
+        self.assertEqual(ex.tickers["ETH/BTC"]["bid"], orders[0].market_data[0])
+        self.assertEqual(ex.tickers["TRX/BTC"]["bid"], orders[1].market_data[0])
+
+        # data provided in data_for_orders is not fetched
+        ex.fetch_tickers.reset_mock()
+        for i, o in enumerate(orders):
+            o.order_command = "hold tickers {} bid".format(["ETH/BTC", "TRX/BTC"][i % 2])
+        om.data_for_orders = {"tickers": {"ETH/BTC": {"bid": 1}, "TRX/BTC": {"bid": 2}}}
+        om.proceed_orders()
+        ex.fetch_tickers.assert_not_called()
+        self.assertListEqual([1, 2], [orders[0].market_data[0], orders[1].market_data[0]])
 
 
 if __name__ == '__main__':
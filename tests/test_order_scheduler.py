@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from .context import ztom
+from unittest.mock import MagicMock
+import unittest
+
+
+class OrderPollSchedulerTestSuite(unittest.TestCase):
+
+    def test_poll_interval(self):
+        clock = [100.0]
+        scheduler = ztom.OrderPollScheduler(min_interval=1, max_interval=11, age_horizon=10, distance_horizon=0.1,
+                                            time_func=lambda: clock[0])
+
+        order = ztom.ActionOrder("ETH/BTC", 1, 0.1, "buy")
+
+        # new order without ticker
+        self.assertEqual(1, scheduler.poll_interval(order))
+        self.assertEqual(101, scheduler.schedule(order))
+
+        # age
+        clock[0] = 105
+        self.assertEqual(6, scheduler.poll_interval(order))
+        clock[0] = 200
+        self.assertEqual(11, scheduler.poll_interval(order))
+
+        # distance from best price
+        self.assertEqual(0, scheduler.price_distance(order, {"ask": 0.09, "bid": 0.08}))
+        self.assertAlmostEqual(0.05, scheduler.price_distance(order, {"ask": 0.105, "bid": 0.1}))
+        self.assertEqual(6, scheduler.poll_interval(order, {"ask": 0.09, "bid": 0.08}))
+        self.assertEqual(11, scheduler.poll_interval(order, {"ask": 0.2, "bid": 0.19}))
+
+        # fill activity
+        order.filled = 0.5
+        self.assertEqual(1, scheduler.poll_interval(order, {"ask": 0.2, "bid": 0.19}))
+
+    def test_due_orders(self):
+        scheduler = ztom.OrderPollScheduler(min_interval=1, max_interval=1)
+        orders = [ztom.ActionOrder("ETH/BTC", 1, 0.1, "buy") for _ in range(3)]
+
+        for i, o in enumerate(orders):
+            scheduler.schedule(o, timestamp=i)
+
+        self.assertEqual(1, scheduler.next_poll_time())
+        self.assertSetEqual({orders[0].id, orders[1].id}, scheduler.due_orders(2))
+        self.assertEqual(1, len(scheduler))
+        self.assertFalse(scheduler.is_due(orders[2].id, 2))
+
+        # rescheduled and removed orders
+        scheduler.schedule(orders[2], timestamp=5)
+        scheduler.schedule(orders[0], timestamp=0)
+        scheduler.remove(orders[0].id)
+        self.assertSetEqual(set(), scheduler.due_orders(3))
+        self.assertEqual(6, scheduler.next_poll_time())
+        self.assertSetEqual({orders[2].id}, scheduler.due_orders(10))
+        self.assertIsNone(scheduler.next_poll_time())
+
+    def test_order_manager_polls_due_orders(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ex.load_markets()
+
+        clock = [0.0]
+        scheduler = ztom.OrderPollScheduler(min_interval=1, max_interval=11, age_horizon=10,
+                                            time_func=lambda: clock[0])
+        om = ztom.ActionOrderManager(ex, poll_scheduler=scheduler)
+        om.offline_order_zero_fill_updates = 5
+
+        orders = [ztom.ActionOrder.create_from_start_amount("ETH/BTC", "BTC", 1, "ETH", 0.08) for _ in range(2)]
+        for o in orders:
+            om.add_order(o)
+
+        ex.get_order_update = MagicMock(wraps=ex.get_order_update)
+
+        om.proceed_orders()  # created
+        self.assertEqual(2, len(scheduler))
+
+        clock[0] = 0.5
+        om.proceed_orders()
+        ex.get_order_update.assert_not_called()
+
+        clock[0] = 1
+        om.proceed_orders()
+        self.assertEqual(2, ex.get_order_update.call_count)
+
+        # no fills - polled less often with age
+        self.assertEqual(3, scheduler.next_poll[orders[0].id])
+
+        orders[1].force_close()  # cancel command is proceeded without waiting
+        om.proceed_orders()
+        self.assertEqual(3, ex.get_order_update.call_count)  # only the update of canceled order
+        self.assertEqual("closed", orders[1].status)
+        self.assertNotIn(orders[1].id, scheduler)
+
+        while om.have_open_orders():
+            clock[0] += 1
+            om.proceed_orders()
+
+        self.assertEqual("closed", orders[0].status)
+        self.assertEqual(0, len(scheduler))
+
+    def test_order_manager_skips_not_due_orders(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ex.load_markets()
+
+        clock = [0.0]
+        scheduler = ztom.OrderPollScheduler(min_interval=1, max_interval=1, time_func=lambda: clock[0])
+        om = ztom.ActionOrderManager(ex, poll_scheduler=scheduler)
+        om.offline_order_zero_fill_updates = 50
+
+        orders = [ztom.ActionOrder.create_from_start_amount("ETH/BTC", "BTC", 1, "ETH", 0.08) for _ in range(3)]
+        for o in orders:
+            om.add_order(o)
+
+        om.proceed_orders()  # created
+        om.order_store.open_orders = MagicMock(wraps=om.order_store.open_orders)
+        om.order_store.orders_by_ids = MagicMock(wraps=om.order_store.orders_by_ids)
+
+        # open orders are not iterated while waiting for the poll time
+        clock[0] = 0.5
+        om.proceed_orders()
+        om.order_store.open_orders.assert_not_called()
+        om.order_store.orders_by_ids.assert_called_once_with(set())
+
+        orders[2].force_close()
+        om.proceed_orders()
+        om.order_store.orders_by_ids.assert_called_with({orders[2].id})
+        self.assertEqual("closed", orders[2].status)
+
+        clock[0] = 1
+        om.proceed_orders()
+        om.order_store.orders_by_ids.assert_called_with({orders[0].id, orders[1].id})
+        om.order_store.open_orders.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from .context import ztom
+import json
+import os
+import tempfile
+import unittest
+
+
+class OrderStoreTestSuite(unittest.TestCase):
+
+    def _order(self, symbol="ETH/BTC"):
+        return ztom.ActionOrder.create_from_start_amount(symbol, symbol.split("/")[0], 1, symbol.split("/")[1], 0.08)
+
+    def test_indexes(self):
+        store = ztom.OrderStore()
+        orders = [self._order("ETH/BTC"), self._order("XRP/BTC"), self._order("ETH/BTC")]
+        for o in orders:
+            store.add(o)
+        store.add(orders[0])  # already added
+
+        self.assertEqual(3, len(store))
+        self.assertIn(orders[1].id, store)
+        self.assertIs(orders[1], store.get(orders[1].id))
+        self.assertIsNone(store.get("unknown"))
+
+        self.assertListEqual(orders, store.orders())
+        self.assertListEqual(orders, store.open_orders())
+        self.assertListEqual([orders[0], orders[2]], store.orders_by_symbol("ETH/BTC"))
+        self.assertListEqual(orders, store.orders_by_status("open"))
+
+        orders[1].close_order()
+        self.assertTrue(store.update(orders[1]))
+        self.assertFalse(store.update(orders[1]))
+
+        self.assertListEqual([orders[0], orders[2]], store.open_orders())
+        self.assertListEqual([orders[1]], store.closed_orders())
+
+        # closed without update - reindexed on getting open orders
+        orders[0].close_order()
+        self.assertListEqual([orders[2]], store.open_orders())
+        self.assertListEqual([orders[1], orders[0]], store.closed_orders())
+        self.assertTrue(store.has_open_orders())
+
+        orders[2].close_order()
+        self.assertFalse(store.has_open_orders())
+
+    def test_archive(self):
+        journal_file = os.path.join(tempfile.mkdtemp(), "orders.jsonl")
+        store = ztom.OrderStore(max_closed=2, archive_size=3, journal_file=journal_file)
+
+        orders = [self._order() for _ in range(10)]
+        for o in orders:
+            store.add(o)
+
+        for o in orders[:8]:
+            o.close_order()
+            store.update(o)
+
+        self.assertEqual(2 + 2, len(store))
+        self.assertListEqual(orders[6:8], store.closed_orders())
+        self.assertListEqual(orders[8:], store.open_orders())
+        self.assertListEqual(orders[6:], store.orders_by_symbol("ETH/BTC"))
+
+        self.assertEqual(6, store.archived_count)
+        self.assertListEqual(orders[3:6], list(store.archive.values()))
+        self.assertIs(orders[5], store.get(orders[5].id))
+        self.assertIsNone(store.get(orders[0].id))
+
+        with open(journal_file) as f:
+            journal = [json.loads(line) for line in f]
+
+        self.assertListEqual([o.id for o in orders[:6]], [r["id"] for r in journal])
+        self.assertEqual("closed", journal[0]["status"])
+
+    def test_order_manager_with_store(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+
+        om = ztom.ActionOrderManager(ex, order_store=ztom.OrderStore(max_closed=1, archive_size=10))
+
+        orders = [self._order() for _ in range(3)]
+        for o in orders:
+            om.add_order(o)
+
+        self.assertListEqual(orders, om.orders)
+
+        while om.have_open_orders():
+            om.proceed_orders()
+
+        for o in orders:
+            self.assertEqual("closed", o.status)
+            self.assertListEqual([o], list(om.get_order_by_id(o.id)))
+            self.assertIs(o, om.get_order_by_uuid(o.id))
+
+        self.assertListEqual([orders[2]], om.orders)
+        self.assertEqual(2, om.order_store.archived_count)
+        self.assertEqual(0, len(om.get_open_orders()))
+
+    def test_order_manager_orders(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+
+        om = ztom.ActionOrderManager(ex)
+        orders = [self._order() for _ in range(3)]
+
+        with self.assertWarns(DeprecationWarning):
+            om.orders.append(orders[0])
+
+        with self.assertWarns(DeprecationWarning):
+            om.orders = orders[1:]
+
+        self.assertListEqual(orders[1:], om.orders)
+        self.assertListEqual([], list(om.get_order_by_id(orders[0].id)))
+
+        with self.assertWarns(DeprecationWarning):
+            om.orders.extend(orders[:1])
+
+        self.assertListEqual(orders[1:] + orders[:1], om.orders)
+
+        # in-place changes of the copy are not silently lost
+        for change in (lambda l: l.remove(orders[0]), lambda l: l.pop(), lambda l: l.insert(0, orders[0]),
+                       lambda l: l.clear(), lambda l: l.__setitem__(0, orders[0]), lambda l: l.__delitem__(0)):
+            with self.assertRaises(TypeError):
+                change(om.orders)
+
+        self.assertListEqual(orders[1:] + orders[:1], om.orders)
+
+        # closed orders are kept by default
+        while om.have_open_orders():
+            om.proceed_orders()
+
+        self.assertEqual(3, len(om.orders))
+        self.assertEqual(0, om.order_store.archived_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -169,6 +169,138 @@ class OrderBookTestSuite(unittest.TestCase):
                          ztom.Depth(total_quantity=0.0963360000, total_price=0.0963360000, depth=1,
                                     currency="quote"))
 
+    def test_array_order_book_depth(self):
+        ob = dict()
+        ob["asks"] = [[0.0964390000, 3],
+                      [0.0963510000, 2],
+                      [0.0963880000, 2]]
+
+        ob["bids"] = [[0.0963360000, 1],
+                      [0.0963280000, 3],
+                      [0.0963300000, 2]]
+
+        orderbook = ztom.OrderBook("ETH/BTC", ob["asks"], ob["bids"])
+        array_orderbook = ztom.ArrayOrderBook("ETH/BTC", ob["asks"], ob["bids"])
+
+        self.assertListEqual([0.096351, 0.096388, 0.096439], list(array_orderbook.ask_prices))
+        self.assertListEqual([0.096336, 0.09633, 0.096328], list(array_orderbook.bid_prices))
+        self.assertEqual(0.096351, array_orderbook.asks[0].price)
+        self.assertEqual(3, array_orderbook.bids[2].quantity)
+
+        for amount in (0.0001, 0.096351, 0.1, 0.192702, 0.3, 0.7, 1):
+            expected = orderbook.get_depth(amount, "buy", "quote")
+            result = array_orderbook.get_depth(amount, "buy", "quote")
+            self.assertEqual(expected.__dict__, result.__dict__)
+
+        for amount in (0.5, 1, 2, 5, 6, 10):
+            expected = orderbook.get_depth(amount, "sell")
+            result = array_orderbook.get_depth(amount, "sell")
+            self.assertEqual(expected.__dict__, result.__dict__)
+
+        self.assertEqual(orderbook.get_depth_for_destination_currency(0.3, "ETH").__dict__,
+                         array_orderbook.get_depth_for_destination_currency(0.3, "ETH").__dict__)
+
+        self.assertEqual(orderbook.get_depth_for_trade_side(5, "sell").__dict__,
+                         array_orderbook.get_depth_for_trade_side(5, "sell").__dict__)
+
+        self.assertEqual(None, array_orderbook.get_depth(1, "sell", "xyz"))
+
+    def test_get_depths(self):
+        ob = dict()
+        ob["asks"] = [[0.0963510000, 2],
+                      [0.0963880000, 2],
+                      [0.0964390000, 3]]
+
+        ob["bids"] = [[0.0963360000, 1],
+                      [0.0963300000, 2],
+                      [0.0963280000, 3]]
+
+        amounts = [0.1, 0.3, 0, 1, 5, 10]
+
+        for order_book_class in (ztom.OrderBook, ztom.ArrayOrderBook):
+            orderbook = order_book_class("ETH/BTC", ob["asks"], ob["bids"])
+
+            for direction, currency in (("buy", "quote"), ("sell", "base"), ("buy", "base"), ("sell", "quote")):
+                depths = orderbook.get_depths(amounts, direction, currency)
+
+                self.assertEqual(len(amounts), len(depths))
+                self.assertIsNone(depths[2])
+
+                for amount, depth in zip(amounts, depths):
+                    if amount > 0:
+                        self.assertEqual(orderbook.get_depth(amount, direction, currency).__dict__, depth.__dict__)
+
+            self.assertIsNone(orderbook.get_depths(amounts, "buy", "xyz"))
+            self.assertEqual(False, orderbook.get_depths_for_trade_side(amounts, "xyz"))
+
+        empty_orderbook = ztom.ArrayOrderBook("ETH/BTC", [], [])
+        self.assertListEqual([None, None], empty_orderbook.get_depths([1, 2], "buy", "quote"))
+
+    def test_get_depths_for_trade_sides(self):
+        order_books = {
+            "ETH/BTC": ztom.ArrayOrderBook("ETH/BTC", [[0.0963510000, 2], [0.0963880000, 2]],
+                                           [[0.0963360000, 1], [0.0963300000, 2]]),
+            "ETH/USDT": ztom.OrderBook("ETH/USDT", [[1000, 1], [1001, 2]], [[999, 1], [998, 5]])}
+
+        depths = ztom.get_depths_for_trade_sides(order_books,
+                                                 {"ETH/BTC": [0.1, 0.3], "ETH/USDT": [0.5, 3]},
+                                                 {"ETH/BTC": "buy", "ETH/USDT": "sell"})
+
+        self.assertEqual(order_books["ETH/BTC"].get_depth_for_trade_side(0.1, "buy").__dict__,
+                         depths["ETH/BTC"][0].__dict__)
+        self.assertEqual(order_books["ETH/BTC"].get_depth_for_trade_side(0.3, "buy").__dict__,
+                         depths["ETH/BTC"][1].__dict__)
+
+        self.assertEqual(ztom.Depth(499.5, 999, 1, "quote"), depths["ETH/USDT"][0])
+        self.assertEqual(ztom.Depth(999 + 998 * 2, (999 + 998 * 2) / 3, 2, "quote"), depths["ETH/USDT"][1])
+
+    def test_incremental_order_book(self):
+        asks = [[0.0963880000, 2], [0.0963510000, 2], [0.0964390000, 3]]
+        bids = [[0.0963360000, 1], [0.0963300000, 2], [0.0963280000, 3]]
+
+        orderbook = ztom.IncrementalOrderBook("ETH/BTC", asks, bids, sequence=10)
+
+        self.assertListEqual([[0.096351, 2], [0.096388, 2], [0.096439, 3]], orderbook.asks)
+        self.assertListEqual([[0.096336, 1], [0.09633, 2], [0.096328, 3]], orderbook.bids)
+
+        self.assertEqual(ztom.OrderBook("ETH/BTC", asks, bids).get_depth(5, "sell").__dict__,
+                         orderbook.get_depth(5, "sell").__dict__)
+
+        # change, remove and insert levels
+        self.assertTrue(orderbook.apply_update(asks_diff=[[0.096351, 0], [0.096360, 1.5]],
+                                               bids_diff=[[0.09633, 4], [0.096340, 0.5], [0.096000, 0]],
+                                               sequence=11))
+
+        self.assertEqual(11, orderbook.sequence)
+        self.assertListEqual([[0.09636, 1.5], [0.096388, 2], [0.096439, 3]], orderbook.asks)
+        self.assertListEqual([[0.09634, 0.5], [0.096336, 1], [0.09633, 4], [0.096328, 3]], orderbook.bids)
+
+        expected = ztom.OrderBook("ETH/BTC", orderbook.asks, orderbook.bids)
+        self.assertEqual(expected.get_depth_for_trade_side(0.2, "buy").__dict__,
+                         orderbook.get_depth_for_trade_side(0.2, "buy").__dict__)
+        self.assertEqual(expected.get_depth_for_destination_currency(3, "BTC").__dict__,
+                         orderbook.get_depth_for_destination_currency(3, "BTC").__dict__)
+
+        # snapshot is cached till the next update
+        snapshot = orderbook.snapshot()
+        self.assertIs(snapshot, orderbook.snapshot())
+
+        # outdated update is skipped
+        self.assertFalse(orderbook.apply_update(asks_diff=[[0.09636, 0]], sequence=11))
+        self.assertIs(snapshot, orderbook.snapshot())
+
+        # update covering several sequence numbers
+        self.assertTrue(orderbook.apply_update(asks_diff=[[0.09636, 0]], sequence=15, first_sequence=9))
+        self.assertEqual(0.096388, orderbook.snapshot().asks[0].price)
+
+        with self.assertRaises(ztom.OrderBookSequenceError):
+            orderbook.apply_update(bids_diff=[[0.09634, 0]], sequence=17)
+
+        orderbook.load_snapshot([[1, 1]], [[0.5, 1]], sequence=20)
+        self.assertListEqual([[1, 1]], orderbook.asks)
+        self.assertTrue(orderbook.apply_update(bids_diff=[[0.6, 1]], sequence=21))
+        self.assertListEqual([[0.6, 1], [0.5, 1]], orderbook.bids)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
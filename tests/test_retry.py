@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+from .context import ztom
+from unittest.mock import MagicMock
+import ccxt
+import unittest
+
+
+class RetryPolicyTestSuite(unittest.TestCase):
+
+    def test_delays(self):
+        policy = ztom.RetryPolicy(base_delay=1, max_delay=5, multiplier=2, jitter=0)
+        self.assertListEqual([1, 2, 4, 5, 5], [policy.delay(i) for i in range(1, 6)])
+
+        policy = ztom.RetryPolicy(base_delay=1, max_delay=5, multiplier=2, jitter=0.5, seed=1)
+        for attempt in range(1, 6):
+            full = min(2 ** (attempt - 1), 5)
+            delay = policy.delay(attempt)
+            self.assertGreaterEqual(delay, full * 0.5)
+            self.assertLessEqual(delay, full)
+
+        fixed = ztom.RetryPolicy.fixed(3, 0.1)
+        self.assertListEqual([0.1, 0.1, 0.1], [fixed.delay(i) for i in range(1, 4)])
+
+    def test_errors_classification(self):
+        policy = ztom.RetryPolicy(retry_unknown_errors=False)
+
+        self.assertTrue(policy.is_retryable(ccxt.NetworkError()))
+        self.assertTrue(policy.is_retryable(ccxt.RateLimitExceeded()))
+        self.assertTrue(policy.is_retryable(ccxt.RequestTimeout()))
+        self.assertFalse(policy.is_retryable(ccxt.InsufficientFunds()))
+        self.assertFalse(policy.is_retryable(ccxt.InvalidOrder()))
+        self.assertFalse(policy.is_retryable(ccxt.AuthenticationError()))
+        self.assertFalse(policy.is_retryable(ValueError()))
+
+        self.assertTrue(ztom.RetryPolicy().is_retryable(ValueError()))
+
+    def test_run(self):
+        now = [0.0]
+        policy = ztom.RetryPolicy(max_attempts=5, base_delay=0, jitter=0, deadline=10, time_func=lambda: now[0])
+
+        request = MagicMock(side_effect=[ccxt.NetworkError(), None, {"id": 1}])
+        on_error = MagicMock()
+        self.assertDictEqual({"id": 1}, policy.run(request, on_error=on_error))
+        self.assertEqual(3, request.call_count)
+        on_error.assert_called_once()
+
+        # fatal errors are not retried
+        request = MagicMock(side_effect=ccxt.InsufficientFunds())
+        self.assertIsNone(policy.run(request))
+        self.assertEqual(1, request.call_count)
+
+        # attempts limit
+        request = MagicMock(side_effect=ccxt.NetworkError())
+        self.assertIsNone(policy.run(request))
+        self.assertEqual(5, request.call_count)
+
+        # deadline
+        def timed_out():
+            now[0] += 6
+            raise ccxt.RequestTimeout()
+
+        request = MagicMock(side_effect=timed_out)
+        self.assertIsNone(policy.run(request))
+        self.assertEqual(2, request.call_count)
+
+        # empty result is accepted
+        request = MagicMock(return_value=[])
+        self.assertListEqual([], policy.run(request, accept_empty=True))
+        self.assertEqual(1, request.call_count)
+
+    def test_order_manager_deferred_retry(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ex.load_markets()
+
+        now = [0.0]
+        policy = ztom.RetryPolicy(max_attempts=5, base_delay=1, jitter=0, time_func=lambda: now[0])
+
+        om = ztom.ActionOrderManager(ex, retry_policy=policy)
+        om.defer_retries = True
+
+        place_limit_order = ex.place_limit_order
+
+        def place(o):
+            effect = failures.pop(0) if len(failures) > 0 else None
+            if effect is not None:
+                raise effect
+            return place_limit_order(o)
+
+        failures = [ccxt.NetworkError("timeout"), ccxt.NetworkError("timeout")]
+        ex.place_limit_order = MagicMock(side_effect=place)
+
+        order = ztom.ActionOrder.create_from_start_amount("ETH/BTC", "BTC", 1, "ETH", 0.08)
+        om.add_order(order)
+
+        # first attempt fails: the retry is deferred for 1s, the manager is not blocked
+        om.proceed_orders()
+        self.assertEqual(1, ex.place_limit_order.call_count)
+        self.assertFalse(order.get_active_order().id)
+        self.assertEqual("new", om._order_action(order.order_command))
+
+        # the order is skipped till the retry time
+        now[0] += 0.5
+        om.proceed_orders()
+        self.assertEqual(1, ex.place_limit_order.call_count)
+
+        # second attempt fails: the pause is doubled
+        now[0] += 0.5
+        om.proceed_orders()
+        self.assertEqual(2, ex.place_limit_order.call_count)
+        self.assertDictEqual({"request": "create order", "attempt": 2, "started": 0.0, "retry_at": 3.0},
+                             om._deferred_retries[order.get_active_order().internal_id]["create order"])
+
+        now[0] += 2
+        om.proceed_orders()
+        self.assertEqual(3, ex.place_limit_order.call_count)
+        self.assertTrue(order.get_active_order().id)
+        self.assertDictEqual({}, om._deferred_retries)
+
+        while om.have_open_orders():
+            om.proceed_orders()
+
+        self.assertEqual("closed", order.status)
+        self.assertEqual(1, order.filled_start_amount)
+
+    def test_deferred_cancel_attempts(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ex.load_markets()
+
+        now = [0.0]
+        policy = ztom.RetryPolicy(max_attempts=5, base_delay=1, jitter=0, time_func=lambda: now[0])
+
+        om = ztom.ActionOrderManager(ex, retry_policy=policy, max_cancel_attempts=3)
+        om.defer_retries = True
+
+        order = ztom.ActionOrder.create_from_start_amount("ETH/BTC", "BTC", 1, "ETH", 0.08)
+        om.add_order(order)
+        om.proceed_orders()
+        trade_order = order.get_active_order()
+
+        ex.cancel_order = MagicMock(side_effect=ccxt.NetworkError("timeout"))
+        ex.get_order_update = MagicMock(side_effect=ccxt.NetworkError("timeout"))
+
+        deferred = 0
+        while True:
+            try:
+                resp = om.cancel_order(trade_order)
+                break
+            except ztom.OrderRequestDeferred:
+                deferred += 1
+                self.assertIn("cancel order", om._deferred_retries[trade_order.internal_id])
+                self.assertIn("update order", om._deferred_retries[trade_order.internal_id])
+                now[0] += 100
+                self.assertLess(deferred, 10)
+
+        # cancel attempts are not reset by the deferred updates
+        self.assertIsNone(resp)
+        self.assertEqual(3, ex.cancel_order.call_count)
+        self.assertEqual(3, deferred)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
 from .context import ztom
-from ztom import Throttle
+from ztom import Throttle, WindowThrottle, CompositeThrottle
 import datetime as datetime
+import asyncio
+import random
+import threading
+import time
 import unittest
+from unittest.mock import MagicMock
 
 
 class ThrottleTestSuite(unittest.TestCase):
@@ -215,6 +220,266 @@ class ThrottleTestSuite(unittest.TestCase):
         self.assertEqual(2, throttle.total_requests_current_period)
         self.assertAlmostEqual(0.059, throttle.sleep_time(60.061), 8)
 
+    def test_window_throttle_fixed_same_as_throttle(self):
+        random.seed(1)
+        weights = {"fetch_tickers": 5, "create_order": 2}
+
+        throttle = Throttle(10, 100, weights)
+        window_throttle = WindowThrottle(10, 100, weights, sliding=False)
+
+        timestamp = 0.0
+        for i in range(3000):
+            timestamp += random.choice([0.0, 0.01, 0.05, 0.3, 2, 7])
+            request_type = random.choice(["single", "fetch_tickers", "create_order"])
+            requests = random.randint(1, 3)
+
+            throttle.add_request(timestamp, request_type, requests)
+            window_throttle.add_request(timestamp, request_type, requests)
+
+            self.assertEqual(throttle.total_requests_current_period, window_throttle.total_requests_current_period)
+            self.assertEqual(throttle._period_start_timestamp, window_throttle._period_start_timestamp)
+            self.assertEqual(throttle.periods_since_start, window_throttle.periods_since_start)
+            self.assertEqual(throttle.sleep_time(timestamp + 0.02), window_throttle.sleep_time(timestamp + 0.02))
+
+        self.assertListEqual(throttle.requests_current_period, window_throttle.requests_current_period)
+
+    def test_window_throttle_sliding(self):
+        throttle = WindowThrottle(10, 5, {"fetch_tickers": 2})
+
+        self.assertEqual(0, throttle.sleep_time(0))
+
+        throttle.add_request(1)
+        throttle.add_request(2, "fetch_tickers")
+        throttle.add_request(3)
+        self.assertEqual(4, throttle.total_requests_current_period)
+        self.assertEqual(0, throttle.sleep_time(3))
+
+        throttle.add_request(4)
+        self.assertEqual(5, throttle.total_requests_current_period)
+
+        # budget is exhausted till the request at 1 leaves the window
+        self.assertEqual(7, throttle.sleep_time(4))
+        self.assertEqual(1, throttle.sleep_time(10))
+        self.assertEqual(0, throttle.sleep_time(11))
+
+        self.assertEqual(4, throttle.total_requests_current_period)
+        self.assertEqual(3, len(throttle))
+
+        throttle.add_request(11, "fetch_tickers")
+        # 2 units to expire: "fetch_tickers" at 2 leaves the window at 12
+        self.assertEqual(6, throttle.total_requests_current_period)
+        self.assertEqual(1, throttle.sleep_time(11))
+
+        throttle.add_request(30)
+        self.assertEqual(1, throttle.total_requests_current_period)
+        self.assertListEqual([{"timestamp": 30, "request_type": "single", "added": 1}],
+                             throttle.requests_current_period)
+
+    def test_window_throttle_sliding_weights(self):
+        # sleep time is the time till the oldest requests which weight covers the excess leave the window
+        rnd = random.Random(7)
+        throttle = WindowThrottle(100, 50, {"w{}".format(i): i for i in range(1, 6)})
+        requests = list()  # [timestamp, weight] in the window
+
+        for i in range(500):
+            timestamp = i / 4
+            weight = rnd.randint(1, 5)
+            throttle.add_request(timestamp, "w{}".format(weight))
+            requests = [r for r in requests if r[0] > timestamp - 100] + [[timestamp, weight]]
+
+            if i % 50 == 0:
+                # the oldest request is partially removed
+                throttle.set_used_requests(throttle.total_requests_current_period - 1, timestamp)
+                requests[0][1] -= 1
+                if requests[0][1] == 0:
+                    requests.pop(0)
+
+            expected = 0.0
+            excess = sum(r[1] for r in requests) - 50 + 1
+            for t, w in requests:
+                if excess <= 0:
+                    break
+                excess -= w
+                if excess <= 0:
+                    expected = max(t + 100 - timestamp, 0.0)
+
+            self.assertEqual(expected, throttle.sleep_time(timestamp))
+
+    def test_window_throttle_threads(self):
+        throttle = WindowThrottle(60, 100000)
+
+        def add_requests():
+            for _ in range(1000):
+                throttle.add_request(request_type="single")
+                throttle.sleep_time()
+
+        threads = [threading.Thread(target=add_requests) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(8000, len(throttle))
+        self.assertEqual(8000, throttle.total_requests_current_period)
+
+    def test_acquire(self):
+        for throttle in (Throttle(1, 20), WindowThrottle(1, 20, sliding=False)):
+            started = time.time()
+            for _ in range(5):
+                self.assertTrue(throttle.acquire("single"))
+
+            # 0.05s for request
+            self.assertGreaterEqual(time.time() - started, 4 * 0.05 - 0.01)
+            self.assertEqual(5, throttle.total_requests_current_period)
+
+        throttle = WindowThrottle(10, 2)
+        throttle.acquire()
+        throttle.acquire()
+        self.assertFalse(throttle.acquire(timeout=0.05))
+        self.assertEqual(2, throttle.total_requests_current_period)
+        self.assertEqual(0, len(throttle._waiters))
+
+    def test_acquire_priority(self):
+        throttle = WindowThrottle(0.3, 1)
+        throttle.acquire("single")
+
+        served = list()
+
+        def request(request_type):
+            throttle.acquire(request_type)
+            served.append(request_type)
+
+        threads = list()
+        for request_type in ["fetch_tickers", "fetch_balance", "fetch_tickers", "cancel_order"]:
+            t = threading.Thread(target=request, args=(request_type,))
+            t.start()
+            threads.append(t)
+            time.sleep(0.02)
+
+        for t in threads:
+            t.join()
+
+        self.assertListEqual(["cancel_order", "fetch_tickers", "fetch_tickers", "fetch_balance"], served)
+
+    def test_acquire_async(self):
+        throttle = Throttle(1, 20)
+        served = list()
+
+        async def request(request_type, priority=None):
+            await throttle.acquire_async(request_type, priority)
+            served.append(request_type)
+
+        async def requests():
+            await throttle.acquire_async("single")
+            await asyncio.gather(request("fetch_tickers"), request("fetch_ticker"),
+                                 request("fetch_order"), request("single", Throttle.PRIORITY_HIGH))
+
+        started = time.time()
+        asyncio.run(requests())
+
+        self.assertGreaterEqual(time.time() - started, 4 * 0.05 - 0.01)
+        self.assertListEqual(["fetch_order", "single", "fetch_tickers", "fetch_ticker"], served)
+        self.assertEqual(5, throttle.total_requests_current_period)
+
+    def test_composite_throttle(self):
+        throttle = CompositeThrottle.from_limits({
+            "weight": {"period": 60, "requests_per_period": 100},
+            "orders_10s": {"period": 10, "requests_per_period": 3, "weights": {"create_order": 1}},
+            "orders_day": {"period": 86400, "requests_per_period": 5, "weights": {"create_order": 1}}},
+            {"single": 1, "create_order": 1, "fetch_tickers": 40})
+
+        self.assertEqual(60, throttle.period)
+        self.assertEqual(100, throttle.requests_per_period)
+        self.assertEqual(0, throttle.sleep_time(0))
+
+        throttle.add_request(1, "create_order")
+        throttle.add_request(2, "create_order")
+        throttle.add_request(3, "fetch_tickers")
+        throttle.add_request(4, "create_order")
+
+        self.assertEqual(43, throttle.total_requests_current_period)
+        self.assertEqual(3, throttle.buckets["orders_10s"].total_requests_current_period)
+        self.assertEqual(4, len(throttle.buckets["weight"].requests_current_period))
+
+        # weight budget is fine, but orders per 10s are exhausted till the order at 1 leaves the window
+        self.assertEqual("orders_10s", throttle.binding_bucket(5))
+        self.assertEqual(6, throttle.sleep_time(5))
+        self.assertDictEqual({"weight": 0, "orders_10s": 6, "orders_day": 0}, throttle.bucket_sleep_times(5))
+
+        # requests of other types are not limited by the orders buckets
+        self.assertDictEqual({"weight": 0}, throttle.bucket_sleep_times(5, "fetch_tickers"))
+
+        throttle.add_request(12, "create_order")
+        throttle.add_request(13, "create_order")
+
+        # orders per day are exhausted
+        self.assertEqual("orders_day", throttle.binding_bucket(14))
+        self.assertEqual(86401 - 14, throttle.sleep_time(14))
+
+        # weight budget is exhausted too, till the requests up to "fetch_tickers" at 3 leave the window
+        throttle.add_request(20, "fetch_tickers")
+        throttle.add_request(21, "fetch_tickers")
+        self.assertEqual(125, throttle.total_requests_current_period)
+        self.assertDictEqual({"weight": 63 - 22}, throttle.bucket_sleep_times(22, "fetch_tickers"))
+        self.assertEqual(86401 - 22, throttle.sleep_time(22))
+
+    def test_composite_throttle_acquire(self):
+        throttle = CompositeThrottle.from_limits({
+            "weight": {"period": 60, "requests_per_period": 100},
+            "orders": {"period": 0.2, "requests_per_period": 1, "weights": {"create_order": 1}}})
+
+        started = time.time()
+        throttle.acquire("create_order")
+        throttle.acquire("fetch_tickers")
+        throttle.acquire("fetch_order")
+        self.assertLess(time.time() - started, 0.1)
+
+        throttle.acquire("create_order")
+        self.assertGreaterEqual(time.time() - started, 0.19)
+        self.assertEqual(4, throttle.total_requests_current_period)
+        self.assertEqual(1, throttle.buckets["orders"].total_requests_current_period)
+
+    def test_wrapper_request_priority(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ex.load_markets()
+        ex.enable_requests_limits(wait=True)
+        ex.requests_throttle.acquire = MagicMock(wraps=ex.requests_throttle.acquire)
+
+        ex.fetch_tickers(priority=Throttle.PRIORITY_HIGH)
+        ex.fetch_tickers()
+
+        order = ztom.TradeOrder.create_limit_order_from_start_amount("ETH/BTC", "BTC", 1, "ETH", 0.08)
+        ex.add_offline_order_data(order, 2)
+        ztom.event_loop().run_until_complete(ex.place_limit_order_async(order, priority=Throttle.PRIORITY_LOW))
+
+        self.assertListEqual([("fetch_tickers", Throttle.PRIORITY_HIGH), ("fetch_tickers", None),
+                              ("create_order", Throttle.PRIORITY_LOW)],
+                             [(c[0][0], c[1]["priority"]) for c in ex.requests_throttle.acquire.call_args_list])
+
+
+    def test_order_books_async_acquire(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+        ex.load_markets()
+        ex.fetch_tickers()
+        ex.load_offline_order_books_from_csv("test_data/order_books.csv")
+
+        clock = ztom.VirtualClock()
+        ex.set_clock(clock)
+        ex.enable_requests_throttle(1, 2, window="sliding", wait=True)
+        ex.requests_throttle.acquire_async = MagicMock(wraps=ex.requests_throttle.acquire_async)
+
+        order_books = ex.get_order_books_async(["ETH/BTC", "WAVES/ETH", "AMB/ETH"], priority=Throttle.PRIORITY_HIGH)
+
+        self.assertEqual(3, len(order_books))
+        self.assertListEqual([("fetch_order_book", Throttle.PRIORITY_HIGH)] * 3,
+                             [(c[0][0], c[1]["priority"]) for c in ex.requests_throttle.acquire_async.call_args_list])
+
+        # the third request waited for the budget and the offline order book request was counted once
+        self.assertEqual(1.0, clock.time())
+        self.assertEqual(1, ex.requests_throttle.total_requests_current_period)
+
 
 if __name__ == '__main__':
     unittest.main()
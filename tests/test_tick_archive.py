@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+from .context import ztom
+import os
+import tempfile
+import unittest
+
+
+class TickArchiveTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "tickers.tka")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_convert(self):
+        for csv_file in ("test_data/tickers.csv", "test_data/tickers_binance.csv"):
+            loaded = ztom.ccxtExchangeWrapper.load_tickers_from_csv(csv_file)
+            ztom.convert_tickers_csv(csv_file, self.path)
+
+            self.assertTrue(ztom.TickArchive.is_archive(self.path))
+            self.assertFalse(ztom.TickArchive.is_archive(csv_file))
+
+            archive = ztom.TickArchive(self.path)
+            self.assertListEqual(list(loaded.keys()), list(archive))
+            for fetch_id in loaded:
+                self.assertDictEqual(loaded[fetch_id], archive[fetch_id])
+
+            records = archive.fetch_records(1)
+            self.assertFalse(records.flags.owndata)  # view of the mapped file
+            self.assertEqual(archive.symbol_ids["ETH/BTC"], records["symbol"][1])
+
+            self.assertIn(2, archive)
+            self.assertIsNone(archive.get(3))
+            archive.close()
+
+    def test_missing_values(self):
+        ztom.TickArchive.write(self.path, [(5, {"ETH/BTC": {"ask": 0.08, "bid": None, "askVolume": 1,
+                                                            "bidVolume": None}}),
+                                           (7, {"ETH/BTC": {"ask": 0.09, "bid": 0.07, "askVolume": 2, "bidVolume": 3,
+                                                            "timestamp": 1527000539980},
+                                                "TRX/BTC": {"ask": 0.1, "bid": 0.09, "askVolume": 2, "bidVolume": 3}})])
+
+        archive = ztom.TickArchive(self.path)
+        self.assertListEqual([5, 7], archive.keys())
+        self.assertDictEqual({"ask": 0.08, "bid": None, "askVolume": 1, "bidVolume": None}, archive[5]["ETH/BTC"])
+        self.assertEqual(1527000539980, archive[7]["ETH/BTC"]["timestamp"])
+        self.assertListEqual(["ETH/BTC", "TRX/BTC"], list(archive[7].keys()))
+        archive.close()
+
+        with self.assertRaises(ValueError):
+            ztom.TickArchive.write(self.path, [(1, {}), (1, {})])
+
+        with self.assertRaises(ValueError):
+            ztom.TickArchive("test_data/tickers.csv")
+
+    def test_offline_mode(self):
+        ztom.convert_tickers_csv("test_data/tickers.csv", self.path)
+
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", self.path)
+        self.assertIsInstance(ex._offline_tickers, ztom.TickArchive)
+
+        reference = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        reference.set_offline_mode("test_data/markets.json", "test_data/tickers.csv")
+
+        for _ in range(3):
+            self.assertDictEqual(reference.fetch_tickers(), ex.fetch_tickers())
+
+        ex._offline_tickers.close()
+
+    def test_day_of_tickers(self):
+        symbols = ["S{}/BTC".format(i) for i in range(20)]
+        fetches = ((i, {s: {"ask": 1.0 + i, "bid": 1.0, "askVolume": 1.0, "bidVolume": 1.0,
+                            "timestamp": 1527000000000 + i * 1000} for s in symbols}) for i in range(86400))
+        ztom.TickArchive.write(self.path, fetches)
+
+        archive = ztom.TickArchive(self.path)
+        self.assertEqual(86400 * 20, len(archive.records))
+        self.assertEqual(86400, len(archive))
+        self.assertEqual(43201.0, archive[43200]["S19/BTC"]["ask"])
+
+        # opening does not read the records: they are the views of the mapped file
+        self.assertFalse(archive.records.flags.owndata)
+        self.assertFalse(archive.index.flags.owndata)
+
+        self.assertAlmostEqual(86400 / 2 + 0.5, archive.records["ask"].mean())
+        archive.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+from .context import ztom
+from unittest.mock import patch
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class IndexedTickersCsvTestSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "tickers.csv")
+        shutil.copy("test_data/tickers.csv", self.path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_tickers(self):
+        loaded = ztom.ccxtExchangeWrapper.load_tickers_from_csv(self.path)
+        tickers = ztom.IndexedTickersCsv(self.path)
+
+        self.assertTrue(os.path.exists(self.path + ".idx"))
+        self.assertEqual(3, len(tickers))
+        self.assertListEqual([0, 1, 2], list(tickers))
+        self.assertIn(2, tickers)
+        self.assertNotIn(3, tickers)
+        self.assertIsNone(tickers.get(3))
+
+        for fetch_id in (2, 0, 1, 2):
+            self.assertDictEqual(loaded[fetch_id], tickers[fetch_id])
+
+        self.assertEqual(0.082975, tickers[2]["ETH/BTC"]["ask"])
+        self.assertEqual(1527000539980, tickers[0]["ETH/BTC"]["timestamp"])
+
+        self.assertListEqual([1, 2], [fetch_id for fetch_id, _ in tickers.iter_tickers(start_fetch_id=1)])
+        tickers.close()
+
+    def test_index_file(self):
+        ztom.IndexedTickersCsv(self.path)
+
+        with patch.object(ztom.IndexedTickersCsv, "build_index") as build_index:
+            tickers = ztom.IndexedTickersCsv(self.path)
+            build_index.assert_not_called()
+            self.assertEqual(3, len(tickers))
+
+        # csv file is changed - index is rebuilt
+        with open(self.path, "a", newline="") as f:
+            csv.writer(f).writerow([3, 1527000600.5, "ETH/BTC", 0.081, 0.08, "", 1])
+
+        tickers = ztom.IndexedTickersCsv(self.path)
+        self.assertEqual(4, len(tickers))
+        self.assertDictEqual({"ask": 0.081, "bid": 0.08, "askVolume": None, "bidVolume": 1.0,
+                              "timestamp": 1527000600500}, tickers[3]["ETH/BTC"])
+
+    def test_large_file(self):
+        fetches = 20000
+        with open(self.path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["fetch_id", "timestamp", "symbol", "ask", "bid", "askVolume", "bidVolume"])
+            for i in range(fetches):
+                for symbol in ("ETH/BTC", "TRX/BTC"):
+                    writer.writerow([i, 1527000000 + i, symbol, 0.08 + i / 1e6, 0.079, 1, 2])
+
+        tickers = ztom.IndexedTickersCsv(self.path, cache_size=4)
+        self.assertEqual(fetches, len(tickers))
+
+        for i in range(fetches):
+            self.assertEqual(0.08 + i / 1e6, tickers[i]["ETH/BTC"]["ask"])
+
+        self.assertEqual(4, len(tickers._cache))
+        self.assertEqual(0.08 + 12345 / 1e6, tickers[12345]["ETH/BTC"]["ask"])
+        self.assertEqual(0.08 + 12346 / 1e6, tickers[12346]["ETH/BTC"]["ask"])
+        tickers.close()
+
+    def test_offline_mode(self):
+        ex = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        ex.set_offline_mode("test_data/markets.json", self.path, stream_tickers=True)
+        self.assertIsInstance(ex._offline_tickers, ztom.IndexedTickersCsv)
+
+        reference = ztom.ccxtExchangeWrapper.load_from_id("binance")
+        reference.set_offline_mode("test_data/markets.json", self.path)
+
+        for _ in range(3):
+            self.assertDictEqual(reference.fetch_tickers(), ex.fetch_tickers())
+
+        with self.assertRaises(ztom.ExchangeWrapperOfflineFetchError):
+            ex.fetch_tickers()
+
+        ex._offline_tickers.close()
+
+    def test_not_ordered_file(self):
+        with open(self.path, "a", newline="") as f:
+            csv.writer(f).writerow([0, 1527000600, "ETH/BTC", 0.081, 0.08, 1, 1])
+
+        with self.assertRaises(ValueError):
+            ztom.IndexedTickersCsv(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
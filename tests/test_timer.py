@@ -22,6 +22,24 @@ class TimerTestSuite(unittest.TestCase):
         self.assertAlmostEqual(timestamp_start+0.1, timestamps["timestamp_notch1"], 1)
         self.assertAlmostEqual(timestamp_start + 0.1 + 0.3, timestamps["timestamp_notch2"], 1)
 
+    def test_check_timer_virtual_clock(self):
+        clock = ztom.VirtualClock(1000)
+        zt_timer = ztom.timer.Timer(clock=clock)
+        zt_timer.max_requests_per_lap = 2
+        zt_timer.lap_time = 1
+
+        zt_timer.check_timer()
+        self.assertEqual(1000, clock.time())
+
+        # no time passed since the previous request
+        zt_timer.check_timer()
+        self.assertEqual(0, zt_timer.request_time)
+        self.assertEqual(1000.5, clock.time())
+
+        clock.advance(2)
+        zt_timer.check_timer()
+        self.assertEqual(1002.5, clock.time())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,10 +1,17 @@
 from .cli import *
+from .clock import Clock, VirtualClock, get_clock, set_clock
 from .timer import Timer
 from .utils import *
 from .exchanges import *
 from .exchange_wrapper import ccxtExchangeWrapper
 from .exchange_wrapper import ExchangeWrapperOfflineFetchError
 from .exchange_wrapper import ExchangeWrapperError
+from .market_data import MarketDataCache, MarketDataStream, MarketDataTransport, SimulatedMarketDataTransport
+from .order_events import OrderEventsStream, OrderEventsTransport, SimulatedOrderEventsTransport
+from .matching_engine import OfflineMatchingEngine
+from .tickers_csv import IndexedTickersCsv
+from .tick_archive import TickArchive, convert_tickers_csv
+from .order_books_csv import OrderBooksColumns
 from .stats_influx import StatsInflux
 from .datastorage import DataStorage
 from .reporter import Reporter, MongoReporter
@@ -15,6 +22,10 @@ from .reporter_sqla import SqlaReporter
 from .orderbook import OrderBook
 from .orderbook import Order
 from .orderbook import Depth
+from .orderbook import ArrayOrderBook
+from .orderbook import get_depths_for_trade_sides
+from .orderbook import IncrementalOrderBook
+from .orderbook import OrderBookError, OrderBookSequenceError
 from .trade_orders import *
 from .trade_order_manager import *
 from . import core
@@ -23,8 +34,14 @@ from .errors import *
 from .action_order import ActionOrder
 from .recovery_orders import RecoveryOrder
 from .fok_order import FokOrder, FokThresholdTakerPriceOrder
+from .order_store import OrderStore
+from .order_scheduler import OrderPollScheduler
+from .retry import RetryPolicy
+from .order_journal import OrderJournal, OrderJournalError
+from .data_requests import DataProvider, DataProviderRegistry
 from .order_manager import ActionOrderManager
-from .throttle import Throttle
+from .async_order_manager import AsyncActionOrderManager
+from .throttle import Throttle, WindowThrottle, CompositeThrottle
 from .models.remainings import Remainings
 
 # Legacy support
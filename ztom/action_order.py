@@ -3,9 +3,10 @@ from typing import NamedTuple
 from ztom import core
 from ztom import errors
 from ztom import TradeOrder
+from .change_tracking import ChangeTracking
 import copy
 import uuid
-import time
+from .clock import get_clock
 
 
 class ActionOrderSnapshot(NamedTuple):
@@ -20,7 +21,22 @@ class ActionOrderSnapshot(NamedTuple):
     active_trade_order_status: str = ""
 
 
-class ActionOrder(object):
+class ActionOrder(ChangeTracking):
+
+    # fields with tracked changes (see ChangeTracking)
+    TRACKED_FIELDS = ("symbol", "amount", "price", "side", "status", "state", "filled", "filled_start_amount",
+                      "filled_dest_amount", "filled_price", "order_command", "active_trade_order")
+
+    # runtime attributes set by the order manager and the snapshot cache (see ChangeTracking.UNTRACKED_FIELDS)
+    UNTRACKED_FIELDS = ChangeTracking.UNTRACKED_FIELDS | {"_clock", "_command_listener", "_last_snapshot_state",
+                                                          "_last_snapshot"}
+    _clock = None
+    _command_listener = None
+    _last_snapshot_state = None
+    _last_snapshot = None
+
+    # tracked fields which are in ActionOrderSnapshot
+    _SNAPSHOT_FIELDS = ("symbol", "amount", "price", "side", "status", "state", "filled")
 
     # ActionOrderSnapshot = namedtuple("ActionOrderSnapshot", [
     #     "symbol",
@@ -48,7 +64,7 @@ class ActionOrder(object):
 
         self.id = str(uuid.uuid4())  # internal ID
 
-        self.timestamp = time.time()  # timestamp of object creation
+        self.timestamp = get_clock().time()  # timestamp of object creation
         self.timestamp_close = float()
 
         # Generic order Parameters
@@ -139,13 +155,22 @@ class ActionOrder(object):
 
         self.active_trade_order.supplementary.update({"parent_action_order": {"state": self.state}})
 
+    def set_clock(self, clock):
+        """
+        sets the clock for the order's timestamps (see ActionOrderManager.add_order). None - the process wide clock.
+        """
+        self._clock = clock
+
+    def _time(self) -> float:
+        return (self._clock if self._clock is not None else get_clock()).time()
+
     # todo check if active_order is closed or cancelled
     def close_order(self):
         # self.close_active_order()
         self.status = "closed"
         self.active_trade_order = None
         self.order_command = ""
-        self.timestamp_close = time.time()
+        self.timestamp_close = self._time()
         if self._force_close:
             self.tags.append("#force_close")
 
@@ -177,7 +202,8 @@ class ActionOrder(object):
         :return: updates the self.order_command and returns it
 
         """
-        snapshot_before_update = self._snapshot()
+        snapshot_state_before_update = self._snapshot_state()
+        snapshot_before_update = self._cached_snapshot(snapshot_state_before_update)
 
         self.active_trade_order.update_order_from_exchange_resp(resp)
         self.market_data = market_data
@@ -191,9 +217,7 @@ class ActionOrder(object):
 
         self.filled = self._prev_filled + self.active_trade_order.filled
 
-        snapshot_after_update = self._snapshot()
-
-        if snapshot_before_update != snapshot_after_update:
+        if self._snapshot_state() != snapshot_state_before_update:
             self.changed_from_last_update = True
             self.previous_snapshot = snapshot_before_update
         else:
@@ -296,7 +320,8 @@ class ActionOrder(object):
         """
 
         report = dict((key, value) for key, value in self.__dict__.items()
-                      if not callable(value) and not key.startswith('__') and not isinstance(value, list)
+                      if not callable(value) and not key.startswith('__') and key not in self.UNTRACKED_FIELDS
+                      and not isinstance(value, list)
                       and not isinstance(value, dict))
 
         if len(self.tags) > 0:
@@ -313,12 +338,25 @@ class ActionOrder(object):
         if self.status != "closed" and self.active_trade_order is not None and self.active_trade_order.status == "open":
             self._force_close = True
             self.order_command = "cancel"
+            self._on_command_changed()
 
         elif self.active_trade_order is not None and self.active_trade_order.status not in ("closed", "canceled"):
             self._force_close = True
             self.close_order()
+            self._on_command_changed()
             # self.order_command = "cancel"
 
+    def set_command_listener(self, listener):
+        """
+        sets the function listener(order) which is called when the order's command is changed outside of the order
+        manager (see force_close), so the order manager proceeds the order without waiting for it's poll time
+        """
+        self._command_listener = listener
+
+    def _on_command_changed(self):
+        if self._command_listener is not None:
+            self._command_listener(self)
+
     def _create_next_trade_order_for_remained_amount(self, price):
         """
         creates the next trade order for unfilled amount of Action order
@@ -361,6 +399,29 @@ class ActionOrder(object):
         s = "ActionOrder " + self.__str_status__()
         return s
 
+    def _snapshot_state(self):
+        """
+        returns the cheap to compare state of the snapshot fields: the versions of tracked fields and the active trade
+        order's id and status
+        """
+        active_trade_order = self.__dict__.get("active_trade_order")
+
+        if active_trade_order is not None:
+            return self.version_of(*self._SNAPSHOT_FIELDS), active_trade_order.id, active_trade_order.status
+
+        return self.version_of(*self._SNAPSHOT_FIELDS), None, None
+
+    def _cached_snapshot(self, state):
+        """
+        returns the snapshot for the snapshot state. The snapshot is created only if the state was changed since the
+        last call.
+        """
+        if self._last_snapshot_state != state:
+            self._last_snapshot_state = state
+            self._last_snapshot = self._snapshot()
+
+        return self._last_snapshot
+
     def _snapshot(self):
         """
         returns snapshot of current ActionOrder
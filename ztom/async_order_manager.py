@@ -0,0 +1,190 @@
+from .trade_orders import TradeOrder
+from .action_order import ActionOrder
+from .order_manager import ActionOrderManager
+from .errors import *
+from . import utils
+import asyncio
+
+
+class AsyncActionOrderManager(ActionOrderManager):
+    """
+    ActionOrderManager which sends the exchange requests (creating, updating, cancelling of trade orders and fetching
+    the trades) of all the open ActionOrders concurrently via asyncio. The results are applied to the ActionOrders in the
+    same order and way as in ActionOrderManager, so the ActionOrders states transitions are the same.
+
+    Online mode requires the async ccxt exchange object to be initialized: exchange.init_async_exchange().
+
+    Usage:
+        om = AsyncActionOrderManager(exchange)
+        om.add_order(order)
+
+        while om.have_open_orders():
+            await om.proceed_orders_async()  # or om.proceed_orders() outside of the running event loop
+    """
+
+    async def _create_order_async(self, order: TradeOrder):
+
+        if self.exchange.offline and order.internal_id not in self.exchange._offline_orders_data:
+            self.exchange.add_offline_order_data(order, self.offline_order_updates,
+                                                 self.offline_order_zero_fill_updates)
+
+        self.log(self.LOG_DEBUG, "creating order")
+        return await self._get_retry_policy().run_async(lambda: self.exchange.place_limit_order_async(order),
+                                                        **self._retry_params("create order", order))
+
+    async def _update_order_async(self, order: TradeOrder):
+        self.log(self.LOG_DEBUG, "..updating trade order")
+        return await self._get_retry_policy().run_async(lambda: self.exchange.get_order_update_async(order),
+                                                        **self._retry_params("update order", order))
+
+    async def _cancel_order_async(self, order: TradeOrder):
+        return await self.exchange.cancel_order_async(order)
+
+    async def cancel_order_async(self, trade_order: TradeOrder):
+        policy = self._get_retry_policy()
+        state = self._pop_deferred_retry(trade_order, "cancel order")
+
+        cancel_attempt = state["attempt"] if state is not None else 0
+        started = state["started"] if state is not None else policy.time_func()
+
+        while cancel_attempt < self.max_cancel_attempts:
+            cancel_attempt += 1
+            error = None
+            try:
+                await self._cancel_order_async(trade_order)
+
+            except Exception as e:
+                error = e
+                self.log(self.LOG_ERROR, "Cancel error...")
+                self.log(self.LOG_ERROR, type(e).__name__)
+                self.log(self.LOG_ERROR, e.args)
+
+            self.log(self.LOG_DEBUG, "Updating the Trade Order to check if it was canceled or closed...")
+            try:
+                resp = await self._update_order_async(trade_order)
+            except OrderRequestDeferred:
+                self._keep_cancel_attempts(trade_order, cancel_attempt, started)
+                raise
+
+            self.log(self.LOG_DEBUG, "Update resp: {}".format(resp))
+            if resp is not None and "status" in resp and (resp["status"] == "closed"
+                                                          or resp["status"] == "canceled"):
+                self.log(self.LOG_DEBUG, "... canceled with status {}".format(resp["status"]))
+                return resp
+
+            if error is not None and cancel_attempt < self.max_cancel_attempts:
+                delay = policy.delay(cancel_attempt)
+                if self.defer_retries:
+                    self._defer_retry(trade_order, "cancel order", cancel_attempt, started, delay)
+
+                self.log(self.LOG_INFO, "Pause for {}s".format(delay))
+                await policy.sleep_async(delay)
+
+        return None
+
+    async def _get_trade_results_async(self, order: TradeOrder):
+        self.log(self.LOG_DEBUG, "getting trades")
+        return await self._get_retry_policy().run_async(lambda: self.exchange.get_trades_results_async(order),
+                                                        accept_empty=True, **self._retry_params("get trades"))
+
+    async def _order_io_async(self, order: ActionOrder) -> dict:
+        """
+        async version of ActionOrderManager._order_io
+        """
+        try:
+            return await self._send_order_requests_async(order)
+
+        except OrderRequestDeferred as e:
+            self.log(self.LOG_INFO, "ActionOrder {} {}".format(order.id, e.args[0]))
+            return {"action": self._order_action(order.order_command), "resp": None, "deferred": True}
+
+    async def _send_order_requests_async(self, order: ActionOrder) -> dict:
+        """
+        async version of ActionOrderManager._send_order_requests
+        """
+
+        order_action = self._order_action(order.order_command)
+        resp = None
+
+        if order_action == "new":
+            self.log(self.LOG_INFO, "ActionOrder {} creating new trade order for {} -{}-> {} amount {} price {}".format(
+                order.id, order.start_currency, order.side, order.dest_currency, order.get_active_order().amount,
+                order.get_active_order().price))
+
+            if order.get_active_order().status != "open":
+                resp = await self._create_order_async(order.get_active_order())
+            else:
+                raise OwaManagerError("Order already set")
+
+        elif order_action == "hold":
+
+            resp = self._bulk_order_updates.pop(order.get_active_order().id, None)
+            if resp is None:
+                resp = await self._update_order_async(order.get_active_order())
+
+            if resp is not None and self._is_closed_resp(resp):
+                self._on_trade_order_closed_resp(order, resp)
+
+                if self.request_trades and resp["filled"] > 0:
+                    trades = None
+                    try:
+                        trades = await self._get_trade_results_async(order.get_active_order())
+                        self._merge_trades_into_resp(resp, trades)
+
+                    except Exception as e:
+                        self._log_trades_error(e, trades)
+
+        elif order_action == "cancel":
+            self._log_cancelling(order)
+
+            resp = await self.cancel_order_async(order.get_active_order())
+
+            if resp is not None:
+                if self.request_trades:
+                    order.active_trade_order.update_order_from_exchange_resp(resp)  # workaround
+
+                    if order.get_active_order().filled > 0:
+                        trades = await self._get_trade_results_async(order.get_active_order())
+                        try:
+                            self._merge_trades_into_resp(resp, trades)
+                        except Exception as e:
+                            self._log_trades_error(e, trades)
+
+                self._on_trade_order_canceled_resp(order, resp)
+
+        else:
+            raise OwaManagerError("Unknown order command")
+
+        return {"action": order_action, "resp": resp}
+
+    async def proceed_orders_async(self):
+        """
+        sends the exchange requests for all open ActionOrders concurrently and then updates the ActionOrders with the
+        results one by one in the order of adding to the manager
+        """
+
+        self._last_update_closed_orders = list()
+        self._prev_orders_versions = dict()
+        self._proceed_order_events()
+        open_active_orders = self._due_orders()
+        self._prepare_data_for_orders(open_active_orders)
+        self._prepare_order_updates(open_active_orders)
+
+        for order in open_active_orders:
+            self._prev_orders_versions.setdefault(order.id, order.version)
+
+        io_results = await asyncio.gather(*[self._order_io_async(order) for order in open_active_orders])
+
+        for order, io_result in zip(open_active_orders, io_results):
+            self._apply_order_io(order, io_result)
+
+        # let's clean data_for_orders in the the end of orders iteration
+        self._reset_tick_data()
+        self._flush_journal()
+
+    def proceed_orders(self):
+        """
+        runs proceed_orders_async() in the event loop. Should not be called from the running event loop - use
+        "await proceed_orders_async()" instead.
+        """
+        utils.event_loop().run_until_complete(self.proceed_orders_async())
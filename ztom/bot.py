@@ -64,6 +64,8 @@ class Bot:
         self.offline_order_books_file = ""
         self.offline_markets_file = "test_data/markets.json"
 
+        self.array_order_books = False  # use ArrayOrderBook for order books fetched via get_order_books_async
+
 
 
         self.logger = logging
@@ -233,6 +235,12 @@ class Bot:
         else:
             self.exchange = ztom.ccxtExchangeWrapper.load_from_id(self.exchange_id)
 
+    def _get_clock(self):
+        """
+        clock of the exchange wrapper or the process wide clock if the exchange is not initialized
+        """
+        return self.exchange._get_clock() if self.exchange is not None else ztom.get_clock()
+
     def init_offline_mode(self):
         self.exchange.set_offline_mode(self.offline_markets_file, self.offline_tickers_file)
 
@@ -283,14 +291,16 @@ class Bot:
                 self.log(self.LOG_ERROR, "Exception body:", e.args)
 
                 self.log(self.LOG_ERROR, "Sleeping before next request")
-                time.sleep(self.request_sleep)
+                self._get_clock().sleep(self.request_sleep)
 
         if len(ob_array) < len(symbols):
             raise Exception("Could not fetch all order books. Fetched: {}".format(len(ob_array)))
 
+        order_book_class = ztom.ArrayOrderBook if self.array_order_books else ztom.OrderBook
+
         order_books = dict()
         for ob in ob_array:
-            order_books[ob["symbol"]] = ztom.OrderBook(ob["symbol"], ob["asks"], ob["bids"])
+            order_books[ob["symbol"]] = order_book_class(ob["symbol"], ob["asks"], ob["bids"])
 
         return order_books
 
@@ -317,7 +327,8 @@ class Bot:
             order_manager.order.filled,
             order_manager.order.amount))
 
-        now_order = datetime.now()
+        clock = self._get_clock()
+        now_order = clock.now()
 
         if order_manager.order.status == "open" and \
                 order_manager.order.update_requests_count >= self.order_update_requests_for_time_out:
@@ -330,9 +341,9 @@ class Bot:
 
                 if (now_order - order_manager.last_update_time).total_seconds() < self.order_update_time_out:
                     self.log(self.LOG_INFO, "...sleeping while order update for {}".format(self.order_update_time_out))
-                    time.sleep(self.order_update_time_out)
+                    clock.sleep(self.order_update_time_out)
 
-                order_manager.last_update_time = datetime.now()
+                order_manager.last_update_time = clock.now()
 
     def log_on_order_update_error(self, order_manager, exception):
         self.log(self.LOG_ERROR, "Error updating  order_id: {}".format(order_manager.order.id))
@@ -392,22 +403,22 @@ class Bot:
 
     def get_trade_results(self, order: TradeOrder):
 
-        results = list()
-        i = 0
-        while bool(results) is not True and i < self.max_trades_updates:
-            self.log(self.LOG_INFO, "getting trades #{}".format(i))
-            try:
-                results = self.exchange.get_trades_results(order)
-            except Exception as e:
-                self.log(self.LOG_ERROR, type(e).__name__)
-                self.log(self.LOG_ERROR, e.args)
-                self.log(self.LOG_INFO, "retrying to get trades... after sleep for {}s".format(self.request_sleep))
+        if self.max_trades_updates < 1:
+            return list()
 
-                time.sleep(self.request_sleep)
-                self.log(self.LOG_INFO, "sleep done")
-            i += 1
+        def on_error(e, attempt):
+            self.log(self.LOG_ERROR, type(e).__name__)
+            self.log(self.LOG_ERROR, e.args)
+
+        def before_retry(e, attempt, delay):
+            self.log(self.LOG_INFO, "retrying to get trades #{}... after sleep for {}s".format(attempt, delay))
+
+        self.log(self.LOG_INFO, "getting trades")
+        results = ztom.RetryPolicy.fixed(self.max_trades_updates, self.request_sleep,
+                                         clock=self._get_clock()).run(
+            lambda: self.exchange.get_trades_results(order), on_error=on_error, before_retry=before_retry)
 
-        return results
+        return results if results is not None else list()
 
     def create_recovery_data(self, deal_uuid, start_cur: str, dest_cur: str, start_amount: float,
                              best_dest_amount: float, leg: int) -> dict:
@@ -419,7 +430,7 @@ class Bot:
         recovery_dict["start_amount"] = start_amount
         recovery_dict["best_dest_amount"] = best_dest_amount
         recovery_dict["leg"] = leg  # order leg to recover from
-        recovery_dict["timestamp"] = time.time()
+        recovery_dict["timestamp"] = self._get_clock().time()
 
         return recovery_dict
 
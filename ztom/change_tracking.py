@@ -0,0 +1,127 @@
+class ChangeTracking(object):
+    """
+    Mixin for the compact change tracking of object's fields listed in TRACKED_FIELDS.
+
+    Every assignment of the new value to the tracked field increments the object's version, stores it as the field's
+    version and sets the field's bit in the dirty bitmask. So the changes could be checked without copying the object:
+
+        v = order.version
+        ...
+        if order.version != v:
+            changes = order.changes_since(v)  # {field: value}
+
+        if order.dirty:
+            report(order.changes_since_clear())
+            order.clear_dirty()
+
+    Tracking data is stored in the object's attributes listed in UNTRACKED_FIELDS, so it's not included into the
+    orders reports and the journal.
+    """
+
+    TRACKED_FIELDS = ()
+
+    UNTRACKED_FIELDS = frozenset({"_version", "_dirty", "_field_versions"})
+    """
+    runtime attributes which are not the object's data: their changes are not tracked and they are excluded from the
+    reports and the orders journal. Subclasses extend the set with their own runtime attributes.
+    """
+
+    _tracked_bits = dict()  # {field: bit}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        both = cls.UNTRACKED_FIELDS.intersection(cls.TRACKED_FIELDS)
+        if both:
+            raise TypeError("{} fields are both tracked and untracked: {}".format(cls.__name__, sorted(both)))
+
+        cls._tracked_bits = {field: 1 << i for i, field in enumerate(cls.TRACKED_FIELDS)}
+
+    def __setattr__(self, name, value):
+        if name in self.UNTRACKED_FIELDS:
+            object.__setattr__(self, name, value)
+            return
+
+        bit = self._tracked_bits.get(name)
+
+        if bit is not None:
+            d = self.__dict__
+            old = d.get(name, ChangeTracking)
+            if old is not value and old != value:
+                version = d.get("_version", 0) + 1
+                d["_version"] = version
+                d["_dirty"] = d.get("_dirty", 0) | bit
+
+                field_versions = d.get("_field_versions")
+                if field_versions is None:
+                    field_versions = d["_field_versions"] = dict()
+                field_versions[name] = version
+
+        object.__setattr__(self, name, value)
+
+    def __copy__(self):
+        cls = self.__class__
+        result = cls.__new__(cls)
+        result.__dict__.update(self.__dict__)
+        if "_field_versions" in self.__dict__:
+            result._field_versions = dict(self._field_versions)
+        return result
+
+    @property
+    def version(self) -> int:
+        """
+        incremented on every change of tracked field
+        """
+        return self.__dict__.get("_version", 0)
+
+    @property
+    def dirty(self) -> int:
+        """
+        bitmask of fields changed since the last clear_dirty()
+        """
+        return self.__dict__.get("_dirty", 0)
+
+    def version_of(self, *fields) -> int:
+        """
+        returns the last version when any of the fields was changed (0 if was not changed)
+        """
+        field_versions = self.__dict__.get("_field_versions", {})
+        return max((field_versions.get(f, 0) for f in fields), default=0)
+
+    def changed_fields_since(self, version: int) -> list:
+        """
+        returns the list of tracked fields changed after the version
+        """
+        field_versions = self.__dict__.get("_field_versions", {})
+        return [f for f in self.TRACKED_FIELDS if field_versions.get(f, 0) > version]
+
+    def changes_since(self, version: int) -> dict:
+        """
+        returns the dict of tracked fields changed after the version with their current values
+        """
+        return {f: getattr(self, f) for f in self.changed_fields_since(version)}
+
+    def is_dirty(self, *fields) -> bool:
+        """
+        returns True if any of fields (or any tracked field if fields are not set) was changed since the last
+        clear_dirty()
+        """
+        if not fields:
+            return self.dirty != 0
+
+        mask = 0
+        for f in fields:
+            mask |= self._tracked_bits[f]
+        return self.dirty & mask != 0
+
+    def dirty_fields(self) -> list:
+        return [f for f in self.TRACKED_FIELDS if self.dirty & self._tracked_bits[f]]
+
+    def changes_since_clear(self) -> dict:
+        """
+        returns the dict of tracked fields changed since the last clear_dirty() with their current values
+        """
+        return {f: getattr(self, f) for f in self.dirty_fields()}
+
+    def clear_dirty(self):
+        self._dirty = 0
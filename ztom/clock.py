@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+
+class Clock(object):
+    """
+    Source of the current time and of the pauses for throttles, timers, exchange wrapper, orders and order managers.
+    The default clock is the system's one.
+
+    Components take the clock passed to them (clock attribute or parameter) or the process wide clock returned by
+    get_clock(), so the whole framework could be switched to the virtual time with set_clock(VirtualClock()).
+    """
+
+    virtual = False
+
+    def time(self) -> float:
+        """
+        current timestamp in seconds
+        """
+        return time.time()
+
+    def now(self) -> datetime:
+        """
+        current local date and time
+        """
+        return datetime.fromtimestamp(self.time())
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    async def sleep_async(self, seconds: float):
+        await asyncio.sleep(seconds if seconds > 0 else 0)
+
+
+class VirtualClock(Clock):
+    """
+    Clock for the offline mode and backtests: time is changed only by advance(), set_time() and sleep(), which moves
+    the time forward without the real pause. So the throttles, retries and timeouts do not wait and the timestamps of
+    orders and responses depend only on the replayed data.
+
+    In offline mode ccxtExchangeWrapper moves the virtual clock to the timestamps of the replayed tickers (see
+    ccxtExchangeWrapper.fetch_tickers).
+
+    Usage:
+        ztom.set_clock(ztom.VirtualClock())
+        exchange.set_offline_mode("markets.json", "tickers.csv")
+    """
+
+    virtual = True
+
+    def __init__(self, start: float = 0.0):
+        """
+        :param start: initial timestamp in seconds
+        """
+        self._time = float(start)
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        return self._time
+
+    def advance(self, seconds: float) -> float:
+        """
+        moves the time forward by seconds and returns the new time
+        """
+        with self._lock:
+            if seconds > 0:
+                self._time += seconds
+            return self._time
+
+    def set_time(self, timestamp: float) -> float:
+        """
+        sets the time to timestamp if it's later than the current time (virtual time never goes back) and returns the
+        new time
+        """
+        with self._lock:
+            if timestamp > self._time:
+                self._time = float(timestamp)
+            return self._time
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+
+    async def sleep_async(self, seconds: float):
+        self.advance(seconds)
+        await asyncio.sleep(0)  # let other tasks run
+
+
+_clock = Clock()
+
+
+def get_clock() -> Clock:
+    """
+    returns the process wide clock
+    """
+    return _clock
+
+
+def set_clock(clock: Clock = None) -> Clock:
+    """
+    sets the process wide clock and returns the previous one
+
+    :param clock: Clock object. None - system's clock
+    """
+    global _clock
+    previous = _clock
+    _clock = clock if clock is not None else Clock()
+    return previous
+
+
+def current_time() -> float:
+    """
+    current timestamp in seconds of the process wide clock. Default time_func of the components with injectable time
+    """
+    return _clock.time()
@@ -0,0 +1,219 @@
+import functools
+from .clock import current_time
+
+
+class DataRequest(object):
+    """
+    Parsed data request from the order command: "KEY [PARAM1 [PARAM2 ...]]". Params are used as the path to the
+    requested value in the data dict {KEY: {PARAM1: {PARAM2: value}}}.
+    """
+
+    __slots__ = ("text", "key", "key_lower", "params", "params_str", "path")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.path = tuple(text.split(" "))  # key and params as in the original command
+        self.key = self.path[0]
+        self.key_lower = self.key.lower()
+        self.params = self.path[1:]
+        self.params_str = " ".join(self.params)
+
+    def __repr__(self):
+        return "DataRequest({!r})".format(self.text)
+
+
+class CompiledCommand(object):
+    """
+    Parsed order command: "ACTION [DATA_REQUEST[; DATA_REQUEST ...]]"
+    """
+
+    __slots__ = ("command", "action", "data_requests", "requests")
+
+    def __init__(self, command: str, delimiter: str = ";"):
+        self.command = command
+
+        command_split = command.split(" ", 1)
+        self.action = command_split[0]
+
+        if len(command_split) > 1:
+            self.data_requests = [dr.strip() for dr in command_split[1].split(delimiter) if dr.strip() != ""]
+        else:
+            self.data_requests = None  # no data requests part in command
+
+        self.requests = tuple(compile_data_request(dr) for dr in self.data_requests or list())
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_command(command: str, delimiter: str = ";") -> CompiledCommand:
+    """
+    returns the parsed order command. Results are cached by the command string, so the commands which are repeated on
+    every proceed_orders() are parsed only once.
+    """
+    return CompiledCommand(command, delimiter)
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_data_request(data_request: str) -> DataRequest:
+    """
+    returns the parsed data request cached by the request string
+    """
+    return DataRequest(data_request)
+
+
+def value_from_path(src, path):
+    """
+    returns the value from the nested dicts by the path of keys without copying the dicts. Keys are matched exactly or
+    case insensitive if there is no exact match. Returns None if the path is not found.
+
+    :param src: dict
+    :param path: list of keys
+    """
+    s = src
+    for p in path:
+        if not isinstance(s, dict):
+            return None
+
+        if p in s:
+            s = s[p]
+            continue
+
+        p_upper = p.upper()
+        for key in s:
+            if isinstance(key, str) and key.upper() == p_upper:
+                s = s[key]
+                break
+        else:
+            return None
+
+    return s
+
+
+class DataProvider(object):
+    """
+    Source of data for the data requests with the same key.
+
+    :param func: function func(params_str) which returns the data for the request's params
+    :param cost: cost of the single call (for example the weight of exchange request). Total cost of the calls is
+    accumulated in DataProviderRegistry.spent_cost
+    :param freshness: time in seconds the fetched value could be reused. If 0 - value is reused only during the
+    current tick (proceed_orders())
+    :param key_params: number of request's params which define the fetched value (the rest params are used as the path
+    within the value). None - all the params.
+    """
+
+    def __init__(self, key: str, func, cost: float = 1, freshness: float = 0.0, key_params: int = None):
+        self.key = key.lower()
+        self.func = func
+        self.cost = cost
+        self.freshness = freshness
+        self.key_params = key_params
+
+    def cache_key(self, request: DataRequest):
+        params = request.params if self.key_params is None else request.params[:self.key_params]
+        return self.key, " ".join(params)
+
+
+class DataProviderRegistry(object):
+    """
+    Registry of DataProviders by the data request key with the cache of fetched values shared between the orders.
+
+    Values of providers with zero freshness are cached only during the tick (between start_tick() and end_tick()), so
+    outside the tick every request calls the provider.
+
+    Usage:
+        registry = DataProviderRegistry()
+        registry.register("depth", fetch_depth, cost=5, freshness=1.0, key_params=1)
+
+        registry.start_tick()
+        value = registry.value(compile_data_request("depth ETH/BTC bids"))
+        registry.end_tick()
+    """
+
+    def __init__(self, time_func=current_time):
+        self.time_func = time_func
+        self.providers = dict()  # {key in lower case: DataProvider}
+
+        self._cache = dict()  # {(key, params): (timestamp, value)} for providers with freshness > 0
+        self._tick_cache = None  # {(key, params): value} for the current tick
+
+        self.spent_cost = 0  # total cost of provider's calls
+        self.calls = 0  # number of provider's calls
+        self.cache_hits = 0
+
+    def __contains__(self, key):
+        return key.lower() in self.providers
+
+    def register(self, key: str, func, cost: float = 1, freshness: float = 0.0,
+                 key_params: int = None) -> DataProvider:
+        """
+        registers the provider for the data request key. Previously registered provider for the key is replaced.
+        See DataProvider for parameters.
+        """
+        provider = DataProvider(key, func, cost, freshness, key_params)
+        self.providers[provider.key] = provider
+        self.invalidate(key)
+        return provider
+
+    def unregister(self, key: str):
+        self.providers.pop(key.lower(), None)
+        self.invalidate(key)
+
+    def get(self, key: str) -> DataProvider:
+        return self.providers.get(key.lower())
+
+    def start_tick(self):
+        self._tick_cache = dict()
+
+    def end_tick(self):
+        self._tick_cache = None
+
+    def invalidate(self, key: str = None):
+        """
+        removes the cached values of the key or all the cached values if key is not set
+        """
+        if key is None:
+            self._cache = dict()
+            if self._tick_cache is not None:
+                self._tick_cache = dict()
+            return
+
+        key = key.lower()
+        self._cache = {k: v for k, v in self._cache.items() if k[0] != key}
+        if self._tick_cache is not None:
+            self._tick_cache = {k: v for k, v in self._tick_cache.items() if k[0] != key}
+
+    def fetch(self, request: DataRequest):
+        """
+        returns the data fetched by the provider for the request (or cached value) without applying the request's path.
+        Raises KeyError if there is no provider for the request key.
+        """
+        provider = self.providers[request.key_lower]
+        cache_key = provider.cache_key(request)
+
+        if self._tick_cache is not None and cache_key in self._tick_cache:
+            self.cache_hits += 1
+            return self._tick_cache[cache_key]
+
+        if provider.freshness > 0 and cache_key in self._cache:
+            timestamp, value = self._cache[cache_key]
+            if self.time_func() - timestamp <= provider.freshness:
+                self.cache_hits += 1
+                return value
+
+        value = provider.func(request.params_str)
+        self.calls += 1
+        self.spent_cost += provider.cost
+
+        if provider.freshness > 0:
+            self._cache[cache_key] = (self.time_func(), value)
+
+        if self._tick_cache is not None:
+            self._tick_cache[cache_key] = value
+
+        return value
+
+    def value(self, request: DataRequest):
+        """
+        returns the requested value: data from provider resolved by the request's path
+        """
+        return value_from_path({request.key: self.fetch(request)}, request.path)
@@ -23,6 +23,11 @@ class OwaManagerCancelAttemptsExceeded(Exception):
     pass
 
 
+class OrderRequestDeferred(OwaManagerError):
+    """Raised by order manager when the failed request of order should be retried on the later update"""
+    pass
+
+
 class TickerError(Exception):
     pass
 
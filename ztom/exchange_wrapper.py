@@ -4,18 +4,43 @@ import asyncio
 import csv
 import json
 import uuid
-import time
-import datetime
+import threading
+import contextlib
+import functools
+import contextvars
 from . import exchanges
 from . import core
-from .throttle import Throttle
+from . import utils
+from .throttle import Throttle, WindowThrottle, CompositeThrottle
+from .market_data import MarketDataCache, MarketDataStream, MarketDataTransport
+from .order_events import OrderEventsStream, OrderEventsTransport
+from .matching_engine import OfflineMatchingEngine
+from .clock import Clock, get_clock
+from .tickers_csv import IndexedTickersCsv, iter_tickers_csv
+from .tick_archive import TickArchive
+from .order_books_csv import OrderBooksColumns, load_order_books_csv
 from .trade_orders import TradeOrder
-from typing import TypeVar
+from typing import TypeVar, List
 import copy
 
 EW = TypeVar('EW', bound='ccxtExchangeWrapper')
 
 
+def _offline_orders_locked(method):
+    """
+    runs the method under the lock of offline orders data, which is shared with the order events transport running in
+    the other thread (see SimulatedOrderEventsTransport)
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._offline_orders_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+# holder {"headers": response headers} of the request made within _rate_limit_feedback in the current thread or task
+_response_headers = contextvars.ContextVar("response_headers", default=None)
+
+
 class ExchangeWrapperError(Exception):
     """Basic exception for errors raised by ccxtExchangeWrapper"""
     pass
@@ -60,6 +85,17 @@ class ccxtExchangeWrapper:
                 "fetch_my_trades": 1,
                 "fetch_balance": 1
             }
+         REQUEST_LIMITS: dict of the several limits enforced by exchange at once, used by enable_requests_limits. None if
+          not declared. See CompositeThrottle.from_limits for the format. Buckets without "weights" use
+          REQUEST_TYPE_WIGHTS. Example:
+              REQUEST_LIMITS = {
+                "weight": {"period": 60, "requests_per_period": 1200},
+                "orders_10s": {"period": 10, "requests_per_period": 100, "weights": {"create_order": 1}}
+            }
+         OPEN_ORDERS_WEIGHT: weight (in "single" requests) of fetching the open orders for one symbol
+         ALL_OPEN_ORDERS_WEIGHT: weight (in "single" requests) of fetching the open orders for all the symbols
+         SYMBOL_TRADES_FETCHING: True if the trades of several orders of the symbol could be collected from the single
+          fetch_my_trades request (see get_orders_trades_results)
     """
     _ccxt = None  # type: ccxt.Exchange
     _async_ccxt = ...  # type accxt.Exchange
@@ -80,6 +116,16 @@ class ccxtExchangeWrapper:
         "fetch_my_trades": 1,
         "fetch_balance": 1
     }
+    REQUEST_LIMITS = None
+    RATE_LIMIT_HEADERS = None
+
+    RATE_LIMIT_BACKOFF_SECONDS = 1.0  # initial backoff on "too many requests" errors, doubles on consecutive errors
+    RATE_LIMIT_MAX_BACKOFF_SECONDS = 120.0
+
+    OPEN_ORDERS_WEIGHT = 1
+    ALL_OPEN_ORDERS_WEIGHT = 1
+
+    SYMBOL_TRADES_FETCHING = True
 
     @classmethod
     def load_from_id(cls, exchange_id, api_key=None, secret=None, offline=False) -> EW:
@@ -125,6 +171,9 @@ class ccxtExchangeWrapper:
         self.wrapper_id = "generic"
 
         self.requests_throttle = None  # type: Throttle
+        self.throttle_wait = False  # if True - requests wait for the throttle's budget (see enable_requests_throttle)
+        self.adaptive_throttle = False  # if True - throttle is corrected from the exchange's rate limit headers
+        self.rate_limit_errors = 0  # number of consecutive rate limit errors
         self.offline = offline
 
         # if True than return trades in order update response.
@@ -153,16 +202,180 @@ class ccxtExchangeWrapper:
 
         self._offline_trades = list()
 
+        self.offline_matching_engine = None  # type: OfflineMatchingEngine
+
+        self.clock = None  # type: Clock  # if None - the process wide clock is used (see ztom.clock.get_clock)
+        self.offline_tickers_interval = 1.0  # seconds the virtual clock advances on the offline tickers fetch
+
         # _offline_orders_data - dict of off-line orders data as {order_id: {
         #                                                               "_offline_order": {}
         #                                                               "_offline_order_update_index": int
         #                                                               "_offline_order_cancelled": {}
         #                                                               "_offline_order_trades" : {}
         self._offline_orders_data = dict()
+        self._offline_orders_lock = threading.RLock()
         self.markets_json_file = str
         self.tickers_csv_file = str
 
-    def enable_requests_throttle(self, period=None, requests_per_period=None, request_type_weights=None):
+        self.market_data_stream = None  # type: MarketDataStream
+        self.order_events_stream = None  # type: OrderEventsStream
+        self.market_data_max_age = 1.0  # max age in seconds of streamed data to be used instead of fetching
+        self._subscribed_all_tickers = False
+
+        self.max_concurrent_requests = None  # max number of requests sent concurrently from different threads
+        self._requests_semaphore = None  # type: threading.BoundedSemaphore
+
+    def set_market_data_transport(self, transport: MarketDataTransport, max_age: float = None,
+                                  cache: MarketDataCache = None):
+        """
+        Sets the async transport for streaming market data. The data received from the subscriptions (see
+        subscribe_tickers and subscribe_order_book) is kept in the last-value cache and used by fetch_tickers and
+        fetch_order_book while it's fresh, without the requests to exchange.
+
+        Args:
+            transport: MarketDataTransport object (websocket client, local simulated feed)
+            max_age: max age in seconds of the cached data to be considered fresh. If not set -
+             self.market_data_max_age is used
+            cache: MarketDataCache object, new cache will be created if not set
+
+        Returns:
+            MarketDataStream object
+        """
+        if self.market_data_stream is not None:
+            self.market_data_stream.stop()
+
+        if max_age is not None:
+            self.market_data_max_age = max_age
+
+        self.market_data_stream = MarketDataStream(transport, cache if cache is not None else
+                                                   MarketDataCache(time_func=self._time))
+        self._subscribed_all_tickers = False
+        return self.market_data_stream
+
+    def _market_data_stream_required(self):
+        if self.market_data_stream is None:
+            raise ExchangeWrapperError("Market data transport is not set. Use set_market_data_transport() first")
+
+    def subscribe_tickers(self, symbols: list = None, start: bool = True):
+        """
+        Subscribes to the tickers stream for the list of symbols or all the tickers if symbols are not set.
+
+        Args:
+            symbols: list of symbols or None for all tickers
+            start: start consuming the stream in the background thread
+
+        """
+        self._market_data_stream_required()
+
+        if symbols is None:
+            self._subscribed_all_tickers = True
+            self.market_data_stream.subscribe("tickers")
+        else:
+            for symbol in symbols:
+                self.market_data_stream.subscribe("tickers", symbol)
+
+        if start:
+            self.market_data_stream.start()
+
+    def subscribe_order_book(self, symbol: str, length=None, start: bool = True):
+        """
+        Subscribes to the order book stream for the symbol.
+
+        Args:
+            symbol: string with symbol
+            length: requested order book depth. If not set the self.order_book_length will be used
+            start: start consuming the stream in the background thread
+        """
+        self._market_data_stream_required()
+
+        length = self.order_book_length if not length else length
+        self.market_data_stream.subscribe("order_book", symbol, {"length": length})
+
+        if start:
+            self.market_data_stream.start()
+
+    def stop_market_data(self):
+        """
+        Stops the market data stream. Cached data stays available till it's fresh.
+        """
+        if self.market_data_stream is not None:
+            self.market_data_stream.stop()
+
+    def set_order_events_transport(self, transport: OrderEventsTransport) -> OrderEventsStream:
+        """
+        Sets the async transport of the user's orders execution reports (see OrderEventsTransport). Received events are
+        collected in the self.order_events_stream and taken by pop_order_events().
+
+        Args:
+            transport: OrderEventsTransport object (user data websocket client, SimulatedOrderEventsTransport)
+
+        Returns:
+            OrderEventsStream object
+        """
+        if self.order_events_stream is not None:
+            self.order_events_stream.stop()
+
+        self.order_events_stream = OrderEventsStream(transport)
+        return self.order_events_stream
+
+    def subscribe_order_events(self, start: bool = True):
+        """
+        Starts consuming the order events stream in the background thread (if start is set).
+        """
+        if self.order_events_stream is None:
+            raise ExchangeWrapperError("Order events transport is not set. Use set_order_events_transport() first")
+
+        if start:
+            self.order_events_stream.start()
+
+    def pop_order_events(self) -> list:
+        """
+        Returns the order events received since the last call in the order of receiving. Empty list if the order events
+        transport is not set.
+        """
+        if self.order_events_stream is None:
+            return list()
+
+        return self.order_events_stream.pop_events()
+
+    def stop_order_events(self):
+        if self.order_events_stream is not None:
+            self.order_events_stream.stop()
+
+    def _cached_tickers(self, symbol: str = None):
+        """
+        returns the tickers from market data cache if they are fresh or None
+        """
+        if self.market_data_stream is None:
+            return None
+
+        cache = self.market_data_stream.cache
+
+        if symbol is None:
+            return cache.get_tickers(self.market_data_max_age) if self._subscribed_all_tickers else None
+
+        ticker = cache.get_ticker(symbol, self.market_data_max_age)
+
+        if ticker is None and self._subscribed_all_tickers:
+            # stream is alive, but there was no ticker change for symbol
+            ticker = cache.get_last_ticker(symbol, self.market_data_max_age)
+
+        return {symbol: ticker} if ticker is not None else None
+
+    def _cached_order_book(self, symbol: str):
+        """
+        returns the order book from the market data cache if it's fresh or None
+        """
+        if self.market_data_stream is None:
+            return None
+
+        order_book = self.market_data_stream.cache.get_order_book(symbol, self.market_data_max_age)
+        if order_book is not None:
+            order_book["symbol"] = symbol
+        return order_book
+
+    def enable_requests_throttle(self, period=None, requests_per_period=None, request_type_weights=None,
+                                 window: str = None, wait: bool = False):
         """
         Enables the requests counting anf throttling (creates the requests_throttle object). If not called or
         self.requests_throttle is None the counting of requests counting will not occur.
@@ -170,8 +383,19 @@ class ccxtExchangeWrapper:
         If passed parameters will be not set, the default wrapper's parameters (PERIOD_SECONDS, REQUESTS_PER_PERIOD,
            REQUEST_TYPE_WIGHTS) will be used.
 
+        Passed request_type_weights are merged over the wrapper's REQUEST_TYPE_WIGHTS: the weights of passed request
+        types are replaced and the other request types keep the wrapper's weights (not the Throttle's defaults). So
+        the exchange specific weights are not lost when only some of them are changed.
+
         For arguments definition bee the Throttle class reference.
 
+        Args:
+            request_type_weights: dict {request type: weight} of weights to be changed
+            window: None - use Throttle, "sliding" or "fixed" - use thread-safe WindowThrottle with respective window
+            mode
+            wait: if True - the wrapper's requests will wait for the throttle's budget via Throttle.acquire() in
+            accordance to the request type priority. If False - the requests are only counted.
+
         Returns:
             Nothing. Just set's the self.requests_throttle with the initiated Throttle object
         """
@@ -182,10 +406,234 @@ class ccxtExchangeWrapper:
         if requests_per_period is None:
             requests_per_period = self.REQUESTS_PER_PERIOD
 
-        if request_type_weights is None:
-            request_type_weights = self.REQUEST_TYPE_WIGHTS
+        # passed weights override the wrapper's defaults
+        weights = dict(self.REQUEST_TYPE_WIGHTS)
+        if request_type_weights is not None:
+            weights.update(request_type_weights)
+
+        if window is None:
+            self.requests_throttle = Throttle(period, requests_per_period, weights)
+
+        elif window in ("sliding", "fixed"):
+            self.requests_throttle = WindowThrottle(period, requests_per_period, weights, sliding=window == "sliding")
+
+        else:
+            raise ExchangeWrapperError("Unknown throttle window {}".format(window))
+
+        self.requests_throttle.clock = self.clock
+        self.throttle_wait = wait
+
+    def enable_requests_limits(self, limits: dict = None, wait: bool = False):
+        """
+        Enables the requests counting and throttling against the several exchange's limits at once (for example request
+        weight per minute, orders per 10 seconds and orders per day): creates the CompositeThrottle as
+        self.requests_throttle. Throttle's sleep time is the sleep time of the most restrictive limit.
+
+        Args:
+            limits: limits declaration (see CompositeThrottle.from_limits). If not set - wrapper's REQUEST_LIMITS are
+            used, or if they are not declared - the single limit from PERIOD_SECONDS and REQUESTS_PER_PERIOD.
+            wait: if True - the wrapper's requests will wait for the throttle's budget (see enable_requests_throttle)
+
+        Returns:
+            Nothing. Just set's the self.requests_throttle with the initiated CompositeThrottle object
+        """
+
+        if limits is None:
+            limits = self.REQUEST_LIMITS
+
+        if limits is None:
+            limits = {"weight": {"period": self.PERIOD_SECONDS, "requests_per_period": self.REQUESTS_PER_PERIOD}}
+
+        self.requests_throttle = CompositeThrottle.from_limits(limits, self.REQUEST_TYPE_WIGHTS)
+        self.requests_throttle.clock = self.clock
+        self.throttle_wait = wait
+
+    def enable_adaptive_throttle(self, enabled: bool = True):
+        """
+        Enables the adaptive throttling: after every online request the throttle's count of used requests is corrected
+        with the values reported by exchange in the response headers (RATE_LIMIT_HEADERS), and on the exchange's "too
+        many requests" errors (HTTP 429/418: ccxt.RateLimitExceeded, ccxt.DDoSProtection) the throttle is blocked for
+        the backoff time: from the "Retry-After" header or RATE_LIMIT_BACKOFF_SECONDS doubled on every consecutive
+        error.
+
+        If the throttle was not enabled - enables it via enable_requests_limits().
+
+        Args:
+            enabled: True to enable, False to disable
+        """
+        if enabled and self.requests_throttle is None:
+            self.enable_requests_limits()
+
+        self.adaptive_throttle = enabled
+        self.rate_limit_errors = 0
+
+    @staticmethod
+    def _header_value(headers: dict, name: str):
+        name = name.lower()
+        for key, value in headers.items():
+            if key.lower() == name:
+                return value
+        return None
+
+    def _on_rate_limit_headers(self, headers: dict):
+        """
+        corrects the throttle with the used requests reported in the response headers
+        """
+        if not headers or not self.RATE_LIMIT_HEADERS or not hasattr(self.requests_throttle, "set_used_requests"):
+            return
+
+        buckets = getattr(self.requests_throttle, "buckets", None)
 
-        self.requests_throttle = Throttle(period, requests_per_period, request_type_weights)
+        for i, (limit_name, header) in enumerate(self.RATE_LIMIT_HEADERS.items()):
+            value = self._header_value(headers, header)
+            if value is None:
+                continue
+
+            try:
+                used = float(value)
+            except ValueError:
+                continue
+
+            if buckets is not None:
+                if limit_name in buckets:
+                    self.requests_throttle.set_used_requests(used, bucket=limit_name)
+
+            elif i == 0:
+                # single window throttle is corrected with the first limit
+                self.requests_throttle.set_used_requests(used)
+
+    def _on_rate_limit_error(self, headers: dict):
+        """
+        blocks the throttle for the backoff time after the exchange's rate limit error
+        """
+        backoff = None
+        retry_after = self._header_value(headers, "Retry-After") if headers else None
+        if retry_after is not None:
+            try:
+                backoff = float(retry_after)
+            except ValueError:
+                backoff = None
+
+        with self.requests_throttle.lock:
+            self.rate_limit_errors += 1
+
+            if backoff is None:
+                backoff = min(self.RATE_LIMIT_BACKOFF_SECONDS * 2 ** (self.rate_limit_errors - 1),
+                              self.RATE_LIMIT_MAX_BACKOFF_SECONDS)
+
+            self.requests_throttle.backoff(backoff)
+
+    @staticmethod
+    def _hook_response_headers(exchange) -> bool:
+        """
+        wraps the ccxt exchange's on_rest_response (called with the headers of every response), so the headers of the
+        request are saved to the holder of the current thread or asyncio task set by _rate_limit_feedback
+
+        :return: False if the exchange object has no on_rest_response
+        """
+        if getattr(exchange, "_ztom_response_headers_hook", False):
+            return True
+
+        on_rest_response = getattr(exchange, "on_rest_response", None)
+        if on_rest_response is None:
+            return False
+
+        def hook(code, reason, url, method, headers, *args, **kwargs):
+            holder = _response_headers.get()
+            if holder is not None:
+                holder["headers"] = headers
+            return on_rest_response(code, reason, url, method, headers, *args, **kwargs)
+
+        exchange.on_rest_response = hook
+        exchange._ztom_response_headers_hook = True
+        return True
+
+    @contextlib.contextmanager
+    def _rate_limit_feedback(self, exchange=None):
+        """
+        context manager for the online requests to exchange: in adaptive throttle mode passes the exchange's rate limit
+        headers or errors of the request made within the context to the throttle
+
+        Args:
+            exchange: ccxt exchange object which makes the request. self._ccxt by default
+        """
+        if not self.adaptive_throttle or self.requests_throttle is None:
+            yield
+            return
+
+        exchange = exchange if exchange is not None else self._ccxt
+
+        # the exchange's last_response_headers could be already overwritten by the concurrent request, so the headers
+        # are taken from the response of this request where possible
+        holder = dict() if self._hook_response_headers(exchange) else None
+        token = _response_headers.set(holder)
+
+        def headers():
+            if holder is not None:
+                return holder.get("headers")
+            return getattr(exchange, "last_response_headers", None)
+
+        try:
+            yield
+        except (ccxt.DDoSProtection, ccxt.RateLimitExceeded):
+            self._on_rate_limit_error(headers())
+            raise
+        finally:
+            _response_headers.reset(token)
+
+        with self.requests_throttle.lock:
+            self.rate_limit_errors = 0
+        self._on_rate_limit_headers(headers())
+
+    def _requests_throttle(self, request_type: str, requests: int = 1, priority: int = None):
+        """
+        counts the request in the requests throttle (if it's enabled). If self.throttle_wait is set - waits till the
+        throttle's budget is available for the request and the requests with higher priority are served.
+
+        :param priority: priority of the request (see ThrottleAcquireMixin.acquire). If not set - the priority of the
+        request type
+        """
+        if self.requests_throttle is None:
+            return
+
+        if self.throttle_wait:
+            self.requests_throttle.acquire(request_type, priority=priority, requests=requests)
+        else:
+            self.requests_throttle.add_request(request_type=request_type, requests=requests)
+
+    def set_max_concurrent_requests(self, max_concurrent_requests: int = None):
+        """
+        Limits the number of requests which could be sent concurrently to the exchange from different threads (for
+        example by the ActionOrderManager running in executor mode). The limit is shared by all the users of the wrapper
+        object.
+
+        Args:
+            max_concurrent_requests: max number of concurrent requests. None - no limit.
+        """
+        if max_concurrent_requests is not None and max_concurrent_requests < 1:
+            raise ExchangeWrapperError("Bad max_concurrent_requests {}".format(max_concurrent_requests))
+
+        self.max_concurrent_requests = max_concurrent_requests
+        self._requests_semaphore = threading.BoundedSemaphore(max_concurrent_requests) \
+            if max_concurrent_requests is not None else None
+
+    @contextlib.contextmanager
+    def requests_slot(self):
+        """
+        Context manager which waits for the free slot within the max_concurrent_requests limit (if it's set) and holds
+        it during the requests made within the context.
+
+        Usage:
+            with exchange.requests_slot():
+                exchange.get_order_update(order)
+        """
+        semaphore = self._requests_semaphore
+        if semaphore is None:
+            yield
+            return
+
+        with semaphore:
+            yield
 
     def _load_markets(self):
         """
@@ -216,26 +664,32 @@ class ccxtExchangeWrapper:
             params = dict()
         return self._ccxt.fetch_order_book(symbol, length, params)
 
-    def fetch_order_book(self, symbol: str, length=None, params=None):
+    def fetch_order_book(self, symbol: str, length=None, params=None, priority: int = None):
         """
         Fetches order books from exchange or from offline data (in offline mode). If the throttling is enabled,
-        the requests with the weight of "fetch_order_book" will be counted.
+        the requests with the weight of "fetch_order_book" will be counted. If the order book is subscribed via
+        subscribe_order_book() and fresh order book is in the market data cache - the cached order book is returned.
         Args:
             symbol: string with symbol in ccxt format (ex "ETH/BTC")
             length: int of depth for requested order book if not set the self.order_book_length will be used
             params:
+            priority: priority of the request in the throttle's queue (see Throttle.acquire). If not set - the
+             priority of the request type is used
 
         Returns: list which contains order book in ccxt format
 
         """
 
-        result = None
-        if self.requests_throttle is not None:
-            self.requests_throttle.add_request(request_type="fetch_order_book")
+        result = self._cached_order_book(symbol)
+        if result is not None:
+            return result
+
+        self._requests_throttle("fetch_order_book", priority=priority)
 
         if not self.offline:
             length = self.order_book_length if not length else length
-            result = self._fetch_order_book(symbol, length, params)
+            with self._rate_limit_feedback():
+                result = self._fetch_order_book(symbol, length, params)
         else:
             result = self._offline_fetch_order_book(symbol, length, params)
 
@@ -251,11 +705,11 @@ class ccxtExchangeWrapper:
         Returns: dict
         """
 
-        if self.requests_throttle is not None:
-            self.requests_throttle.add_request(request_type="load_markets")
+        self._requests_throttle("load_markets")
 
         if not self.offline:
-            markets = self._load_markets()
+            with self._rate_limit_feedback():
+                markets = self._load_markets()
         else:
             markets = self._offline_load_markets()
 
@@ -268,7 +722,7 @@ class ccxtExchangeWrapper:
         self.markets = markets
         return markets
 
-    def fetch_tickers(self, symbol: str = None):
+    def fetch_tickers(self, symbol: str = None, priority: int = None):
         """
          Fetches tickers or single ticker if the symbol of specifiled from exchange or offline data. Same as ccxt's
           fetch_tickers(). If is offline mode - returns data from the _offline_tickers list.
@@ -278,24 +732,43 @@ class ccxtExchangeWrapper:
         If the throttling is enabled, the requests with the weight of "fetch_tickers" or "fetch_ticker" if symbol is
          specified.
 
+        If the tickers are subscribed via subscribe_tickers() and fresh data is in the market data cache - the cached
+        tickers are returned without requesting the exchange (and counting the requests). The cached ticker of the
+        symbol updates the respective ticker in self.tickers, the other tickers are kept.
+
         Args:
          symbol: string with the single symbol. if ommitted all tickers will be returned
+         priority: priority of the request in the throttle's queue (see Throttle.acquire). If not set - the
+          priority of the request type is used
         Returns:
              dict{"[symbol]":ticker_data_duct}
         """
 
+        cached_tickers = self._cached_tickers(symbol)
+        if cached_tickers is not None:
+            if len(self.markets) < 1:
+                self.load_markets()
+
+            tickers = {k: v for k, v in cached_tickers.items() if k in self.markets and self.markets[k]["active"]}
+
+            if symbol is None:
+                self.tickers = tickers
+            else:
+                self.tickers.update(tickers)
+
+            return tickers
+
         if symbol is None:
-            if self.requests_throttle is not None:
-                self.requests_throttle.add_request(request_type="fetch_tickers")
+            self._requests_throttle("fetch_tickers", priority=priority)
         else:
-            if self.requests_throttle is not None:
-                self.requests_throttle.add_request(request_type="fetch_ticker")
+            self._requests_throttle("fetch_ticker", priority=priority)
 
         if len(self.markets) < 1:
             self.load_markets()
 
         if not self.offline:
-            self.tickers = self._fetch_tickers(symbol)
+            with self._rate_limit_feedback():
+                self.tickers = self._fetch_tickers(symbol)
         else:
             self.tickers = self._offline_fetch_tickers()
 
@@ -311,15 +784,38 @@ class ccxtExchangeWrapper:
     def get_exchange_wrapper_id(self):
         return "generic"
 
+    def set_clock(self, clock: Clock = None):
+        """
+        Sets the clock for the timestamps of requests and for the requests throttle. With the VirtualClock in offline
+        mode the throttle's waits do not really sleep and the clock is moved forward by the replayed tickers (see
+        _offline_fetch_tickers), so the offline runs are fast and deterministic.
+
+        Args:
+            clock: Clock object. None - use the process wide clock (see ztom.clock.get_clock)
+        """
+        self.clock = clock
+        if self.requests_throttle is not None:
+            self.requests_throttle.clock = clock
+
+    def _get_clock(self) -> Clock:
+        return self.clock if self.clock is not None else get_clock()
+
+    def _time(self) -> float:
+        return self._get_clock().time()
+
     # init offline fetching
-    def set_offline_mode(self, markets_json_file: str, tickers_csv_file: str, orders_json_file: str = None):
+    def set_offline_mode(self, markets_json_file: str, tickers_csv_file: str, orders_json_file: str = None,
+                         stream_tickers: bool = False):
         """
         Set the wrapper to work in offline mode. Should be called before any exchange requests.
 
         Args:
             markets_json_file: string with the path to jason file with markets information
-            tickers_csv_file: string with the path to jason file with tickers in offline mode
+            tickers_csv_file: string with the path to csv file with tickers in offline mode or to the binary tick
+            archive converted from it (see TickArchive)
             orders_json_file: depreciated
+            stream_tickers: if True - tickers are not loaded into memory but read from the file on demand via the
+            offset index (see IndexedTickersCsv). For the large tickers recordings.
 
         Returns:
             sets the self.offline to true
@@ -334,7 +830,12 @@ class ccxtExchangeWrapper:
         if markets_json_file is not None:
             self._offline_markets = self.load_markets_from_json_file(markets_json_file)
         if tickers_csv_file is not None:
-            self._offline_tickers = self.load_tickers_from_csv(tickers_csv_file)
+            if TickArchive.is_archive(tickers_csv_file):
+                self._offline_tickers = TickArchive(tickers_csv_file)
+            elif stream_tickers:
+                self._offline_tickers = IndexedTickersCsv(tickers_csv_file)
+            else:
+                self._offline_tickers = self.load_tickers_from_csv(tickers_csv_file)
 
         if orders_json_file is not None:
             self._offline_order = self.load_order_from_json(orders_json_file)
@@ -353,29 +854,14 @@ class ccxtExchangeWrapper:
     @staticmethod
     def load_tickers_from_csv(tickers_csv_file):
         """
-         Supplementary method.
+         Supplementary method. Tickers timestamps (ms) are loaded if the file has the "timestamp" column.
         """
         tickers = dict()
 
-        csv_float_fields = ["ask", "bid", "askVolume", "bidVolume"]
-
         with open(tickers_csv_file, newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                if int(row["fetch_id"]) not in tickers:
-                    tickers[int(row["fetch_id"])] = dict()
-
-                row_value = dict()
-                for v in csv_float_fields:
-                    try:
-                        row_value[v] = float(row[v])
-                    except ValueError:
-                        row_value[v] = None
-
-                tickers[int(row["fetch_id"])][row["symbol"]] = dict({"ask": row_value["ask"],
-                                                                     "bid": row_value["bid"],
-                                                                     "askVolume": row_value["askVolume"],
-                                                                     "bidVolume": row_value["bidVolume"]})
+            for fetch_id, fetch_tickers in iter_tickers_csv(csvfile):
+                tickers.setdefault(fetch_id, dict()).update(fetch_tickers)
+
         return tickers
 
     @staticmethod
@@ -392,7 +878,7 @@ class ccxtExchangeWrapper:
         """
         self._offline_balance = balance
 
-    def load_offline_order_books_from_csv(self, file_name):
+    def load_offline_order_books_from_csv(self, file_name, columnar: bool = False):
         """
         Loads the order books data which could be later available via fetch_order_books in offine mode (sets the
         self._offline_order_books dict). Also returns the fetched data.
@@ -421,13 +907,20 @@ class ccxtExchangeWrapper:
                     1   FUEL/ETH	0.00014092	2331	0.000138	2607
                     1 	FUEL/ETH	0.00014205	2460	0.00013722	21133
 
+            columnar: if True - order books are loaded into the columnar numpy storage (see OrderBooksColumns): asks
+            and bids of order books are the arrays of [price, quantity] rows instead of lists. For the large files.
+                Order books returned by fetch_order_book have the lists of levels in both cases.
+
         Returns:
             dict, containing data for offline order books
         """
+        if columnar:
+            self._offline_order_books = load_order_books_csv(file_name)
+            return self._offline_order_books
+
         order_books = dict()
-        order_books_indexes = dict()  # key is the csv's first column val., value is the current index in order books
+        order_books_indexes = dict()  # {symbol: {csv's first column value: index in order books}}
 
-        i = 0
         with open(file_name, newline='') as f:
             reader = csv.DictReader(f)
             index_field_name = reader.fieldnames[0]
@@ -435,14 +928,14 @@ class ccxtExchangeWrapper:
             for row in reader:
                 if row["symbol"] not in order_books:
                     order_books[row["symbol"]] = list()
-                    order_books_indexes[row["symbol"]] = list()
+                    order_books_indexes[row["symbol"]] = dict()
 
-                if row[index_field_name] not in order_books_indexes[row['symbol']]:
-                    order_books_indexes[row["symbol"]].append(row[index_field_name])
+                fetch_index = order_books_indexes[row["symbol"]].get(row[index_field_name])
+                if fetch_index is None:
+                    fetch_index = len(order_books[row["symbol"]])
+                    order_books_indexes[row["symbol"]][row[index_field_name]] = fetch_index
                     order_books[row["symbol"]].append(dict({"asks": list(), "bids": list()}))
 
-                fetch_index = order_books_indexes[row["symbol"]].index(row[index_field_name])
-
                 order_books[row["symbol"]][fetch_index]["asks"].append(list([float(row['ask']), float(row['ask-qty'])]))
                 order_books[row["symbol"]][fetch_index]["bids"].append(list([float(row['bid']), float(row['bid-qty'])]))
 
@@ -453,6 +946,7 @@ class ccxtExchangeWrapper:
         if self._offline_tickers_current_index < len(self._offline_tickers):
             tickers = self._offline_tickers[self._offline_tickers_current_index]
             self._offline_tickers_current_index += 1
+            self._advance_offline_clock(tickers)
             return tickers
 
         else:
@@ -461,8 +955,25 @@ class ccxtExchangeWrapper:
                     "No more loaded tickers. Total tickers: {}".format(len(self._offline_tickers))))
             else:
                 tickers = self._offline_tickers[self._offline_tickers_current_index-1]
+                self._advance_offline_clock(tickers)
                 return tickers
 
+    def _advance_offline_clock(self, tickers: dict):
+        """
+        moves the virtual clock (if it's used) to the latest timestamp of the fetched offline tickers or by
+        offline_tickers_interval if the tickers have no timestamps later than the clock's time
+        """
+        clock = self._get_clock()
+        if not clock.virtual:
+            return
+
+        timestamp = max((t["timestamp"] for t in tickers.values() if t.get("timestamp")), default=None)
+
+        if timestamp is not None and timestamp / 1000 > clock.time():
+            clock.set_time(timestamp / 1000)
+        else:
+            clock.advance(self.offline_tickers_interval)
+
 
     def _offline_fetch_order_book(self, symbol, length=None, params=None):
 
@@ -490,13 +1001,34 @@ class ccxtExchangeWrapper:
         order_book = self._offline_order_books[symbol][self._offline_order_books_current_index[symbol]]
         self._offline_order_books_current_index[symbol] += 1
 
+        if isinstance(self._offline_order_books[symbol], OrderBooksColumns):
+            # levels of the columnar storage are numpy arrays, fetched order books have the lists of levels as ccxt's
+            order_book = {"asks": order_book["asks"].tolist(), "bids": order_book["bids"].tolist()}
+
         return order_book
 
+    def set_offline_matching_engine(self, engine: OfflineMatchingEngine):
+        """
+        Sets the engine which generates the offline orders fills by matching the placed orders with the replayed
+        offline market data (see OfflineMatchingEngine). Orders data added via add_offline_order_data are replaced by
+        the matched ones on placing.
+
+        Args:
+            engine: OfflineMatchingEngine or None to use the linear fill schedule of add_offline_order_data
+        """
+        self.offline_matching_engine = engine
+
+    @_offline_orders_locked
     def _offline_create_order(self, order: TradeOrder = None):
+        if order is not None and self.offline_matching_engine is not None:
+            self._set_offline_order_data(order, self.offline_matching_engine.create_order_data(self, order))
+
         if order is not None and order.internal_id in self._offline_orders_data:
+            self._offline_orders_data[order.internal_id]["_offline_order_placed"] = True
             return self._offline_orders_data[order.internal_id]["_offline_order"]["create"]
         return self._offline_order["create"]
 
+    @_offline_orders_locked
     def _offline_fetch_order(self, order: TradeOrder = None):
 
         if order is not None and order.internal_id in self._offline_orders_data:
@@ -509,6 +1041,14 @@ class ccxtExchangeWrapper:
             _offline_order = self._offline_order
             _offline_order_cancelled = self._offline_order_cancelled
 
+        # order created by the matching engine is matched up to the current step of market data replay
+        if "matching_engine" in _offline_order and not _offline_order_cancelled:
+            _offline_order["matching_engine"].match_order_data(self, _offline_order)
+
+        # order stays in it's last state when the updates are over (see OfflineMatchingEngine)
+        if _offline_order.get("hold_last_update"):
+            _offline_order_update_index = min(_offline_order_update_index, len(_offline_order["updates"]) - 1)
+
         if _offline_order_update_index < len(_offline_order["updates"]):
             order_resp = _offline_order["updates"][_offline_order_update_index].copy()
 
@@ -531,6 +1071,64 @@ class ccxtExchangeWrapper:
             raise (ExchangeWrapperOfflineFetchError(
                 "No more order updates in file. Total tickers: {}".format(len(self._offline_order["updates"]))))
 
+    def _offline_fetch_open_orders(self, symbol: str = None):
+        """
+        returns the next updates of placed offline orders (from self._offline_orders_data) which are still open. Updates
+        of orders which are closed on the next update are not consumed, so they will be returned by the following
+        fetch of order.
+        """
+        return self._offline_next_orders_updates(symbol)
+
+    @_offline_orders_locked
+    def _offline_next_orders_updates(self, symbol: str = None, open_only: bool = True):
+        """
+        returns and consumes the next updates of placed and not canceled offline orders for symbol (or all symbols).
+        If open_only is set - the closing updates are not returned and not consumed.
+        """
+        result = list()
+
+        for order_data in self._offline_orders_data.values():
+            if not order_data.get("_offline_order_placed") or order_data["_offline_order_cancelled"]:
+                continue
+
+            if symbol is not None and order_data.get("_offline_order_symbol") != symbol:
+                continue
+
+            _offline_order = order_data["_offline_order"]
+            _offline_order_update_index = order_data["_offline_order_update_index"]
+
+            if "matching_engine" in _offline_order:
+                _offline_order["matching_engine"].match_order_data(self, _offline_order)
+                _offline_order_update_index = 0
+
+                # order matched by the engine has the single update with it's current state, which is returned for
+                # the events (not open_only) only when it's changed
+                if not open_only:
+                    if order_data.get("_offline_order_event_state") is _offline_order["updates"][0]:
+                        continue
+                    order_data["_offline_order_event_state"] = _offline_order["updates"][0]
+
+            if _offline_order_update_index >= len(_offline_order["updates"]):
+                if not (open_only and _offline_order.get("hold_last_update")):
+                    continue
+                _offline_order_update_index = len(_offline_order["updates"]) - 1
+
+            if open_only and _offline_order["updates"][_offline_order_update_index]["status"] != "open":
+                continue
+
+            order_resp = _offline_order["updates"][_offline_order_update_index].copy()
+            order_data["_offline_order_update_index"] += 1
+
+            if not self.trades_in_offline_order_update:
+                order_resp.pop("trades", None)
+
+            order_resp["id"] = _offline_order["create"]["id"]
+            order_resp["symbol"] = order_data.get("_offline_order_symbol")
+            result.append(order_resp)
+
+        return result
+
+    @_offline_orders_locked
     def _offline_cancel_order(self, order: TradeOrder = None):
 
         if order is not None and order.internal_id in self._offline_orders_data:
@@ -575,7 +1173,16 @@ class ccxtExchangeWrapper:
     def _cancel_order(self, order: TradeOrder):
         return self._ccxt.cancel_order(order.id)
 
-    def place_limit_order(self, order: TradeOrder):
+    def _fetch_open_orders(self, symbol: str = None):
+        return self._ccxt.fetch_open_orders(symbol)
+
+    def _cancel_all_orders(self, symbol: str = None):
+        return self._ccxt.cancel_all_orders(symbol)
+
+    def _fetch_symbol_trades(self, symbol: str, since=None):
+        return self._ccxt.fetch_my_trades(symbol, since)
+
+    def place_limit_order(self, order: TradeOrder, priority: int = None):
         """
         Sends the request to exchange to place limit order which parameters described in order object. Exchange responce
          returned by this method could be used to update the TradeOrder object.
@@ -594,6 +1201,8 @@ class ccxtExchangeWrapper:
 
         Args:
             order: TradeOrder object with the order parameters
+            priority: priority of the request in the throttle's queue (see Throttle.acquire). If not set - the
+             priority of the request type is used
 
         Returns:
             dict with the exchange response which could be used for updating TradeOrder object
@@ -601,16 +1210,15 @@ class ccxtExchangeWrapper:
         """
 
         timestamp_open = dict()
-        timestamp_open["request_placed"] = datetime.datetime.now().timestamp()
+        timestamp_open["request_placed"] = self._time()
 
-        if self.requests_throttle is not None:
-            self.requests_throttle.add_request(request_type="create_order")
+        self._requests_throttle("create_order", priority=priority)
 
         if self.offline:
             result = self._offline_create_order(order)
 
-            timestamp_open["request_received"] = datetime.datetime.now().timestamp()
-            timestamp_open["from_exchange"] = datetime.datetime.now().timestamp()
+            timestamp_open["request_received"] = self._time()
+            timestamp_open["from_exchange"] = self._time()
             result["timestamp_open"] = timestamp_open
 
             # check if order was closed on placement
@@ -618,41 +1226,49 @@ class ccxtExchangeWrapper:
                 timestamp_closed = dict()
                 timestamp_closed["request_received"] = timestamp_open["request_placed"]
                 timestamp_closed["request_placed"] = timestamp_open["request_received"]
-                timestamp_closed["from_exchange"] = datetime.datetime.now().timestamp()
+                timestamp_closed["from_exchange"] = self._time()
                 result["timestamp_closed"] = timestamp_closed
 
             return result
 
         else:
-            result = self._create_order(order.symbol, "limit", order.side, order.amount, order.price)
+            with self._rate_limit_feedback():
+                result = self._create_order(order.symbol, "limit", order.side, order.amount, order.price)
+            return self._on_limit_order_placed(result, timestamp_open)
 
-            timestamp_open["request_received"] = datetime.datetime.now().timestamp()
+    def _on_limit_order_placed(self, result: dict, timestamp_open: dict):
+        """
+        adds the timestamps of opening (and closing if the order was closed on placement) to the exchange response of
+        placed limit order
+        """
 
-            # noinspection PyBroadException
-            try:
-                timestamp_open["from_exchange"] = result["timestamp"] / 1000
-            except Exception:
-                timestamp_open["from_exchange"] = None
+        timestamp_open["request_received"] = self._time()
 
-            result["timestamp_open"] = timestamp_open
+        # noinspection PyBroadException
+        try:
+            timestamp_open["from_exchange"] = result["timestamp"] / 1000
+        except Exception:
+            timestamp_open["from_exchange"] = None
 
-            # check if order was closed on placement
-            if result["status"] in ("closed", "canceled"):
-                timestamp_closed = dict()
-                timestamp_closed["request_received"] = timestamp_open["request_received"]
-                timestamp_closed["request_placed"] = timestamp_open["request_placed"]
+        result["timestamp_open"] = timestamp_open
 
-                # noinspection PyBroadException
-                try:
-                    timestamp_closed["from_exchange"] = timestamp_open["from_exchange"]
-                except Exception:
-                    timestamp_closed["from_exchange"] = None
+        # check if order was closed on placement
+        if result["status"] in ("closed", "canceled"):
+            timestamp_closed = dict()
+            timestamp_closed["request_received"] = timestamp_open["request_received"]
+            timestamp_closed["request_placed"] = timestamp_open["request_placed"]
 
-                result["timestamp_closed"] = timestamp_closed
+            # noinspection PyBroadException
+            try:
+                timestamp_closed["from_exchange"] = timestamp_open["from_exchange"]
+            except Exception:
+                timestamp_closed["from_exchange"] = None
 
-            return result
+            result["timestamp_closed"] = timestamp_closed
+
+        return result
 
-    def get_order_update(self, order: TradeOrder):
+    def get_order_update(self, order: TradeOrder, priority: int = None):
         """
         Returns the order's data requested from the exchange or from offline data (offline mode documentation for details).
 
@@ -660,6 +1276,8 @@ class ccxtExchangeWrapper:
 
         Args:
             order: TradeOrder object which should be requested from the exchange
+            priority: priority of the request in the throttle's queue (see Throttle.acquire). If not set - the
+             priority of the request type is used
 
         Returns:
             dict with the order data in ccxt format
@@ -667,39 +1285,132 @@ class ccxtExchangeWrapper:
         """
 
         timestamp_closed = dict()
-        timestamp_closed["request_placed"] = datetime.datetime.now().timestamp()
+        timestamp_closed["request_placed"] = self._time()
 
-        if self.requests_throttle is not None:
-            self.requests_throttle.add_request(request_type="fetch_order")
+        self._requests_throttle("fetch_order", priority=priority)
 
         if self.offline:
             result = self._offline_fetch_order(order)
 
             if result["status"] in ("closed", "canceled"):
-                timestamp_closed["request_received"] = datetime.datetime.now().timestamp()
-                timestamp_closed["from_exchange"] = datetime.datetime.now().timestamp()
+                timestamp_closed["request_received"] = self._time()
+                timestamp_closed["from_exchange"] = self._time()
                 result["timestamp_closed"] = timestamp_closed
 
             return result
 
         else:
-            result = self._fetch_order(order)
+            with self._rate_limit_feedback():
+                result = self._fetch_order(order)
+            return self._on_order_update_received(result, timestamp_closed)
 
-            # check if order was closed
-            if result["status"] in ("closed", "canceled"):
-                timestamp_closed["request_received"] = datetime.datetime.now().timestamp()
+    def _on_order_update_received(self, result: dict, timestamp_closed: dict):
+        """
+        adds the timestamps of closing to the exchange response of order update if the order was closed
+        """
+
+        # check if order was closed
+        if result["status"] in ("closed", "canceled"):
+            timestamp_closed["request_received"] = self._time()
+
+            # noinspection PyBroadException
+            try:
+                timestamp_closed["from_exchange"] = result["lastTradeTimestamp"] / 1000
+            except Exception:
+                timestamp_closed["from_exchange"] = None
+
+            result["timestamp_closed"] = timestamp_closed
+
+        return result
+
+    def fetch_open_orders(self, symbol: str = None, priority: int = None) -> list:
+        """
+        Returns the list of open orders for the symbol or for all the symbols if symbol is not set. In offline mode the
+        orders are taken from the self._offline_orders_data.
+
+        If throttling is enabled counts OPEN_ORDERS_WEIGHT "single" requests or ALL_OPEN_ORDERS_WEIGHT if the symbol is not
+        set.
+
+        Args:
+            symbol: symbol of orders or None for all the symbols
+            priority: priority of the request in the throttle's queue (see Throttle.acquire). If not set - the
+             priority of the request type is used
+
+        Returns:
+            list of orders data in ccxt format
+        """
+
+        self._requests_throttle("single",
+                                self.OPEN_ORDERS_WEIGHT if symbol is not None else self.ALL_OPEN_ORDERS_WEIGHT,
+                                priority=priority)
+
+        if self.offline:
+            return self._offline_fetch_open_orders(symbol)
 
+        with self._rate_limit_feedback():
+            return self._fetch_open_orders(symbol)
+
+    def get_open_orders_updates(self, orders: List[TradeOrder], update_closed: bool = True) -> dict:
+        """
+        Returns the updates for several orders with the minimum of requests: the open orders are fetched by the single
+        fetch_open_orders() request for all the symbols (if it's weight is not more than the weight of requests for every
+        symbol) or by the request for every symbol. Only the orders which are not in the open orders anymore are
+        updated via get_order_update() in order to get their final status and fill.
+
+        The results are partial if some of the requests fail: orders of the symbols which open orders could not be
+        fetched and the orders which get_order_update() failed are not in the result. The exception is raised only if
+        no open orders were fetched at all.
+
+        Args:
+            orders: list of TradeOrder objects which were open on the previous update
+            update_closed: if False - the orders which are not in the open orders are not updated and not returned, so
+             the caller could fetch their final state by itself
+
+        Returns:
+            dict {order.id: order data in ccxt format}
+        """
+
+        symbols = sorted({order.symbol for order in orders})
+
+        if len(symbols) > 1 and self.ALL_OPEN_ORDERS_WEIGHT <= self.OPEN_ORDERS_WEIGHT * len(symbols):
+            open_orders = self.fetch_open_orders()
+            fetched_symbols = set(symbols)
+        else:
+            open_orders = list()
+            fetched_symbols = set()
+            error = None
+
+            for symbol in symbols:
+                try:
+                    open_orders.extend(self.fetch_open_orders(symbol))
+                except Exception as e:
+                    error = e
+                else:
+                    fetched_symbols.add(symbol)
+
+            if len(fetched_symbols) == 0 and error is not None:
+                raise error
+
+        open_orders_by_id = {o["id"]: o for o in open_orders}
+
+        results = dict()
+        for order in orders:
+            if order.symbol not in fetched_symbols:
+                continue
+
+            if order.id in open_orders_by_id:
+                results[order.id] = open_orders_by_id[order.id]
+
+            elif update_closed:
                 # noinspection PyBroadException
                 try:
-                    timestamp_closed["from_exchange"] = result["lastTradeTimestamp"] / 1000
+                    results[order.id] = self.get_order_update(order)
                 except Exception:
-                    timestamp_closed["from_exchange"] = None
+                    continue
 
-                result["timestamp_closed"] = timestamp_closed
-
-            return result
+        return results
 
-    def cancel_order(self, order: TradeOrder):
+    def cancel_order(self, order: TradeOrder, priority: int = None):
         """
         Send the request to exchange to cancel the order and returns the exchange's responce. In offline mode response
         is created from the self._offline_orders_data.
@@ -708,18 +1419,76 @@ class ccxtExchangeWrapper:
 
         Args:
             order: TradeOrder object
+            priority: priority of the request in the throttle's queue (see Throttle.acquire). If not set - the
+             priority of the request type is used
 
         Returns:
             dict with the exchange response which could be used for updating the TradeOrder
 
         """
-        if self.requests_throttle is not None:
-            self.requests_throttle.add_request(request_type="cancel_order")
+        self._requests_throttle("cancel_order", priority=priority)
 
         if self.offline:
             return self._offline_cancel_order(order)
         else:
-            return self._cancel_order(order)
+            with self._rate_limit_feedback():
+                return self._cancel_order(order)
+
+    def has_cancel_all_orders(self) -> bool:
+        """
+        True if the exchange provides the endpoint for cancelling all the open orders (of the symbol) by single request.
+        Always True in offline mode.
+        """
+        if self.offline:
+            return True
+
+        return bool(self._ccxt.has.get("cancelAllOrders"))
+
+    def cancel_all_orders(self, symbol: str = None, priority: int = None):
+        """
+        Sends the single request to cancel all the open orders of the symbol (or all the symbols if it's not set) and
+        returns the exchange's response. Note: the orders which were not placed via this wrapper are cancelled also. In
+        offline mode all placed offline orders (see add_offline_order_data) of the symbol are cancelled.
+
+        If throttling is enabled counts the weight of "cancel_order" request.
+
+        Args:
+            symbol: symbol of orders or None for all the symbols
+            priority: priority of the request in the throttle's queue (see Throttle.acquire). If not set - the
+             priority of the request type is used
+
+        Returns:
+            exchange response (list of the cancelled orders data in offline mode)
+        """
+        self._requests_throttle("cancel_order", priority=priority)
+
+        if self.offline:
+            return self._offline_cancel_all_orders(symbol)
+
+        with self._rate_limit_feedback():
+            return self._cancel_all_orders(symbol)
+
+    @_offline_orders_locked
+    def _offline_cancel_all_orders(self, symbol: str = None):
+        result = list()
+
+        for order_data in self._offline_orders_data.values():
+            if not order_data.get("_offline_order_placed") or order_data["_offline_order_cancelled"]:
+                continue
+
+            if symbol is not None and order_data.get("_offline_order_symbol") != symbol:
+                continue
+
+            if "cancel" not in order_data["_offline_order"]:
+                order_data["_offline_order"]["cancel"] = dict({"status": "canceled"})
+
+            order_data["_offline_order_update_index"] -= 1
+            order_data["_offline_order_cancelled"] = True
+
+            result.append({"id": order_data["_offline_order"]["create"]["id"],
+                           "symbol": order_data.get("_offline_order_symbol"), "status": "canceled"})
+
+        return result
 
     def offline_load_trades_from_file(self, trades_json_file):
         with open(trades_json_file) as json_file:
@@ -790,8 +1559,7 @@ class ccxtExchangeWrapper:
         """
 
         if self.offline:
-            if self.requests_throttle is not None:
-                self.requests_throttle.add_request(request_type="fetch_my_trades")
+            self._requests_throttle("fetch_my_trades")
 
             if order.trades and len(order.trades) > 0:
                 trades = order.trades
@@ -800,31 +1568,46 @@ class ccxtExchangeWrapper:
             return trades
 
         else:
-            amount_from_trades = 0.0
+            if self._order_trades_required(order):
+
+                self._requests_throttle("fetch_my_trades")
+
+                with self._rate_limit_feedback():
+                    resp = self._fetch_order_trades(order)
+            else:
+                resp = order.trades
 
-            if len(order.trades) > 0:
-                amount_from_trades = self.amount_to_precision(order.symbol,
-                                                              sum(item['amount'] for item in order.trades))
+            return self._checked_order_trades(order, resp)
 
-            if amount_from_trades < order.filled * 0.9999999:
+    def _order_trades_amount(self, order: TradeOrder, trades: list):
+        return self.amount_to_precision(order.symbol, sum(item['amount'] for item in trades))
 
-                if self.requests_throttle is not None:
-                    self.requests_throttle.add_request(request_type="fetch_my_trades")
+    def _order_trades_required(self, order: TradeOrder):
+        """
+        returns True if the trades already presented in the order do not cover the order's filled amount, so the trades
+        should be requested from the exchange
+        """
+        amount_from_trades = 0.0
 
-                resp = self._fetch_order_trades(order)
+        if len(order.trades) > 0:
+            amount_from_trades = self._order_trades_amount(order, order.trades)
 
-                amount_from_trades = self.amount_to_precision(order.symbol, sum(item['amount'] for item in resp))
-            else:
-                resp = order.trades
+        return amount_from_trades < order.filled * 0.9999999
 
-            if len(resp) > 0 and \
-                    (order.filled == amount_from_trades or (amount_from_trades / order.filled) >= 0.999):
-                return resp
+    def _checked_order_trades(self, order: TradeOrder, trades: list):
+        """
+        returns the trades if the amount in trades matches the order's filled amount or raises ExchangeWrapperError
+        """
+        amount_from_trades = self._order_trades_amount(order, trades) if len(trades) > 0 else 0.0
 
-            else:
-                raise ExchangeWrapperError(
-                    "Zero fill or Amount in Trades is not matching order filled Amount {} != {}".format(
-                        amount_from_trades, order.filled))
+        if len(trades) > 0 and \
+                (order.filled == amount_from_trades or (amount_from_trades / order.filled) >= 0.999):
+            return trades
+
+        else:
+            raise ExchangeWrapperError(
+                "Zero fill or Amount in Trades is not matching order filled Amount {} != {}".format(
+                    amount_from_trades, order.filled))
 
     @staticmethod
     def fees_from_order_trades(order: TradeOrder):
@@ -890,6 +1673,62 @@ class ccxtExchangeWrapper:
         """
 
         trades = self.get_trades(order)
+        return self._trades_results(order, trades)
+
+    def get_orders_trades_results(self, orders: List[TradeOrder]) -> dict:
+        """
+        Returns the trades results (see get_trades_results) for several orders with the single fetch_my_trades request
+        per symbol: the trades of symbol since the earliest order's timestamp are fetched and matched with the orders by
+        order id. If the exchange does not support this (SYMBOL_TRADES_FETCHING is False), the order's trades are
+        already in the order or in offline mode - the trades are taken as in get_trades_results for every order.
+
+        Note: the number of trades returned by the exchange in one request is limited, so this method is intended for
+        the orders placed recently.
+
+        Args:
+            orders: list of TradeOrder
+
+        Returns:
+            dict {order.id: trades results}. Orders which trades do not match their filled amount are not included.
+        """
+        results = dict()
+        orders_by_symbol = dict()
+
+        for order in orders:
+            if not self.offline and self.SYMBOL_TRADES_FETCHING and self._order_trades_required(order):
+                orders_by_symbol.setdefault(order.symbol, list()).append(order)
+                continue
+
+            try:
+                results[order.id] = self.get_trades_results(order)
+            except ExchangeWrapperError:
+                continue
+
+        for symbol, symbol_orders in orders_by_symbol.items():
+            since = min((o.timestamp for o in symbol_orders if o.timestamp), default=None)
+
+            self._requests_throttle("fetch_my_trades")
+            with self._rate_limit_feedback():
+                trades = self._fetch_symbol_trades(symbol, since)
+
+            trades_by_order = dict()
+            for trade in trades:
+                trades_by_order.setdefault(trade["order"], list()).append(trade)
+
+            for order in symbol_orders:
+                try:
+                    order_trades = self._checked_order_trades(order, trades_by_order.get(order.id, list()))
+                except ExchangeWrapperError:
+                    continue
+
+                results[order.id] = self._trades_results(order, order_trades)
+
+        return results
+
+    def _trades_results(self, order: TradeOrder, trades: list):
+        """
+        calculates the order's results from trades. See get_trades_results.
+        """
         results = order.total_amounts_from_trades(trades)
         results["trades"] = trades
         results["filled"] = results["amount"]
@@ -963,20 +1802,20 @@ class ccxtExchangeWrapper:
     async def _async_load_markets(exchange):
         await exchange.load_markets()
 
-    async def _get_order_book_async(self, symbol, limit=None):
+    async def _get_order_book_async(self, symbol, limit=None, priority: int = None):
 
-        if self.requests_throttle is not None:
-            self.requests_throttle.add_request(request_type="fetch_order_book")
+        await self._requests_throttle_async("fetch_order_book", priority)
 
         if not self.offline:
-            ob = await self._async_ccxt.fetch_order_book(symbol, limit=limit)
+            with self._rate_limit_feedback(self._async_ccxt):
+                ob = await self._async_ccxt.fetch_order_book(symbol, limit=limit)
 
         else:
             if not self._offline_order_books or symbol not in self._offline_order_books:
                 ob = self._create_order_book_array_from_ticker(self.tickers[symbol])
                 ob["from_ticker"] = True
             else:
-                ob = self.fetch_order_book(symbol, 100)
+                ob = self._offline_fetch_order_book(symbol, 100)  # request is already counted
                 ob["from_ticker"] = False
 
         ob["symbol"] = symbol
@@ -984,77 +1823,210 @@ class ccxtExchangeWrapper:
 
     def init_async_exchange(self):
         """
-        Inits async ccxt exchange object and load markets
+        Inits async ccxt exchange object (with the credentials of sync exchange object) and load markets
         """
         exchange_async = getattr(accxt, self.exchange_id)
-        self._async_ccxt = exchange_async() # type: accxt.Exchange
 
-        loop = asyncio.get_event_loop()
+        config = dict()
+        if self._ccxt is not None:
+            config = {'apiKey': self._ccxt.apiKey, 'secret': self._ccxt.secret}
+
+        self._async_ccxt = exchange_async(config)  # type: accxt.Exchange
+
+        loop = utils.event_loop()
         loop.run_until_complete(self._async_load_markets(self._async_ccxt))
 
-    def get_order_books_async(self, symbols, limit = None):
+    def get_order_books_async(self, symbols, limit = None, priority: int = None):
         """
         Fetches the order books for list of symbols in async mode. Waits till the all order books are being fetched.
 
         In offline mode if the order book data is not loaded - the order book will be created from the ticker price.
 
-        If the throttling is enabled, the requests with the weight of "fetch_order_book" will be counted for every
-        requested order book in list.
+        If the throttling is enabled, every order book request waits for the throttle's budget (see
+        Throttle.acquire_async) and is counted with the weight of "fetch_order_book".
 
         Args:
             symbols: list of symbols to be fetched
+            limit: depth of order books
+            priority: priority of the requests in the throttle's queue (see Throttle.acquire). If not set - the
+             priority of the request type is used
 
         Returns:
             dict  of order books data where key is the symbol of fetched order book
 
         """
-        loop = asyncio.get_event_loop()
+        loop = utils.event_loop()
         tasks = list()
 
         for s in symbols:
-            tasks.append(self._get_order_book_async(s, limit=limit))
+            tasks.append(self._get_order_book_async(s, limit=limit, priority=priority))
 
         ob_array = loop.run_until_complete(asyncio.gather(*tasks))
         return ob_array
 
-    def fetch_free_balance(self):
+    async def _requests_throttle_async(self, request_type: str, priority: int = None):
+        """
+        waits for the throttle's budget and counts the request in the requests throttle, so the concurrently sent
+        requests are spread in time in accordance to the throttle's requests budget and request type priorities
+        """
+        if self.requests_throttle is None:
+            return
+
+        await self.requests_throttle.acquire_async(request_type, priority=priority)
+
+    async def _create_order_async(self, symbol, order_type, side, amount, price=None):
+        return await self._async_ccxt.create_order(symbol, order_type, side, amount, price)
+
+    async def _fetch_order_async(self, order: TradeOrder):
+        return await self._async_ccxt.fetch_order(order.id, symbol=order.symbol)
+
+    async def _cancel_order_async(self, order: TradeOrder):
+        return await self._async_ccxt.cancel_order(order.id)
+
+    async def _fetch_order_trades_async(self, order: TradeOrder):
+        resp = await self._async_ccxt.fetch_my_trades(order.symbol, order.timestamp)
+
+        # checking if order id in trades == order id from order
+        return [trade for trade in resp if trade['order'] == order.id]
+
+    async def place_limit_order_async(self, order: TradeOrder, priority: int = None):
+        """
+        Async version of place_limit_order. Online requests are sent via async ccxt exchange object (see
+        init_async_exchange), so the several orders could be placed concurrently. If throttling is enabled the request
+        waits for the throttle's sleep time.
+
+        Args:
+            order: TradeOrder object with the order parameters
+            priority: priority of the request in the throttle's queue (see Throttle.acquire). If not set - the
+             priority of the request type is used
+
+        Returns:
+            dict with the exchange response which could be used for updating TradeOrder object
+        """
+        if self.offline:
+            return self.place_limit_order(order, priority=priority)
+
+        timestamp_open = dict()
+        timestamp_open["request_placed"] = self._time()
+
+        await self._requests_throttle_async("create_order", priority)
+
+        with self._rate_limit_feedback(self._async_ccxt):
+            result = await self._create_order_async(order.symbol, "limit", order.side, order.amount, order.price)
+        return self._on_limit_order_placed(result, timestamp_open)
+
+    async def get_order_update_async(self, order: TradeOrder, priority: int = None):
+        """
+        Async version of get_order_update.
+
+        Args:
+            order: TradeOrder object which should be requested from the exchange
+            priority: priority of the request in the throttle's queue (see Throttle.acquire). If not set - the
+             priority of the request type is used
+
+        Returns:
+            dict with the order data in ccxt format
+        """
+        if self.offline:
+            return self.get_order_update(order, priority=priority)
+
+        timestamp_closed = dict()
+        timestamp_closed["request_placed"] = self._time()
+
+        await self._requests_throttle_async("fetch_order", priority)
+
+        with self._rate_limit_feedback(self._async_ccxt):
+            result = await self._fetch_order_async(order)
+        return self._on_order_update_received(result, timestamp_closed)
+
+    async def cancel_order_async(self, order: TradeOrder, priority: int = None):
+        """
+        Async version of cancel_order.
+
+        Args:
+            order: TradeOrder object
+            priority: priority of the request in the throttle's queue (see Throttle.acquire). If not set - the
+             priority of the request type is used
+
+        Returns:
+            dict with the exchange response which could be used for updating the TradeOrder
+        """
+        if self.offline:
+            return self.cancel_order(order, priority=priority)
+
+        await self._requests_throttle_async("cancel_order", priority)
+        with self._rate_limit_feedback(self._async_ccxt):
+            return await self._cancel_order_async(order)
+
+    async def get_trades_async(self, order: TradeOrder):
+        """
+        Async version of get_trades.
+        """
+        if self.offline:
+            return self.get_trades(order)
+
+        if self._order_trades_required(order):
+            await self._requests_throttle_async("fetch_my_trades")
+            with self._rate_limit_feedback(self._async_ccxt):
+                resp = await self._fetch_order_trades_async(order)
+        else:
+            resp = order.trades
+
+        return self._checked_order_trades(order, resp)
+
+    async def get_trades_results_async(self, order: TradeOrder):
+        """
+        Async version of get_trades_results.
+        """
+        trades = await self.get_trades_async(order)
+        return self._trades_results(order, trades)
+
+    def fetch_free_balance(self, priority: int = None):
         """
         Fetched the free balance from the exchange. In offline mode returns the  self._offline_balance["free"]
         If the throttling is enabled, the requests with the weight of "fetch_balance" will be counted.
 
+        Args:
+            priority: priority of the request in the throttle's queue (see Throttle.acquire). If not set - the
+             priority of the request type is used
+
         Returns:
             dict with the balances as in ccxt
 
         """
-        if self.requests_throttle is not None:
-            self.requests_throttle.add_request(request_type="fetch_balance")
+        self._requests_throttle("fetch_balance", priority=priority)
 
         result = None
         if self.offline:
             result = self._offline_balance["free"]
         else:
-            result = self._ccxt.fetch_free_balance()
+            with self._rate_limit_feedback():
+                result = self._ccxt.fetch_free_balance()
 
         return result
 
-    def fetch_balance(self):
+    def fetch_balance(self, priority: int = None):
         """
         Fetched the all balances from the exchange. In offline mode returns the  self._offline_balance
         If the throttling is enabled, the requests with the weight of "fetch_balance" will be counted.
 
+        Args:
+            priority: priority of the request in the throttle's queue (see Throttle.acquire). If not set - the
+             priority of the request type is used
+
         Returns:
             dict with the balances as in ccxt
 
         """
 
-        if self.requests_throttle is not None:
-            self.requests_throttle.add_request(request_type="fetch_balance")
+        self._requests_throttle("fetch_balance", priority=priority)
 
         result = None
         if self.offline:
             result = self._offline_balance
         else:
-            result = self._ccxt.fetch_balance()
+            with self._rate_limit_feedback():
+                result = self._ccxt.fetch_balance()
 
         return result
 
@@ -1085,7 +2057,7 @@ class ccxtExchangeWrapper:
         order_resp["create"]["status"] = "open"
         order_resp["create"]["filled"] = 0.0
         order_resp["create"]["id"] = str(uuid.uuid4())
-        order_resp["create"]["timestamp"] = int(time.time() * 1000)
+        order_resp["create"]["timestamp"] = int(self._time() * 1000)
 
         order_resp["updates"] = list()
         order_resp["trades"] = list()
@@ -1144,10 +2116,15 @@ class ccxtExchangeWrapper:
 
         """
         o = self.create_order_offline_data(order, updates_to_fill, fill_zero_updates)
+        return self._set_offline_order_data(order, o)
+
+    @_offline_orders_locked
+    def _set_offline_order_data(self, order: TradeOrder, o: dict):
         order_id = order.internal_id
         self._offline_orders_data[order_id] = dict()
         self._offline_orders_data[order_id]["_offline_order"] = o
         self._offline_orders_data[order_id]["_offline_trades"] = o['trades']
         self._offline_orders_data[order_id]["_offline_order_update_index"] = 0
         self._offline_orders_data[order_id]["_offline_order_cancelled"] = False
+        self._offline_orders_data[order_id]["_offline_order_symbol"] = order.symbol
         return order_id
@@ -17,6 +17,22 @@ class binance(ew.ccxtExchangeWrapper):
             "fetch_my_trades": 1,
             "fetch_balance": 5}
 
+    # weights of open orders requests for single symbol and for all symbols
+    OPEN_ORDERS_WEIGHT = 3
+    ALL_OPEN_ORDERS_WEIGHT = 40
+
+    # request weight per minute (REQUEST_TYPE_WIGHTS), orders per 10 seconds and orders per day
+    REQUEST_LIMITS = {
+        "weight": {"period": 60, "requests_per_period": 1200},
+        "orders_10s": {"period": 10, "requests_per_period": 100, "weights": {"create_order": 1}},
+        "orders_day": {"period": 86400, "requests_per_period": 200000, "weights": {"create_order": 1}}}
+
+    # used weight and order counts reported in the responses
+    RATE_LIMIT_HEADERS = {
+        "weight": "x-mbx-used-weight-1m",
+        "orders_10s": "x-mbx-order-count-10s",
+        "orders_day": "x-mbx-order-count-1d"}
+
     def _patch_fetch_bids_asks(self, symbols=None, params={}):
         """
         fix for ccxt's method fetch_bids_asks for fetching single ticker from bids and asks
@@ -59,6 +75,26 @@ class binance(ew.ccxtExchangeWrapper):
         resp = self._ccxt.cancel_order(order.id, order.symbol)
         return resp
 
+    def _fetch_open_orders(self, symbol=None):
+        resp = self._ccxt.fetch_open_orders(symbol)
+        for o in resp:
+            o["cost"] = float(o["info"]["cummulativeQuoteQty"])
+        return resp
+
+    async def _create_order_async(self, symbol, order_type, side, amount, price=None):
+        resp = await self._async_ccxt.create_order(symbol, order_type, side, amount, price,
+                                                   {"newOrderRespType": "FULL"})
+        resp["cost"] = float(resp["info"]["cummulativeQuoteQty"])
+        return resp
+
+    async def _fetch_order_async(self, order):
+        resp = await self._async_ccxt.fetch_order(order.id, order.symbol)
+        resp["cost"] = float(resp["info"]["cummulativeQuoteQty"])
+        return resp
+
+    async def _cancel_order_async(self, order):
+        return await self._async_ccxt.cancel_order(order.id, order.symbol)
+
     def get_exchange_wrapper_id(self):
         return self.wrapper_id
 
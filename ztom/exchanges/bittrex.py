@@ -6,6 +6,8 @@ class bittrex(ew.ccxtExchangeWrapper):
     could be outdated! just for reference
     """
 
+    SYMBOL_TRADES_FETCHING = False  # trades are taken from the order's data
+
     def __init__(self, exchange_id, api_key ="", secret ="" ):
         super(bittrex, self).__init__(exchange_id, api_key, secret )
         self.wrapper_id = "bittrex"
@@ -19,6 +21,11 @@ class bittrex(ew.ccxtExchangeWrapper):
 
         return list([resp])
 
+    async def _fetch_order_trades_async(self, order):
+
+        resp = await self._async_ccxt.fetch_order(order.id, order.symbol, {"type": order.side.upper()})
+        return list([resp])
+
     def get_exchange_wrapper_id(self):
         return self.wrapper_id
 
@@ -7,6 +7,8 @@ class kucoin(ccxtExchangeWrapper):
     could be outdated! just for reference
     """
 
+    SYMBOL_TRADES_FETCHING = False  # trades are taken from the order's data
+
     def __init__(self, exchange_id, api_key ="", secret ="" ):
         super(kucoin, self).__init__(exchange_id, api_key, secret )
         self.wrapper_id = "kucoin"
@@ -27,6 +29,20 @@ class kucoin(ccxtExchangeWrapper):
 
         return list()
 
+    async def _fetch_order_async(self, order):
+        return await self._async_ccxt.fetch_order(order.id, order.symbol, {"type": order.side.upper()})
+
+    async def _cancel_order_async(self, order: TradeOrder):
+        return await self._async_ccxt.cancel_order(order.id, order.symbol, {"type": order.side.upper()})
+
+    async def _fetch_order_trades_async(self, order):
+
+        resp = await self._async_ccxt.fetch_order(order.id, order.symbol, {"type": order.side.upper()})
+        if "trades" in resp and len(resp["trades"]) > 0:
+            return resp["trades"]
+
+        return list()
+
     @staticmethod
     def fees_from_order_trades(order: TradeOrder):
         """
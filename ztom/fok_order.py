@@ -1,7 +1,6 @@
 from ztom.trade_orders import TradeOrder
 from ztom.action_order import ActionOrder
 from ztom import core
-import datetime
 
 
 class FokOrder(ActionOrder):
@@ -35,7 +34,7 @@ class FokOrder(ActionOrder):
     # than max_order_updates
     def _on_open_order(self, active_trade_order: TradeOrder, market_data=None):
 
-        now = datetime.datetime.now().timestamp()
+        now = self._time()
         self.time_from_create = now - active_trade_order.timestamp_open.get("request_received", now)
 
         if self.time_to_cancel > 0.0:
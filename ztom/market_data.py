@@ -0,0 +1,268 @@
+import abc
+import asyncio
+import copy
+import threading
+from .clock import current_time
+
+
+class MarketDataCache(object):
+    """
+    In-memory last-value cache of streamed market data. Stores the last ticker for every symbol and the last order book
+    for every symbol together with the time they were received.
+
+    Messages are the dicts:
+        {"channel": "tickers", "symbol": "ETH/BTC", "data": {"ask": 0.1, "bid": 0.09, ...}}
+        {"channel": "order_book", "symbol": "ETH/BTC", "data": {"asks": [[price, qty], ...], "bids": [...]}}
+
+    Could be updated from the streaming thread and read from the main thread.
+    """
+
+    def __init__(self, time_func=current_time):
+        self.time_func = time_func
+
+        self.tickers = dict()  # {symbol: ticker}
+        self.order_books = dict()  # {symbol: order book dict}
+
+        self.tickers_timestamps = dict()  # {symbol: time of receiving}
+        self.order_books_timestamps = dict()  # {symbol: time of receiving}
+        self.last_tickers_update = None  # time of the last received ticker for any symbol
+
+        self._lock = threading.Lock()
+
+    def update(self, message: dict):
+        """
+        puts the message data into cache
+        :param message: dict with "channel", "symbol" and "data" fields
+        :return: True if message was cached
+        """
+        channel = message.get("channel")
+        symbol = message.get("symbol")
+        now = self.time_func()
+
+        with self._lock:
+            if channel == "tickers":
+                self.tickers[symbol] = message["data"]
+                self.tickers_timestamps[symbol] = now
+                self.last_tickers_update = now
+                return True
+
+            if channel == "order_book":
+                self.order_books[symbol] = message["data"]
+                self.order_books_timestamps[symbol] = now
+                return True
+
+        return False
+
+    def _is_fresh(self, timestamp, max_age):
+        return timestamp is not None and self.time_func() - timestamp <= max_age
+
+    def get_ticker(self, symbol: str, max_age: float):
+        """
+        returns the copy of cached ticker for symbol if it was received not earlier than max_age seconds ago or None
+        """
+        with self._lock:
+            if symbol in self.tickers and self._is_fresh(self.tickers_timestamps[symbol], max_age):
+                return copy.copy(self.tickers[symbol])
+        return None
+
+    def get_tickers(self, max_age: float):
+        """
+        returns the dict of all cached tickers if any ticker was received not earlier than max_age seconds ago (so the
+        stream is alive) or None
+        """
+        with self._lock:
+            if len(self.tickers) > 0 and self._is_fresh(self.last_tickers_update, max_age):
+                return {k: copy.copy(v) for k, v in self.tickers.items()}
+        return None
+
+    def get_last_ticker(self, symbol: str, max_age: float):
+        """
+        returns the copy of cached ticker for symbol regardless of it's age if any ticker was received not earlier than
+        max_age seconds ago (so the stream is alive and there was no change of symbol's ticker) or None
+        """
+        with self._lock:
+            if symbol in self.tickers and self._is_fresh(self.last_tickers_update, max_age):
+                return copy.copy(self.tickers[symbol])
+        return None
+
+    def get_order_book(self, symbol: str, max_age: float):
+        """
+        returns the copy of cached order book for symbol if it was received not earlier than max_age seconds ago or
+        None
+        """
+        with self._lock:
+            if symbol in self.order_books and self._is_fresh(self.order_books_timestamps[symbol], max_age):
+                return copy.deepcopy(self.order_books[symbol])
+        return None
+
+
+class MarketDataTransport(abc.ABC):
+    """
+    Base class for the pluggable async market data transports (websocket clients, local feeds). Transport should
+    implement subscribe() and receive() coroutines, the transport without them could not be instantiated.
+    """
+
+    async def connect(self):
+        pass
+
+    @abc.abstractmethod
+    async def subscribe(self, channel: str, symbol: str = None, params: dict = None):
+        """
+        subscribes to the channel ("tickers" or "order_book") for symbol. If symbol is None - subscribes for all
+        symbols of the channel.
+        """
+
+    @abc.abstractmethod
+    async def receive(self):
+        """
+        returns the next message dict {"channel": channel, "symbol": symbol, "data": data} or None if the transport
+        was closed
+        """
+
+    async def close(self):
+        pass
+
+
+class SimulatedMarketDataTransport(MarketDataTransport):
+    """
+    Local market data feed which replays the tickers and order books data as the stream of messages for subscribed
+    channels.
+
+    Tickers data is in the format of ccxtExchangeWrapper.load_tickers_from_csv: {fetch_id: {symbol: ticker}}
+    Order books data is in format of ccxtExchangeWrapper.load_offline_order_books_from_csv: {symbol: [order_book, ...]}
+    """
+
+    def __init__(self, tickers: dict = None, order_books: dict = None, interval: float = 0.0):
+        """
+        :param tickers: tickers data to replay
+        :param order_books: order books data to replay
+        :param interval: pause in seconds between the fetches
+        """
+        self.tickers = tickers if tickers is not None else dict()
+        self.order_books = order_books if order_books is not None else dict()
+        self.interval = interval
+
+        self.subscriptions = set()  # of (channel, symbol)
+        self.closed = False
+
+        self._messages = None
+
+    async def subscribe(self, channel: str, symbol: str = None, params: dict = None):
+        self.subscriptions.add((channel, symbol))
+
+    def _subscribed(self, channel, symbol):
+        return (channel, None) in self.subscriptions or (channel, symbol) in self.subscriptions
+
+    def _generate_messages(self):
+        fetches = max(len(self.tickers), max([len(v) for v in self.order_books.values()] or [0]))
+        fetch_ids = sorted(self.tickers.keys())
+
+        for i in range(fetches):
+            if i < len(fetch_ids):
+                for symbol, ticker in self.tickers[fetch_ids[i]].items():
+                    if self._subscribed("tickers", symbol):
+                        yield {"channel": "tickers", "symbol": symbol, "data": ticker}
+
+            for symbol, order_books in self.order_books.items():
+                if i < len(order_books) and self._subscribed("order_book", symbol):
+                    yield {"channel": "order_book", "symbol": symbol, "data": order_books[i]}
+
+            yield None  # end of fetch
+
+    async def receive(self):
+        if self._messages is None:
+            self._messages = self._generate_messages()
+
+        while not self.closed:
+            message = next(self._messages, False)
+
+            if message is False:
+                self.closed = True
+                break
+
+            if message is None:
+                await asyncio.sleep(self.interval)
+                continue
+
+            return message
+
+        return None
+
+    async def close(self):
+        self.closed = True
+
+
+class MarketDataStream(object):
+    """
+    Runs the market data transport and puts the received messages into the MarketDataCache. Could be run as a coroutine
+    within the user's event loop via run() or in a background thread via start().
+    """
+
+    def __init__(self, transport: MarketDataTransport, cache: MarketDataCache = None):
+        self.transport = transport
+        self.cache = cache if cache is not None else MarketDataCache()
+
+        self.subscriptions = list()  # list of (channel, symbol, params)
+        self.running = False
+
+        self._loop = None
+        self._thread = None
+
+    def subscribe(self, channel: str, symbol: str = None, params: dict = None):
+        """
+        adds the subscription. If the stream is already running in background thread, the subscription is sent to the
+        transport immediately.
+        """
+        if (channel, symbol, params) in self.subscriptions:
+            return
+
+        self.subscriptions.append((channel, symbol, params))
+
+        if self.running and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self.transport.subscribe(channel, symbol, params), self._loop)
+
+    async def run(self):
+        """
+        connects the transport, sends the subscriptions and consumes the messages till the transport is closed or stop()
+        is called
+        """
+        self._loop = asyncio.get_running_loop()
+        self.running = True
+
+        try:
+            await self.transport.connect()
+
+            for channel, symbol, params in list(self.subscriptions):
+                await self.transport.subscribe(channel, symbol, params)
+
+            while self.running:
+                message = await self.transport.receive()
+                if message is None:
+                    break
+                self.cache.update(message)
+        finally:
+            self.running = False
+            await self.transport.close()
+
+    def start(self):
+        """
+        starts consuming the stream in the background daemon thread
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """
+        stops the stream and waits for the background thread
+        """
+        self.running = False
+
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.transport.close(), self._loop)
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
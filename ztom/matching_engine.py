@@ -0,0 +1,202 @@
+import uuid
+
+
+class OfflineMatchingEngine(object):
+    """
+    Deterministic matching of offline limit orders against the replayed market data of ccxtExchangeWrapper in offline
+    mode: tickers loaded by set_offline_mode() and order books loaded by load_offline_order_books_from_csv().
+
+    Market data is replayed by steps: step N is the N-th tickers fetch from the tickers file (and the N-th order book of
+    the order's symbol, which is used instead of the ticker if loaded). The order placed after the tickers fetch N is
+    matched starting from step N + latency_steps. Matching is lazy: on every fetch of the order it's matched against
+    the steps replayed since the previous fetch, so the fills depend on the tickers fetches only and not on how often
+    the order is requested.
+
+    Matching of buy order (sell order is symmetric):
+     - on the first matched step the order takes the asks with price <= order's price at the asks prices (taker)
+     - later the order rests in the book and is filled at it's price by the asks volume with price <= order's price.
+       The volume of the ask level consumed by the order is not matched again on the next steps: only the growth of
+       the level's volume above the consumed one is
+     - while the order's price equals to the best bid, it's filled only after the bids volume ahead of it was
+       traded or cancelled: the order joins the queue behind queue_position part of the bids volume at the price level
+       and the queue ahead decreases by the decreases of that level's volume
+
+    Ticker's volumes are used as the volumes of the best levels. If the ticker has no volumes - the volume is unlimited.
+
+    Generated order responses are kept in the exchange's offline orders data, so fetching, cancelling, open orders and
+    trades of simulated orders work as for the orders with the linear fill schedule (see add_offline_order_data).
+
+    Usage:
+        exchange.set_offline_mode("markets.json", "tickers.csv")
+        exchange.load_offline_order_books_from_csv("order_books.csv")  # optional
+        exchange.set_offline_matching_engine(OfflineMatchingEngine(queue_position=0.5, latency_steps=1))
+    """
+
+    def __init__(self, queue_position: float = 1.0, latency_steps: int = 0, max_steps: int = 10000):
+        """
+        :param queue_position: part (0..1) of the volume at the order's price level which is ahead of the order when it
+        joins the level. 1 - order is the last in the queue, 0 - the first.
+        :param latency_steps: number of market data steps from the order placing request till the order is in the book
+        :param max_steps: max number of steps the order is matched for. The order stays open with it's last state
+        after that or when the market data is over.
+        """
+        self.queue_position = queue_position
+        self.latency_steps = latency_steps
+        self.max_steps = max_steps
+
+    @staticmethod
+    def current_step(exchange) -> int:
+        """
+        index of the last tickers fetched from the offline tickers
+        """
+        return max(exchange._offline_tickers_current_index - 1, 0)
+
+    @staticmethod
+    def book(exchange, symbol: str, step: int):
+        """
+        returns (bids, asks) lists of [price, volume] from the order book or the ticker of symbol at step. None if there
+        is no market data for the step.
+        """
+        order_books = exchange._offline_order_books.get(symbol)
+        if order_books is not None and step < len(order_books):
+            return order_books[step]["bids"], order_books[step]["asks"]
+
+        tickers = exchange._offline_tickers.get(step)
+        ticker = tickers.get(symbol) if tickers is not None else None
+        if ticker is None:
+            return None
+
+        bids = [[ticker["bid"], ticker.get("bidVolume") or float("inf")]] if ticker.get("bid") else list()
+        asks = [[ticker["ask"], ticker.get("askVolume") or float("inf")]] if ticker.get("ask") else list()
+
+        return bids, asks
+
+    def create_order_data(self, exchange, order) -> dict:
+        """
+        returns the offline order data in the format of ccxtExchangeWrapper.create_order_offline_data for the order
+        placed at the current step. The order is matched lazily: the data keeps the single update with the order's
+        state which is advanced to the current step of market data replay on every fetch of the order (see
+        match_order_data).
+        """
+        price = exchange.price_to_precision(order.symbol, order.price)
+        amount = exchange.amount_to_precision(order.symbol, order.amount)
+        start = self.current_step(exchange)
+
+        matching = _OrderMatching(str(uuid.uuid4()), order.symbol, order.side, price, amount, start,
+                                  start + self.latency_steps, start + self.max_steps)
+        state = self._match(exchange, matching, start)
+
+        create = dict(state)
+        create.update({"id": matching.order_id, "amount": amount, "price": price,
+                       "timestamp": int(exchange._get_clock().time() * 1000)})
+        create.pop("trades")
+
+        return {"create": create, "updates": [state], "trades": list(), "cancel": {"status": "canceled"},
+                "hold_last_update": True, "matching": matching, "matching_engine": self}
+
+    def match_order_data(self, exchange, order_data: dict):
+        """
+        matches the order of order_data (created by create_order_data) against the market data steps replayed since
+        the previous matching and sets the order's state at the current step as the order's update
+        """
+        order_data["updates"] = [self._match(exchange, order_data["matching"], self.current_step(exchange))]
+
+    def _match(self, exchange, matching: "_OrderMatching", to_step: int) -> dict:
+        m = matching
+        crosses = (lambda p: p <= m.price) if m.side == "buy" else (lambda p: p >= m.price)
+
+        for step in range(m.next_step, min(to_step, m.last_step) + 1):
+            m.next_step = step + 1
+            remaining = m.amount - m.filled
+
+            if step < m.live_step or remaining <= 0:
+                continue
+
+            book = self.book(exchange, m.symbol, step)
+            if book is None:
+                continue
+
+            bids, asks = book
+            opposite, same = (asks, bids) if m.side == "buy" else (bids, asks)
+
+            fills = list()
+            consumed = dict()
+
+            # matching with the opposite side: the volume consumed by the order on the previous steps stays in the
+            # recorded book, so only the new volume (the level's growth above the consumed one) is matched
+            for level_price, level_qty in opposite:
+                if not crosses(level_price) or remaining <= 0:
+                    break
+
+                used = min(m.consumed.get(level_price, 0.0), level_qty)
+                qty = min(level_qty - used, remaining)
+
+                if qty > 0:
+                    fills.append((qty, level_price if step == m.live_step else m.price,
+                                  "taker" if step == m.live_step else "maker"))
+                    remaining -= qty
+                    used += qty
+
+                consumed[level_price] = used
+
+            m.consumed = consumed
+
+            # queue at the order's price level
+            volume = next((q for p, q in same if p == m.price), None)
+
+            if step == m.live_step:
+                m.queue_ahead = self.queue_position * volume if volume is not None else 0.0
+
+            elif volume is not None and same[0][0] == m.price and remaining > 0:
+                if m.level_volume is not None:
+                    m.queue_ahead -= max(m.level_volume - volume, 0.0)
+                m.queue_ahead = min(m.queue_ahead, volume)
+
+                if m.queue_ahead < 0:
+                    qty = min(-m.queue_ahead, remaining)
+                    fills.append((qty, m.price, "maker"))
+                    remaining -= qty
+                    m.queue_ahead = 0.0
+
+            m.level_volume = volume
+
+            for qty, fill_price, taker_or_maker in fills:
+                m.filled += qty
+                m.cost += qty * fill_price
+                m.trades = m.trades + [{"amount": qty, "price": fill_price, "cost": qty * fill_price,
+                                        "order": m.order_id, "takerOrMaker": taker_or_maker}]
+                m.state = None
+
+        if m.state is None:
+            closed = m.amount - m.filled <= m.amount * 1e-12
+            m.state = {"status": "closed" if closed else "open",
+                       "filled": m.amount if closed else m.filled,
+                       "cost": m.cost,
+                       "trades": m.trades}
+
+        return m.state
+
+
+class _OrderMatching(object):
+    """
+    matching state of the order between the fetches: the next market data step to match and the fills so far
+    """
+
+    def __init__(self, order_id: str, symbol: str, side: str, price: float, amount: float, start: int,
+                 live_step: int, last_step: int):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.side = side
+        self.price = price
+        self.amount = amount
+        self.next_step = start
+        self.live_step = live_step
+        self.last_step = last_step
+
+        self.filled = 0.0
+        self.cost = 0.0
+        self.trades = list()
+        self.queue_ahead = 0.0  # volume ahead of order at it's price level
+        self.level_volume = None  # volume at order's price level on previous step
+        self.consumed = dict()  # {price: volume of the opposite side level consumed by order} on previous step
+        self.state = None  # state of order after the last matched step
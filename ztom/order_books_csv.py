@@ -0,0 +1,150 @@
+import array
+import csv
+import numpy as np
+from .orderbook import ArrayOrderBook
+
+
+class OrderBooksColumns(object):
+    """
+    Offline order books of the symbol in the columnar storage: levels of all the fetches are kept in the contiguous
+    arrays of [price, quantity] rows (asks and bids) and the order book of fetch N is the slice of rows between
+    ask_offsets[N]:ask_offsets[N + 1] (bid_offsets for bids).
+
+    Has the sequence interface of the list of order books loaded by
+    ccxtExchangeWrapper.load_offline_order_books_from_csv: item is the dict {"asks": array, "bids": array} where the
+    arrays are the zero-copy views of levels with the shape (levels, 2), so they could be passed to ArrayOrderBook
+    without converting the levels. ccxtExchangeWrapper.fetch_order_book converts the levels to lists, so the fetched
+    order books are the same as with the list loader.
+    """
+
+    def __init__(self, symbol: str, fetch_ids: list, ask_offsets: np.ndarray, asks: np.ndarray,
+                 bid_offsets: np.ndarray, bids: np.ndarray):
+        """
+        :param symbol: symbol
+        :param fetch_ids: fetch ids (values of the first csv column) of the order books
+        :param ask_offsets: array of len(fetch_ids) + 1 offsets of the order books asks in asks array
+        :param asks: array of [price, quantity] asks rows of all the order books
+        :param bid_offsets: array of len(fetch_ids) + 1 offsets of the order books bids in bids array
+        :param bids: array of [price, quantity] bids rows of all the order books
+        """
+        self.symbol = symbol
+        self.fetch_ids = fetch_ids
+        self.ask_offsets = ask_offsets
+        self.asks = asks
+        self.bid_offsets = bid_offsets
+        self.bids = bids
+
+    @property
+    def ask_prices(self) -> np.ndarray:
+        return self.asks[:, 0]
+
+    @property
+    def ask_quantities(self) -> np.ndarray:
+        return self.asks[:, 1]
+
+    @property
+    def bid_prices(self) -> np.ndarray:
+        return self.bids[:, 0]
+
+    @property
+    def bid_quantities(self) -> np.ndarray:
+        return self.bids[:, 1]
+
+    def __len__(self) -> int:
+        return len(self.fetch_ids)
+
+    def _item(self, i: int) -> dict:
+        return {"asks": self.asks[self.ask_offsets[i]:self.ask_offsets[i + 1]],
+                "bids": self.bids[self.bid_offsets[i]:self.bid_offsets[i + 1]]}
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._item(j) for j in range(*i.indices(len(self)))]
+
+        if i < 0:
+            i += len(self)
+
+        if not 0 <= i < len(self):
+            raise IndexError("order book index out of range")
+
+        return self._item(i)
+
+    def __iter__(self):
+        return (self._item(i) for i in range(len(self)))
+
+    def order_book(self, i: int, order_book_class=ArrayOrderBook):
+        """
+        returns the order book object of the fetch number i created from the levels arrays views
+        """
+        item = self[i]
+        return order_book_class(self.symbol, item["asks"], item["bids"])
+
+
+class _SymbolOrderBooksBuilder(object):
+    """
+    accumulates the levels of symbol's order books by fetches during the csv loading
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.fetches = dict()  # {fetch id: index of fetch}
+        self.asks = list()  # array("d") of interleaved price, quantity for every fetch
+        self.bids = list()
+
+    def add(self, fetch_id, ask: float, ask_qty: float, bid: float, bid_qty: float):
+        i = self.fetches.get(fetch_id)
+        if i is None:
+            i = self.fetches[fetch_id] = len(self.asks)
+            self.asks.append(array.array("d"))
+            self.bids.append(array.array("d"))
+
+        self.asks[i].extend((ask, ask_qty))
+        self.bids[i].extend((bid, bid_qty))
+
+    @staticmethod
+    def _columns(levels: list):
+        offsets = np.zeros(len(levels) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(x) // 2 for x in levels])
+        rows = np.frombuffer(b"".join(x.tobytes() for x in levels), dtype=np.float64).reshape(-1, 2)
+        return offsets, rows
+
+    def build(self) -> OrderBooksColumns:
+        ask_offsets, asks = self._columns(self.asks)
+        bid_offsets, bids = self._columns(self.bids)
+        return OrderBooksColumns(self.symbol, list(self.fetches), ask_offsets, asks, bid_offsets, bids)
+
+
+def load_order_books_csv(file_name: str) -> dict:
+    """
+    loads the offline order books csv file (see ccxtExchangeWrapper.load_offline_order_books_from_csv for the format)
+    into the columnar storage in the single pass.
+
+    :param file_name: name of csv file
+    :return: dict {symbol: OrderBooksColumns}
+    """
+    builders = dict()
+
+    with open(file_name, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return dict()
+
+        columns = {name: i for i, name in enumerate(header)}
+        symbol_column = columns["symbol"]
+        ask_column, ask_qty_column = columns["ask"], columns["ask-qty"]
+        bid_column, bid_qty_column = columns["bid"], columns["bid-qty"]
+
+        for row in reader:
+            if not row:
+                continue
+
+            symbol = row[symbol_column]
+            builder = builders.get(symbol)
+            if builder is None:
+                builder = builders[symbol] = _SymbolOrderBooksBuilder(symbol)
+
+            builder.add(row[0], float(row[ask_column]), float(row[ask_qty_column]), float(row[bid_column]),
+                        float(row[bid_qty_column]))
+
+    return {symbol: builder.build() for symbol, builder in builders.items()}
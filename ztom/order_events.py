@@ -0,0 +1,151 @@
+import abc
+import asyncio
+import collections
+import threading
+
+
+class OrderEventsTransport(abc.ABC):
+    """
+    Base class for the pluggable async transports of user's orders execution reports (user data websocket clients,
+    local simulators). Transport should implement receive() coroutine, the transport without it could not be
+    instantiated.
+
+    Events are the dicts with the order's data in ccxt format with the fields to be updated in TradeOrder, at least:
+        {"id": order id, "symbol": symbol, "status": "open", "filled": 0.5, "cost": 0.04}
+
+    Fields are cumulative (like in fetch_order response), so the last event contains the current state of the order.
+    """
+
+    async def connect(self):
+        pass
+
+    async def subscribe(self, params: dict = None):
+        pass
+
+    @abc.abstractmethod
+    async def receive(self):
+        """
+        returns the next order event dict or None if the transport was closed
+        """
+
+    async def close(self):
+        pass
+
+
+class SimulatedOrderEventsTransport(OrderEventsTransport):
+    """
+    Local in-process stream of order events driven by the offline orders data of ccxtExchangeWrapper (see
+    ccxtExchangeWrapper.add_offline_order_data): on every round the next updates of all placed and not canceled
+    offline orders are pushed as the events.
+    """
+
+    IDLE_SLEEP = 0.001  # pause in seconds when there are no events
+
+    def __init__(self, exchange, interval: float = 0.0, close_when_idle: bool = False):
+        """
+        :param exchange: ccxtExchangeWrapper in offline mode
+        :param interval: pause in seconds between the rounds of updates
+        :param close_when_idle: close the transport when there are no more updates of placed orders
+        """
+        self.exchange = exchange
+        self.interval = interval
+        self.close_when_idle = close_when_idle
+
+        self.closed = False
+        self._events = collections.deque()
+
+    async def receive(self):
+        while not self.closed:
+            if len(self._events) > 0:
+                return self._events.popleft()
+
+            events = self.exchange._offline_next_orders_updates(open_only=False)
+
+            if len(events) > 0:
+                self._events.extend(events)
+                await asyncio.sleep(self.interval)
+                continue
+
+            if self.close_when_idle:
+                self.closed = True
+                break
+
+            await asyncio.sleep(max(self.interval, self.IDLE_SLEEP))
+
+        return None
+
+    async def close(self):
+        self.closed = True
+
+
+class OrderEventsStream(object):
+    """
+    Runs the order events transport and collects the received events till they are taken by pop_events(). Could be run
+    as a coroutine within the user's event loop via run() or in a background thread via start().
+    """
+
+    def __init__(self, transport: OrderEventsTransport):
+        self.transport = transport
+
+        self.events = collections.deque()
+        self.received_count = 0
+        self.running = False
+
+        self._loop = None
+        self._thread = None
+
+    async def run(self):
+        """
+        connects the transport and consumes the events till the transport is closed or stop() is called
+        """
+        self._loop = asyncio.get_running_loop()
+        self.running = True
+
+        try:
+            await self.transport.connect()
+            await self.transport.subscribe()
+
+            while self.running:
+                event = await self.transport.receive()
+                if event is None:
+                    break
+                self.events.append(event)
+                self.received_count += 1
+        finally:
+            self.running = False
+            await self.transport.close()
+
+    def pop_events(self) -> list:
+        """
+        returns the received events in the order of receiving and removes them from the stream
+        """
+        events = list()
+        while True:
+            try:
+                events.append(self.events.popleft())
+            except IndexError:
+                break
+        return events
+
+    def start(self):
+        """
+        starts consuming the stream in the background daemon thread
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._thread = threading.Thread(target=asyncio.run, args=(self.run(),), daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """
+        stops the stream and waits for the background thread
+        """
+        self.running = False
+
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.transport.close(), self._loop)
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,334 @@
+import importlib
+import json
+import os
+from .clock import current_time
+from typing import List
+from .trade_orders import TradeOrder
+from .action_order import ActionOrder, ActionOrderSnapshot
+
+
+class OrderJournalError(Exception):
+    """Raised when the journal has the malformed record which is not the incomplete last one"""
+    pass
+
+
+def order_state(order: ActionOrder) -> dict:
+    """
+    returns the json serializable state of ActionOrder (or it's subclass) with it's active and closed trade orders
+    """
+    state = dict()
+    for key, value in order.__dict__.items():
+        if key in order.UNTRACKED_FIELDS:
+            continue
+
+        if key == "active_trade_order":
+            value = trade_order_state(value) if value is not None else None
+        elif key == "orders_history":
+            value = [trade_order_state(o) for o in value]
+
+        state[key] = value
+
+    return {"class": "{}.{}".format(type(order).__module__, type(order).__qualname__), "state": state}
+
+
+def order_record_state(order: ActionOrder, journaled_ids: set) -> dict:
+    """
+    returns the state of order for the journal's order record: the closed trade orders are referenced by their
+    internal ids in orders_history and only those not in journaled_ids are included in "closed_orders"
+    """
+    data = order_state(order)
+    history = data["state"]["orders_history"]
+    data["state"]["orders_history"] = [o["internal_id"] for o in history]
+    data["closed_orders"] = [o for o in history if o["internal_id"] not in journaled_ids]
+    return data
+
+
+def trade_order_state(order: TradeOrder) -> dict:
+    """
+    returns the json serializable state of TradeOrder. Raw exchange response (info) and order book are not included.
+    """
+    return {key: value for key, value in order.__dict__.items()
+            if key not in order.UNTRACKED_FIELDS and key not in OrderJournal.TRADE_ORDER_SKIPPED_FIELDS}
+
+
+def order_from_state(data: dict) -> ActionOrder:
+    """
+    creates the ActionOrder (or the subclass of ActionOrder stored in data) from the state returned by order_state()
+    """
+    module_name, _, class_name = data["class"].rpartition(".")
+    cls = getattr(importlib.import_module(module_name), class_name)
+
+    if not (isinstance(cls, type) and issubclass(cls, ActionOrder)):
+        raise TypeError("{} is not ActionOrder".format(data["class"]))
+
+    state = dict(data["state"])
+
+    if state.get("active_trade_order") is not None:
+        state["active_trade_order"] = trade_order_from_state(state["active_trade_order"])
+
+    state["orders_history"] = [trade_order_from_state(o) for o in state.get("orders_history", list())]
+
+    if state.get("previous_snapshot") is not None:
+        state["previous_snapshot"] = ActionOrderSnapshot(*state["previous_snapshot"])
+
+    order = cls.__new__(cls)
+    order.__dict__.update(state)
+    return order
+
+
+def trade_order_from_state(state: dict) -> TradeOrder:
+    order = TradeOrder.__new__(TradeOrder)
+    order.__dict__.update({key: None for key in OrderJournal.TRADE_ORDER_SKIPPED_FIELDS})
+    order.__dict__.update(state)
+    return order
+
+
+def _dumps(record: dict) -> str:
+    try:
+        return json.dumps(record)
+    except (TypeError, ValueError) as e:
+        raise OrderJournalError("Journal record is not json serializable: {}".format(e)) from e
+
+
+class OrderJournal(object):
+    """
+    Append-only journal of ActionOrders states for restoring the orders after the crash of process.
+
+    The journal is the file of json lines:
+        {"t": "snapshot", "orders": [order state, ...]} - states of all the orders at the moment of snapshot
+        {"t": "order", "order": order state} - state of the order after it's change. The closed trade orders in
+            orders_history are referenced by internal ids and only the trade orders closed since the previous record of
+            the order are included in the "closed_orders" of the record, so the record size does not grow with the
+            order's history.
+
+    Records are buffered and written to the file when buffer_size records are collected or on flush(). The file is
+    fsynced on flush() not more often than every fsync_interval seconds (group fsync), so the records of the last
+    fsync_interval could be lost on the crash of the OS, but not on the crash of the process after flush().
+
+    snapshot() rewrites the journal with the single snapshot record (via the temporary file and atomic replace), so the
+    journal size and replay time are bounded by the number of records between snapshots. Snapshot records have the
+    full orders histories. The orders recorded as closed since the previous snapshot are included into the snapshot, so
+    their final states are kept till the next snapshot.
+
+    OrderJournalError is raised if the order's state is not json serializable.
+
+    Usage:
+        journal = OrderJournal("orders.journal")
+        om = ActionOrderManager(exchange, journal=journal)
+        ...
+        # after the restart
+        om = ActionOrderManager(exchange, journal=OrderJournal("orders.journal"))
+        om.restore_from_journal()
+    """
+
+    TRADE_ORDER_SKIPPED_FIELDS = ("info", "order_book")
+
+    def __init__(self, path: str, buffer_size: int = 256, fsync_interval: float = 1.0, snapshot_every: int = 10000,
+                 time_func=current_time):
+        """
+        :param path: path to the journal file
+        :param buffer_size: number of records buffered before writing to the file
+        :param fsync_interval: min time in seconds between fsyncs of the file. 0 - fsync on every flush()
+        :param snapshot_every: number of order records after which the snapshot is due (see snapshot_due())
+        :param time_func: function which returns current time in seconds
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self.time_func = time_func
+
+        self.records_count = 0  # number of order records since the last snapshot
+        self.fsync_count = 0
+
+        self._buffer = list()
+        self._file = None
+        self._last_fsync = None
+        self._versions = dict()  # {order id: versions of order and active trade order on the last record}
+        self._journaled_ids = dict()  # {order id: set of internal ids of closed trade orders in the journal}
+        self._closed_orders = dict()  # {order id: order} orders recorded as closed since the last snapshot
+
+    @staticmethod
+    def _order_version(order: ActionOrder):
+        trade_order = order.get_active_order()
+        return order.version, trade_order.internal_id if trade_order is not None else None, \
+            trade_order.version if trade_order is not None else None
+
+    def record(self, order: ActionOrder, force: bool = False) -> bool:
+        """
+        appends the state of order to the journal if the order or it's active trade order were changed since the last
+        record (or force is set)
+
+        :return: True if the record was added
+        """
+        version = self._order_version(order)
+        if not force and self._versions.get(order.id) == version:
+            return False
+
+        journaled_ids = self._journaled_ids.setdefault(order.id, set())
+        self._buffer.append(_dumps({"t": "order", "order": order_record_state(order, journaled_ids)}))
+        journaled_ids.update(o.internal_id for o in order.orders_history)
+        self._versions[order.id] = version
+        self.records_count += 1
+
+        if order.status != "open":
+            self._closed_orders[order.id] = order
+
+        if len(self._buffer) >= self.buffer_size:
+            self._write_buffer()
+
+        return True
+
+    def _open(self):
+        if self._file is None:
+            self._truncate_torn_record()
+            self._file = open(self.path, "a")
+        return self._file
+
+    def _truncate_torn_record(self):
+        """
+        removes the incomplete last line (left if the process was killed while writing), so the next records are not
+        appended to it
+        """
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+
+            while position > 0:
+                size = min(4096, position)
+                f.seek(position - size)
+                newline = f.read(size).rfind(b"\n")
+                if newline >= 0:
+                    position = position - size + newline + 1
+                    break
+                position -= size
+
+            if position < end:
+                f.truncate(position)
+
+    def _write_buffer(self):
+        if len(self._buffer) == 0:
+            return
+
+        f = self._open()
+        f.write("\n".join(self._buffer) + "\n")
+        self._buffer = list()
+
+    def flush(self, fsync: bool = None):
+        """
+        writes the buffered records to the file and fsyncs it if fsync_interval has passed since the last fsync (or
+        fsync is True)
+        """
+        self._write_buffer()
+
+        if self._file is None:
+            return
+
+        self._file.flush()
+
+        now = self.time_func()
+        if fsync is None:
+            fsync = self._last_fsync is None or now - self._last_fsync >= self.fsync_interval
+
+        if fsync:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+            self.fsync_count += 1
+
+    def snapshot_due(self) -> bool:
+        return self.snapshot_every is not None and self.records_count >= self.snapshot_every
+
+    def snapshot(self, orders: List[ActionOrder]):
+        """
+        replaces the journal with the single snapshot record of orders and the orders recorded as closed since the
+        previous snapshot
+        """
+        orders = list(orders) + [o for o in self._closed_orders.values() if o not in orders]
+        record = _dumps({"t": "snapshot", "orders": [order_state(o) for o in orders]})
+
+        self._buffer = list()
+        self.close()
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(record + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.path)
+
+        self._reset_journaled(orders)
+        self._closed_orders = dict()
+        self.records_count = 0
+        self._last_fsync = self.time_func()
+
+    def _reset_journaled(self, orders: List[ActionOrder]):
+        self._versions = {o.id: self._order_version(o) for o in orders}
+        self._journaled_ids = {o.id: {t.internal_id for t in o.orders_history} for o in orders}
+
+    def close(self):
+        self.flush(fsync=True)
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @classmethod
+    def replay(cls, path: str) -> dict:
+        """
+        reads the journal and returns the dict {order id: last order state} in the order of the first appearance of
+        orders. The orders histories of order records are merged with the closed trade orders of the previous records
+        and snapshot. The incomplete last line (if the process was killed while writing) is skipped, OrderJournalError is
+        raised on any other malformed record.
+        """
+        states = dict()
+
+        if not os.path.exists(path):
+            return states
+
+        with open(path) as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # every record is written with the line end, so only the last line could be incomplete
+                    if not line.endswith("\n"):
+                        break
+                    raise OrderJournalError("Malformed record in line {} of journal {}".format(line_number, path))
+
+                if record["t"] == "snapshot":
+                    states = {o["state"]["id"]: o for o in record["orders"]}
+                elif record["t"] == "order":
+                    order_id = record["order"]["state"]["id"]
+                    states[order_id] = cls._merge_history(states.get(order_id), record["order"], line_number, path)
+
+        return states
+
+    @staticmethod
+    def _merge_history(previous: dict, data: dict, line_number: int, path: str) -> dict:
+        """
+        returns the order state of the order record data with the orders_history ids resolved to the closed trade orders
+        states of the record and of the previous state of the order
+        """
+        closed_orders = {o["internal_id"]: o for o in previous["state"]["orders_history"]} if previous else dict()
+        closed_orders.update({o["internal_id"]: o for o in data.get("closed_orders", list())})
+
+        state = dict(data["state"])
+        try:
+            state["orders_history"] = [closed_orders[internal_id] for internal_id in state["orders_history"]]
+        except KeyError as e:
+            raise OrderJournalError("Unknown trade order {} in line {} of journal {}".format(e, line_number, path))
+
+        return {"class": data["class"], "state": state}
+
+    def load_orders(self) -> List[ActionOrder]:
+        """
+        restores the orders from the journal file
+        """
+        self.flush()
+        orders = [order_from_state(state) for state in self.replay(self.path).values()]
+        self._reset_journaled(orders)
+        return orders
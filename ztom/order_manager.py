@@ -3,13 +3,51 @@ from . import ccxtExchangeWrapper
 from . import ActionOrder
 from . import core
 from . import utils
+from .order_store import OrderStore
+from .order_scheduler import OrderPollScheduler
+from .retry import RetryPolicy
+from .order_journal import OrderJournal
+from .data_requests import DataProviderRegistry, DataRequest, compile_command, compile_data_request, value_from_path
+from .clock import current_time
 from datetime import datetime
 from .errors import *
 import copy
-import time
+import concurrent.futures
+import warnings
 from typing import List
 
 
+class _OrdersList(list):
+    """
+    list of orders returned by ActionOrderManager.orders. Orders appended to the list are added to the manager
+    (deprecated: use ActionOrderManager.add_order). The list is the copy of the manager's orders, so the other in-place
+    changes (remove, pop, insert, clear, item assignment and deletion) raise TypeError instead of being silently lost.
+    """
+
+    def __init__(self, manager, orders):
+        super().__init__(orders)
+        self._manager = manager
+
+    def append(self, order):
+        warnings.warn("ActionOrderManager.orders.append() is deprecated, use add_order()", DeprecationWarning,
+                      stacklevel=2)
+        super().append(order)
+        self._manager.add_order(order)
+
+    def extend(self, orders):
+        warnings.warn("ActionOrderManager.orders.extend() is deprecated, use add_order()", DeprecationWarning,
+                      stacklevel=2)
+        for order in orders:
+            super().append(order)
+            self._manager.add_order(order)
+
+    def _not_supported(self, *args, **kwargs):
+        raise TypeError("ActionOrderManager.orders is the copy of the manager's orders and could not be changed in "
+                        "place: use add_order() to add the orders")
+
+    remove = pop = insert = clear = __setitem__ = __delitem__ = __imul__ = _not_supported
+
+
 class ActionOrderManager(object):
 
     LOG_DEBUG = "DEBUG"
@@ -20,9 +58,31 @@ class ActionOrderManager(object):
     DATA_REQUEST_DELIMITER = ";" # Delimiter to specify several data requests within the order command
     DATA_FETCHING_METHODS = {"tickers": "_fetch_ticker"}  # should be in lower case
 
+    # parameters of data providers registered for DATA_FETCHING_METHODS (see register_data_provider)
+    DATA_FETCHING_OPTIONS = {"tickers": {"key_params": 1}}
+
+    # methods for fetching the data for all the orders' requests with the same key at once (see
+    # _prepare_data_for_orders). Should be in lower case
+    DATA_BATCH_FETCHING_METHODS = {"tickers": "_fetch_tickers_batch"}
+
     def __init__(self, exchange: ccxtExchangeWrapper, max_order_update_attempts=20, max_cancel_attempts=10,
-                 request_sleep=0.0):
-        self.orders = list()
+                 request_sleep=0.0, max_workers: int = None, order_store: OrderStore = None,
+                 poll_scheduler: OrderPollScheduler = None, retry_policy: RetryPolicy = None,
+                 journal: OrderJournal = None):
+        """
+        :param exchange: exchange wrapper
+        :param max_order_update_attempts: max number of attempts to create or update the trade order
+        :param max_cancel_attempts: max number of attempts to cancel the trade order
+        :param request_sleep: pause in seconds between the attempts
+        :param max_workers: if set - the exchange requests of open orders are sent concurrently from the thread pool of
+        max_workers threads (executor mode). Results are applied to the orders in the order of adding to the manager.
+        :param order_store: OrderStore for keeping the orders. If not set - OrderStore with default parameters is used
+        :param poll_scheduler: OrderPollScheduler for updating the orders with "hold" command only when their poll time
+        has come. If not set - all the open orders are updated on every proceed_orders()
+        :param retry_policy: RetryPolicy for the exchange requests. If not set - requests are retried
+        max_order_update_attempts times with request_sleep pause
+        :param journal: OrderJournal where the orders states are recorded after every change. See restore_from_journal()
+        """
 
         if not int(max_order_update_attempts):
             raise(OwaManagerError("Bad max_order_update_attempts {}".format(max_order_update_attempts)))
@@ -30,19 +90,37 @@ class ActionOrderManager(object):
         if not int(max_cancel_attempts):
             raise(OwaManagerError("Bad max_cancel_attempts {}".format(max_cancel_attempts)))
 
+        if max_workers is not None and int(max_workers) < 1:
+            raise(OwaManagerError("Bad max_workers {}".format(max_workers)))
+
         self.max_order_update_attempts = max_order_update_attempts
         self.max_cancel_attempts = max_cancel_attempts
 
         self.last_update_time = datetime(1, 1, 1, 1, 1, 1, 1)
 
-        self.orders = list()
-        self._prev_orders_status = dict()  # dict of orders by id
-
         self.exchange = exchange
+
+        self.order_store = order_store if order_store is not None else OrderStore()
+        self.journal = self._follow_clock(journal)
+        self.poll_scheduler = self._follow_clock(poll_scheduler)
+        # {order_id: order} to be proceeded on the next proceed_orders() regardless of the poll schedule: added orders,
+        # orders with "new" or "cancel" commands and the orders skipped by the previous proceed_orders()
+        self._pending_orders = dict()
+        self._prev_orders_versions = dict()  # {order_id: ActionOrder's version before the last update}
+
         self.supplementary = dict()  # dict of supplementary data  as {"order_id": {dict of data}}
 
         self._last_update_closed_orders = list()  # closed orders from last update
         self.request_sleep = request_sleep
+        self.retry_policy = retry_policy
+
+        self.defer_retries = False
+        """
+        if True - failed requests of the order are not retried inline: the order is skipped till the pause of retry
+        policy passes and the request is retried on the later proceed_orders()
+        """
+        # {trade order's internal id: {request: {"request", "attempt", "started", "retry_at"}}}
+        self._deferred_retries = dict()
 
         self.request_trades = True  # set to False if trades are not needed for collecting all the order's data
         """
@@ -51,6 +129,14 @@ class ActionOrderManager(object):
 
         self.data_for_orders = dict()  # data for orders provided externally. resets on every proceed_orders()
         self._prepared_data_for_orders = dict()  # data for orders compiled from external data and fetched data
+        self._data_for_orders_keys = (None, 0, dict())  # (data_for_orders, len, {KEY: key}) - upper case keys
+
+        self.data_providers = DataProviderRegistry(time_func=self._time)
+        """
+        providers of data for orders' data requests (see register_data_provider)
+        """
+        for key, method in self.DATA_FETCHING_METHODS.items():
+            self.register_data_provider(key, getattr(self, method), **self.DATA_FETCHING_OPTIONS.get(key, dict()))
 
         self.offline_order_updates = 10  # number of trades for offline order data
         self.offline_order_zero_fill_updates = 0
@@ -58,74 +144,179 @@ class ActionOrderManager(object):
         number of order updates with zero filled amount  
         """
 
+        self.max_workers = max_workers
+        self._executor = None  # type: concurrent.futures.ThreadPoolExecutor
+
+        self.bulk_order_updates = False
+        """
+        if True - the open trade orders are updated with the bulk request of open orders (see
+        ccxtExchangeWrapper.get_open_orders_updates) instead of fetching every order
+        """
+        self._bulk_order_updates = dict()  # {trade order id: update resp} fetched for the current proceed_orders()
+
+        self.order_events_enabled = False
+        """
+        if True - the trade orders are updated from the exchange's order events stream (see enable_order_events)
+        """
+        self.order_events_applied = 0  # number of order events applied to the orders
+
+        self.bulk_tickers_min_symbols = 2
+        """
+        min number of distinct symbols requested by orders during one proceed_orders() to fetch all the tickers with the
+        single request instead of fetching tickers for every symbol
+        """
+
+    def _get_retry_policy(self) -> RetryPolicy:
+        if self.retry_policy is not None:
+            return self.retry_policy
+        return RetryPolicy.fixed(self.max_order_update_attempts, self.request_sleep, clock=self._get_clock())
+
+    def _get_clock(self):
+        """
+        clock of the manager: the exchange wrapper's clock (see ccxtExchangeWrapper.set_clock)
+        """
+        return self.exchange._get_clock()
+
+    def _time(self) -> float:
+        return self._get_clock().time()
+
+    def _follow_clock(self, obj):
+        """
+        makes the object with time_func (OrderPollScheduler, OrderJournal) which uses the process wide clock use the
+        manager's clock
+        """
+        if obj is not None and obj.time_func is current_time:
+            obj.time_func = self._time
+        return obj
+
+    def _pop_deferred_retry(self, trade_order: TradeOrder, request: str):
+        """
+        removes the state of deferred retries of trade order's request and returns it (None if there is no state). The
+        states of other requests of the trade order are kept.
+        """
+        if trade_order is None or trade_order.internal_id not in self._deferred_retries:
+            return None
+
+        states = self._deferred_retries[trade_order.internal_id]
+        state = states.pop(request, None)
+        if len(states) == 0:
+            del self._deferred_retries[trade_order.internal_id]
+
+        return state
+
+    def _deferred_retry_at(self, trade_order: TradeOrder):
+        """
+        returns the time when the deferred requests of trade order could be retried or None if there are no deferred
+        requests
+        """
+        states = self._deferred_retries.get(trade_order.internal_id)
+        return max(state["retry_at"] for state in states.values()) if states else None
+
+    def _retry_params(self, description: str, trade_order: TradeOrder = None):
+        """
+        returns the dict of parameters for RetryPolicy.run(): errors logging, deferring of retries (if
+        self.defer_retries is set) and the state of retries deferred on previous updates of the trade order
+        """
+        policy = self._get_retry_policy()
+        state = self._pop_deferred_retry(trade_order, description)
+
+        attempt = state["attempt"] if state is not None else 0
+        started = state["started"] if state is not None else policy.time_func()
+
+        def on_error(e, attempt_number):
+            self.log(self.LOG_ERROR, "Could not {} (attempt #{})".format(description, attempt_number))
+            self.log(self.LOG_ERROR, type(e).__name__)
+            self.log(self.LOG_ERROR, e.args)
+
+        def before_retry(error, attempt_number, delay):
+            if self.defer_retries and trade_order is not None and error is not None:
+                self._defer_retry(trade_order, description, attempt_number, started, delay)
+
+            self.log(self.LOG_INFO, "Pause for {}s".format(delay))
+
+        return {"on_error": on_error, "before_retry": before_retry, "attempt": attempt, "started": started}
+
+    def _defer_retry(self, trade_order: TradeOrder, request: str, attempt: int, started: float, delay: float):
+        """
+        saves the state of retries of trade order's request and raises OrderRequestDeferred
+        """
+        retry_at = self._get_retry_policy().time_func() + delay
+        self._save_deferred_retry(trade_order, request, attempt, started, retry_at)
+
+        raise OrderRequestDeferred("Request to {} {} is deferred for {}s".format(request, trade_order.internal_id,
+                                                                                 delay))
+
+    def _save_deferred_retry(self, trade_order: TradeOrder, request: str, attempt: int, started: float,
+                             retry_at: float):
+        self._deferred_retries.setdefault(trade_order.internal_id, dict())[request] = {
+            "request": request, "attempt": attempt, "started": started, "retry_at": retry_at}
+
+    def _keep_cancel_attempts(self, trade_order: TradeOrder, cancel_attempt: int, started: float):
+        """
+        saves the cancel attempts of the trade order when the update request within cancel_order() was deferred, so the
+        cancelling is continued with the same attempts number when the update is retried
+        """
+        self._save_deferred_retry(trade_order, "cancel order", cancel_attempt, started,
+                                  self._deferred_retry_at(trade_order))
+
     def _create_order(self, order: TradeOrder):
 
         if self.exchange.offline and order.internal_id not in self.exchange._offline_orders_data:
             self.exchange.add_offline_order_data(order, self.offline_order_updates,
                                                  self.offline_order_zero_fill_updates)
 
-        results = None
-        i = 0
-        while bool(results) is not True and i < self.max_order_update_attempts:
-            self.log(self.LOG_DEBUG, "creating order attempt #{}".format(i))
-            try:
-                results = self.exchange.place_limit_order(order)
-            except Exception as e:
-                self.log(self.LOG_ERROR, type(e).__name__)
-                self.log(self.LOG_ERROR, e.args)
-                self.log(self.LOG_INFO, "retrying to create order...")
-
-                self.log(self.LOG_INFO, "Pause for {}s".format(self.request_sleep))
-                time.sleep(self.request_sleep)
-
-            i += 1
-
-        return results
+        self.log(self.LOG_DEBUG, "creating order")
+        return self._get_retry_policy().run(lambda: self.exchange.place_limit_order(order),
+                                            **self._retry_params("create order", order))
 
     def _update_order(self, order: TradeOrder):
-        results = None
-        i = 0
-        while bool(results) is not True and i < self.max_order_update_attempts:
-            self.log(self.LOG_DEBUG, "..updating trade order {} / {}".format(i,self.max_order_update_attempts ))
-            try:
-                results = self.exchange.get_order_update(order)
-            except Exception as e:
-                self.log(self.LOG_ERROR, "Could not update order")
-                self.log(self.LOG_ERROR, type(e).__name__)
-                self.log(self.LOG_ERROR, e.args)
-                self.log(self.LOG_INFO, "Pause for {}s".format(self.request_sleep))
-                time.sleep(self.request_sleep)
-            i += 1
-
-        return results
+        self.log(self.LOG_DEBUG, "..updating trade order")
+        return self._get_retry_policy().run(lambda: self.exchange.get_order_update(order),
+                                            **self._retry_params("update order", order))
 
     def _cancel_order(self, order: TradeOrder):
         return self.exchange.cancel_order(order)
 
     # blocking method !!!!!
     def cancel_order(self, trade_order: TradeOrder):
-        cancel_attempt = 0
+        policy = self._get_retry_policy()
+        state = self._pop_deferred_retry(trade_order, "cancel order")
+
+        cancel_attempt = state["attempt"] if state is not None else 0
+        started = state["started"] if state is not None else policy.time_func()
 
         while cancel_attempt < self.max_cancel_attempts:
             cancel_attempt += 1
+            error = None
             try:
                 self._cancel_order(trade_order)
 
             except Exception as e:
+                error = e
                 self.log(self.LOG_ERROR, "Cancel error...")
                 self.log(self.LOG_ERROR, type(e).__name__)
                 self.log(self.LOG_ERROR, e.args)
-                self.log(self.LOG_INFO, "Pause for {}s".format(self.request_sleep))
-                time.sleep(self.request_sleep)
 
-            finally:
-                self.log(self.LOG_DEBUG, "Updating the Trade Order to check if it was canceled or closed...")
+            self.log(self.LOG_DEBUG, "Updating the Trade Order to check if it was canceled or closed...")
+            try:
                 resp = self._update_order(trade_order)
-                self.log(self.LOG_DEBUG, "Update resp: {}".format(resp))
-                if resp is not None and "status" in resp and (resp["status"] == "closed"
-                                                              or resp["status"] == "canceled"):
-                    self.log(self.LOG_DEBUG, "... canceled with status {}".format(resp["status"]))
-                    return resp
+            except OrderRequestDeferred:
+                self._keep_cancel_attempts(trade_order, cancel_attempt, started)
+                raise
+
+            self.log(self.LOG_DEBUG, "Update resp: {}".format(resp))
+            if resp is not None and "status" in resp and (resp["status"] == "closed"
+                                                          or resp["status"] == "canceled"):
+                self.log(self.LOG_DEBUG, "... canceled with status {}".format(resp["status"]))
+                return resp
+
+            if error is not None and cancel_attempt < self.max_cancel_attempts:
+                delay = policy.delay(cancel_attempt)
+                if self.defer_retries:
+                    self._defer_retry(trade_order, "cancel order", cancel_attempt, started, delay)
+
+                self.log(self.LOG_INFO, "Pause for {}s".format(delay))
+                policy.sleep(delay)
 
         return None
 
@@ -138,29 +329,41 @@ class ActionOrderManager(object):
                 print("{} ... {}".format(level, line))
 
     def _get_trade_results(self, order: TradeOrder):
+        self.log(self.LOG_DEBUG, "getting trades")
+        return self._get_retry_policy().run(lambda: self.exchange.get_trades_results(order), accept_empty=True,
+                                            **self._retry_params("get trades"))
 
-        results = None
-        i = 0
-        while bool(results) is not True and i < self.max_order_update_attempts:
-            self.log(self.LOG_DEBUG, "getting trades #{}".format(i))
-            try:
-                results = self.exchange.get_trades_results(order)
-                return results
-            except Exception as e:
-                self.log(self.LOG_ERROR, type(e).__name__)
-                self.log(self.LOG_ERROR, e.args)
-                self.log(self.LOG_INFO, "Pause for {}s".format(self.request_sleep))
-                time.sleep(self.request_sleep)
-                self.log(self.LOG_INFO, "retrying to get trades...")
-            i += 1
+    @property
+    def orders(self) -> List[ActionOrder]:
+        """
+        list of orders in the order store (excluding archived closed orders if the store's max_closed is set) in the
+        order of adding
+        """
+        return _OrdersList(self, self.order_store.orders())
 
-        return None
+    @orders.setter
+    def orders(self, orders: List[ActionOrder]):
+        warnings.warn("Setting of ActionOrderManager.orders is deprecated, use add_order()", DeprecationWarning,
+                      stacklevel=2)
+
+        store = self.order_store
+        self.order_store = OrderStore(store.max_closed, store.archive_size, store.journal_file)
+        for order in orders:
+            self.add_order(order)
 
     def add_order(self, order: ActionOrder):
-        self.orders.append(order)
+        order.set_clock(self._get_clock())
+        order.set_command_listener(self._on_order_command_changed)
+        self._pending_orders[order.id] = order
+
+        if self._order_action(order.order_command) == "new" and len(order.orders_history) == 0:
+            order.timestamp = order._time()  # creation time by the manager's clock
+
+        self.order_store.add(order)
+        self._journal_order(order)
 
     def get_order_by_uuid(self, uuid):
-        pass
+        return self.order_store.get(uuid)
 
     def _update_order_from_exchange(self, order: ActionOrder, resp, market_data=None):
 
@@ -216,22 +419,43 @@ class ActionOrderManager(object):
         #     return utils.dict_value_from_path(ticker, request_params_split)
         return ticker
 
+    def _fetch_tickers_batch(self, symbols: List[str]):
+        """
+        fetches the tickers for all the symbols requested by orders with the fewest requests: all the tickers by the
+        single request if all tickers are requested (empty symbol) or the number of symbols is not less than
+        self.bulk_tickers_min_symbols, otherwise the ticker for the single symbol.
+
+        :param symbols: list of requested symbols. Empty string means all tickers.
+        :return: dict of tickers {symbol: ticker}
+        """
+
+        if "" in symbols:
+            return self.exchange.fetch_tickers()
+
+        if len(symbols) >= self.bulk_tickers_min_symbols:
+            tickers = self.exchange.fetch_tickers()
+            requested = {symbol.upper() for symbol in symbols}
+            return {k: v for k, v in tickers.items() if k.upper() in requested}
+
+        return self.exchange.fetch_tickers(symbols[0])
+
     def get_open_orders(self) -> List[ActionOrder]:
-        return list(filter(lambda x: x.status != "closed", self.orders))
+        return self.order_store.open_orders()
 
     def have_open_orders(self):
         """
         returns True if there are open orders or False if no
 
         """
-        if len(list(filter(lambda x: x.status != "closed", self.orders))) >0 :
-            return True
-        return False
-
+        return self.order_store.has_open_orders()
 
     def get_order_by_id(self, order_id):
-        o = (order for order in self.orders if order.id == order_id)
-        return o
+        """
+        returns the generator of orders with the order_id (including archived orders). See get_order_by_uuid for
+        getting the order itself.
+        """
+        order = self.order_store.get(order_id)
+        return (o for o in ([order] if order is not None else list()))
 
     def set_order_supplementary_data(self, order: ActionOrder, data: dict):
         """
@@ -246,6 +470,27 @@ class ActionOrderManager(object):
 
         return True
 
+    def register_data_provider(self, key: str, func, cost: float = 1, freshness: float = 0.0,
+                               key_params: int = None):
+        """
+        registers the source of data for the orders' data requests with the key. Values returned by the provider are
+        shared between the orders requesting the same data during the proceed_orders() and, if freshness is set, between
+        the proceed_orders() calls.
+
+        Example:
+            om.register_data_provider("depth", lambda params: fetch_depth(params.split(" ")[0]), cost=5,
+                                      freshness=1.0, key_params=1)
+            order.order_command = "hold depth ETH/BTC bids"
+
+        :param key: data request key
+        :param func: function func(request_params: str) which returns the data for the request
+        :param cost: cost of the provider's call (for example the weight of exchange request)
+        :param freshness: time in seconds the fetched value could be reused. 0 - only during the proceed_orders()
+        :param key_params: number of request's params used for fetching the value (the rest params are the path within
+        the value). None - all the params
+        """
+        self.data_providers.register(key, func, cost=cost, freshness=freshness, key_params=key_params)
+
     @staticmethod
     def _order_action(order_command: str) -> str:
         """
@@ -264,7 +509,7 @@ class ActionOrderManager(object):
         :return: order action: "hold", "new", "cancel"
 
         """
-        return order_command.split(" ")[0]
+        return compile_command(order_command, ActionOrderManager.DATA_REQUEST_DELIMITER).action
 
     @staticmethod
     def _data_requests(order_command: str) -> List[str]:
@@ -274,15 +519,30 @@ class ActionOrderManager(object):
         :return: list of data_requests or None if there is no data request
         """
 
-        splitted_command = order_command.split(" ", 1)
+        data_requests = compile_command(order_command, ActionOrderManager.DATA_REQUEST_DELIMITER).data_requests
+        return list(data_requests) if data_requests is not None else None
 
-        if len(splitted_command) > 1:
-            data_request = order_command.split(" ", 1)[1]
-            data_requests = data_request.split(ActionOrderManager.DATA_REQUEST_DELIMITER)
-            data_requests_stripped = [dr.strip() for dr in data_requests if dr is not None and dr.strip() != ""]
-            return data_requests_stripped
-        else:
-            return None
+    @staticmethod
+    def _compiled_data_requests(order_command: str) -> tuple:
+        """
+        returns the tuple of parsed DataRequests from the order command
+        """
+        return compile_command(order_command, ActionOrderManager.DATA_REQUEST_DELIMITER).requests
+
+    def _data_for_orders_key(self, key: str):
+        """
+        returns the key of self.data_for_orders matching the key case insensitive way or None. Keys in upper case are
+        cached while the self.data_for_orders dict and it's size are not changed.
+        """
+        if key in self.data_for_orders:
+            return key
+
+        data_for_orders, size, keys = self._data_for_orders_keys
+        if data_for_orders is not self.data_for_orders or size != len(self.data_for_orders):
+            keys = {k.upper(): k for k in self.data_for_orders.keys()}
+            self._data_for_orders_keys = (self.data_for_orders, len(self.data_for_orders), keys)
+
+        return keys.get(key.upper())
 
     def _single_data_request_value(self, data_request: str, action_order_id: str = "NOT_SET"):
         """
@@ -315,45 +575,34 @@ class ActionOrderManager(object):
             raise(OwaManagerError("Order {action_order_id}. Empty data request".format(
                 action_order_id=action_order_id)))
 
-        data_request_split = data_request.split(" ")
-        # data_request_all = data_request_split[0:]
-
-        data_request_key = data_request_split[0]
-        data_request_parameters = " ".join(data_request_split[1:])
+        request = data_request if isinstance(data_request, DataRequest) else compile_data_request(data_request)
 
         self.log(self.LOG_INFO, "Order {action_order_id}. Data request: {data_request} ".format(
-            action_order_id=action_order_id, data_request=data_request))
+            action_order_id=action_order_id, data_request=request.text))
 
         # try to fetch the data from self.data_for_orders
         # if there is no data with a requested key so all the data with this key will be invoked by Order Manager
+        data_for_orders_key = self._data_for_orders_key(request.key)
 
-        if data_request_key.upper() in [key.upper() for key in self.data_for_orders.keys()]:
+        if data_for_orders_key is not None:
 
             self.log(self.LOG_INFO, "Order {action_order_id}. Getting data from self.data_for_orders.".format(
                 action_order_id=action_order_id))
 
-            request_value_from_data = utils.dict_value_from_path(self.data_for_orders, data_request_split)
+            return value_from_path(self.data_for_orders[data_for_orders_key], request.params)
 
-            return request_value_from_data
+        # data fetched for all the orders at once in the beginning of proceed_orders
+        if request.key_lower in self._prepared_data_for_orders:
+            return value_from_path(self._prepared_data_for_orders[request.key_lower], request.params)
 
-        # calling the data fetching method in correspondence to data_request_key
-        if data_request_key in self.DATA_FETCHING_METHODS:
+        # calling the data provider registered for the data request key
+        if request.key_lower in self.data_providers:
 
             self.log(self.LOG_INFO,
-                     "Order {action_order_id}. Calling {func} for data with params {params}".format(
-                         action_order_id=action_order_id, func=self.DATA_FETCHING_METHODS[data_request_key.lower()],
-                         params = data_request_parameters))
-
-            _func = getattr(self, self.DATA_FETCHING_METHODS[data_request_key.lower()])
-            result_value = _func(data_request_parameters)
-
-            # we should recreate the dict with the data in order to find the value from path,
-            # so adding the data request key to the results from the fetching method
-            result_dict = {data_request_key: result_value}
+                     "Order {action_order_id}. Requesting {key} data provider with params {params}".format(
+                         action_order_id=action_order_id, key=request.key_lower, params=request.params_str))
 
-            result = utils.dict_value_from_path(result_dict, data_request_split)
-
-            return result
+            return self.data_providers.value(request)
 
         # return None if no data source was found
         self.log(self.LOG_ERROR, "Order {action_order_id}. No data source found! ".format(
@@ -384,170 +633,643 @@ class ActionOrderManager(object):
     def on_order_close(self, order):
         pass
 
-    def proceed_orders(self):
+    def _prepare_data_for_orders(self, orders: List[ActionOrder]):
+        """
+        collects the data requests from the commands of all the orders, groups them by data request key and parameter
+        (symbol) and fetches the data for every key with the single call of the batch fetching method from
+        DATA_BATCH_FETCHING_METHODS. The results are put into self._prepared_data_for_orders and used for the orders'
+        data requests during the current proceed_orders().
 
-        self._last_update_closed_orders = list()
-        open_active_orders = list(filter(lambda x: x.status != "closed" and x.active_trade_order is not None, self.orders)) #type: List[ActionOrder]
+        Keys which are presented in self.data_for_orders are not fetched.
+        """
+        self._prepared_data_for_orders = dict()
+        self.data_providers.start_tick()
 
-        # open_orders = list(filter(lambda x: x.status != "closed", self.orders))
-        # iterate through open ActionOrders with presented trade orders.
-        # so there should be always active trade order within the ActionOrder
-        #
-        for order in open_active_orders:
+        requests = dict()  # {data_request_key: set of first parameters}
 
-            self._prev_orders_status[order.id] = copy.copy(order)
+        for order in orders:
+            for request in self._compiled_data_requests(order.order_command):
+                if request.key_lower not in self.DATA_BATCH_FETCHING_METHODS \
+                        or self._data_for_orders_key(request.key) is not None:
+                    continue
 
-            # if order.changed_from_last_update:
-            #     # ActionOrder general status log
-            #     self.log(self.LOG_INFO, "ActionOrder {action_order_id} UPDATED"
-            #              .format(action_order_id=order.id,
-            #                      action_order_str_status=order.__str_status__()))
+                requests.setdefault(request.key_lower, set()).add(request.params[0] if request.params else "")
 
-            order_action = self._order_action(order.order_command)
-            data_requests = self._data_requests(order.order_command)
+        for key, params in requests.items():
+            self.log(self.LOG_INFO, "Fetching {} data for all orders with params {}".format(key, sorted(params)))
+            try:
+                _func = getattr(self, self.DATA_BATCH_FETCHING_METHODS[key])
+                self._prepared_data_for_orders[key] = _func(sorted(params))
 
-            if order_action == "new":
-                self.log(self.LOG_INFO, "ActionOrder {} creating new trade order for {} -{}-> {} amount {} price {}".format(
-                    order.id, order.start_currency, order.side, order.dest_currency, order.get_active_order().amount,
-                    order.get_active_order().price))
+            except Exception as e:
+                self.log(self.LOG_ERROR, "Could not fetch {} data for orders".format(key))
+                self.log(self.LOG_ERROR, type(e).__name__)
+                self.log(self.LOG_ERROR, e.args)
 
-                if order.get_active_order().status != "open":
-                    resp = self._create_order(order.get_active_order())
+    def enable_order_events(self, reconcile_interval: float = 30.0):
+        """
+        Turns on updating the trade orders from the events of exchange's order events stream (see
+        ccxtExchangeWrapper.set_order_events_transport). Events received since the previous proceed_orders() are applied
+        to the orders without requests to exchange. Orders with "hold" command are polled only for reconciliation: if
+        the poll_scheduler is not set, the scheduler polling every order once in reconcile_interval seconds is created.
 
-                    # if could not create Trade Order - than close the whole ActionOrder and report
-                    if resp is None or ("id" not in resp):
-                        self.log(self.LOG_ERROR, "ActionOrder {} could not create new trade order".format(order.id))
-                        self.log(self.LOG_ERROR, "ActionOrder {} to be closed".format(order.id))
-                        order.close_order()
-                    else:
+        :param reconcile_interval: time in seconds between the polls of the order
+        """
+        self.order_events_enabled = True
 
-                        market_data = self._data_request_list_values(data_requests, order.id)
-                        self._update_order_from_exchange(order, resp, market_data)
+        if self.poll_scheduler is None:
+            self.poll_scheduler = OrderPollScheduler(min_interval=reconcile_interval, max_interval=reconcile_interval,
+                                                     time_func=self._time)
 
-                        self.log(self.LOG_INFO,
-                                 "ActionOrder {} CREATED new trade order for {} -{}-> {} amount {} price {}".format(
-                                     order.id, order.start_currency, order.side, order.dest_currency,
-                                     resp["amount"],
-                                     resp["price"]))
+    def _proceed_order_events(self):
+        """
+        applies the order events received from the exchange to the open ActionOrders with "hold" command which active
+        trade orders are matching the events. As the events contain the cumulative order's data only the last event of
+        every trade order is applied. Events with the filled amount less than the trade order has are skipped as
+        outdated.
+        """
+        if not self.order_events_enabled:
+            return
 
+        events = self.exchange.pop_order_events()
+        if len(events) == 0:
+            return
 
+        last_events = dict()  # {trade order id: event}
+        for event in events:
+            last_events[event.get("id")] = event
 
+        orders = {o.get_active_order().id: o for o in self._get_open_active_orders()}
 
-                else:
-                    raise OwaManagerError("Order already set")
+        for trade_order_id, event in last_events.items():
+            order = orders.get(trade_order_id)
 
-            elif order_action == "hold":
+            if order is None or self._order_action(order.order_command) != "hold":
+                continue
+
+            filled = order.get_active_order().filled
+            if event.get("filled") is not None and filled is not None and event["filled"] < filled:
+                continue
+
+            resp = dict(event)
+            self._prev_orders_versions.setdefault(order.id, order.version)
+
+            if self._is_closed_resp(resp):
+                self._on_trade_order_closed_with_trades(order, resp)
+
+            self._apply_order_io(order, {"action": "hold", "resp": resp})
+            self.order_events_applied += 1
+
+    def _prepare_order_updates(self, orders: List[ActionOrder]):
+        """
+        if self.bulk_order_updates is set - fetches the updates of the trade orders of all the ActionOrders with "hold"
+        command at once. Updates are used instead of fetching every order in _order_io. Only the updates of still open
+        trade orders are taken from the bulk request: the trade orders which are not open anymore and the orders which
+        updates could not be fetched at once are updated one by one in _order_io (with the retry policy).
+        """
+        self._bulk_order_updates = dict()
+
+        if not self.bulk_order_updates:
+            return
+
+        trade_orders = [o.get_active_order() for o in orders if self._order_action(o.order_command) == "hold"]
+
+        # single order is updated by single request anyway
+        if len(trade_orders) < 2:
+            return
+
+        self.log(self.LOG_INFO, "Fetching updates of {} trade orders at once".format(len(trade_orders)))
+        try:
+            updates = self.exchange.get_open_orders_updates(trade_orders, update_closed=False)
+            self._bulk_order_updates = {k: v for k, v in updates.items() if v.get("status") == "open"}
+
+        except Exception as e:
+            self.log(self.LOG_ERROR, "Could not fetch updates of trade orders at once")
+            self.log(self.LOG_ERROR, type(e).__name__)
+            self.log(self.LOG_ERROR, e.args)
+
+    def _order_io(self, order: ActionOrder) -> dict:
+        """
+        performs the exchange requests for the current order command of ActionOrder (see _send_order_requests). If the
+        request was deferred (see self.defer_retries) returns {"action": order_action, "resp": None, "deferred": True}
+        """
+        try:
+            return self._send_order_requests(order)
 
+        except OrderRequestDeferred as e:
+            self.log(self.LOG_INFO, "ActionOrder {} {}".format(order.id, e.args[0]))
+            return {"action": self._order_action(order.order_command), "resp": None, "deferred": True}
+
+    def _send_order_requests(self, order: ActionOrder) -> dict:
+        """
+        performs the exchange requests for the current order command of ActionOrder: creates, updates or cancels the
+        active trade order and fetches the trades of closed trade order. ActionOrder itself is not updated here.
+
+        :param order: ActionOrder
+        :return: dict {"action": order_action, "resp": exchange response or None}
+        """
+
+        order_action = self._order_action(order.order_command)
+        resp = None
+
+        if order_action == "new":
+            self.log(self.LOG_INFO, "ActionOrder {} creating new trade order for {} -{}-> {} amount {} price {}".format(
+                order.id, order.start_currency, order.side, order.dest_currency, order.get_active_order().amount,
+                order.get_active_order().price))
+
+            if order.get_active_order().status != "open":
+                resp = self._create_order(order.get_active_order())
+            else:
+                raise OwaManagerError("Order already set")
+
+        elif order_action == "hold":
+
+            resp = self._bulk_order_updates.pop(order.get_active_order().id, None)
+            if resp is None:
                 resp = self._update_order(order.get_active_order())
 
-                if resp is None:
-                    self.log(self.LOG_INFO, "ActionOrder: skipping update because of empty resp from exchange")
-                    continue
+            if resp is not None and self._is_closed_resp(resp):
+                self._on_trade_order_closed_with_trades(order, resp)
+
+        elif order_action == "cancel":
+            self._log_cancelling(order)
+
+            resp = self.cancel_order(order.get_active_order())
+
+            # if could not cancel - just skip
+            if resp is not None:
+                if self.request_trades:
+                    order.active_trade_order.update_order_from_exchange_resp(resp)  # workaround
+
+                    if order.get_active_order().filled > 0:
+                        trades = self._get_trade_results(order.get_active_order())
+                        try:
+                            self._merge_trades_into_resp(resp, trades)
+                        except Exception as e:
+                            self._log_trades_error(e, trades)
+
+                self._on_trade_order_canceled_resp(order, resp)
+
+        else:
+            raise OwaManagerError("Unknown order command")
+
+        return {"action": order_action, "resp": resp}
+
+    @staticmethod
+    def _is_closed_resp(resp: dict):
+        return "status" in resp and resp["status"] == "closed" or resp["status"] == "canceled"
+
+    def _on_trade_order_closed_with_trades(self, order: ActionOrder, resp: dict):
+        """
+        updates the trade order from the closing response and merges the order's trades results into the response
+        """
+        self._on_trade_order_closed_resp(order, resp)
+
+        if self.request_trades and resp["filled"] > 0:
+            trades = None
+            try:
+                trades = self._get_trade_results(order.get_active_order())
+                self._merge_trades_into_resp(resp, trades)
+
+            except Exception as e:
+                self._log_trades_error(e, trades)
+
+    def _on_trade_order_closed_resp(self, order: ActionOrder, resp: dict):
+        self.log(self.LOG_INFO, "ActionOrder {} TradeOrder have been closed with status {}  {} -{}-> {}".format(
+            order.id, resp["status"], order.start_currency, order.side, order.dest_currency))
+
+        if self.request_trades:
+            # workaround.we should have updated order data before getting the correct trades results from trades
+            order.active_trade_order.update_order_from_exchange_resp(resp)
+
+    def _log_cancelling(self, order: ActionOrder):
+        self.log(self.LOG_INFO, "ActionOrder {} Proceed to cancelling trade order# {} {} {} -{}-> {} ".format(
+            order.id, order.get_active_order().id, order.get_active_order().symbol, order.start_currency,
+            order.side, order.dest_currency))
+
+    def _on_trade_order_canceled_resp(self, order: ActionOrder, resp: dict):
+        resp["status"] = "canceled"  # override exchange response
+        o = order.get_active_order()
+        self.log(self.LOG_INFO, "ActionOrder {} trade order closed {} with status {} filled {}/{}".format(
+            order.id, o.update_requests_count, o.status, o.filled,
+            o.amount))
+
+    def _merge_trades_into_resp(self, resp: dict, trades: dict):
+        """
+        copies the trades results (see ccxtExchangeWrapper.get_trades_results) into the exchange response
+        """
+        if trades is not None and trades["trades"] is not None and len(trades["trades"]) > 0:
+            for key, value in trades.items():
+                if value is not None:
+                    resp[key] = value
+        else:
+            self.log(self.LOG_ERROR, "skipping getting trades for this order")
+
+    def _log_trades_error(self, e: Exception, trades):
+        self.log(self.LOG_ERROR, "Error collecting trades result")
+        self.log(self.LOG_ERROR, type(e).__name__)
+        self.log(self.LOG_ERROR, e.args)
+        self.log(self.LOG_ERROR, "Trades: {}".format(trades))
+
+    def _apply_order_io(self, order: ActionOrder, io_result: dict):
+        """
+        updates the ActionOrder with the results of exchange requests made by _order_io: requests the data for order
+        and runs the ActionOrder's update (so the state machine of ActionOrder proceeds to the next order command).
+
+        :param order: ActionOrder
+        :param io_result: dict returned by _order_io
+        """
+
+        if io_result.get("deferred"):
+            self._pending_orders[order.id] = order  # retried after the retry time (see _due_orders)
+            return
 
-                if "status" in resp and resp["status"] == "closed" or resp["status"] == "canceled":
-                    self.log(self.LOG_INFO, "ActionOrder {} TradeOrder have been closed with status {}  {} -{}-> {}".format(
-                        order.id, resp["status"], order.start_currency, order.side, order.dest_currency))
-
-                    if self.request_trades:
-                        # workaround.we should have updated order data before getting the correct trades results from trades
-                        order.active_trade_order.update_order_from_exchange_resp(resp)
-
-                        if resp["filled"] > 0:
-                            try:
-                                trades = self._get_trade_results(order.get_active_order())
-                                if trades is not None and len(trades["trades"]) > 0:
-                                    for key, value in trades.items():
-                                        if value is not None:
-                                            resp[key] = value
-                                else:
-                                    self.log(self.LOG_ERROR, "skipping getting trades for this order")
-
-                            except Exception as e:
-                                self.log(self.LOG_ERROR, "Error collecting trades result")
-                                self.log(self.LOG_ERROR, type(e).__name__)
-                                self.log(self.LOG_ERROR, e.args)
-                                self.log(self.LOG_ERROR, "Trades: {}".format(trades))
+        order_action = io_result["action"]
+        resp = io_result["resp"]
+        data_requests = self._data_requests(order.order_command)
+
+        if order_action == "new":
+            # if could not create Trade Order - than close the whole ActionOrder and report
+            if resp is None or ("id" not in resp):
+                self.log(self.LOG_ERROR, "ActionOrder {} could not create new trade order".format(order.id))
+                self.log(self.LOG_ERROR, "ActionOrder {} to be closed".format(order.id))
+                order.close_order()
+            else:
 
                 market_data = self._data_request_list_values(data_requests, order.id)
+                self._update_order_from_exchange(order, resp, market_data)
+
+                self.log(self.LOG_INFO,
+                         "ActionOrder {} CREATED new trade order for {} -{}-> {} amount {} price {}".format(
+                             order.id, order.start_currency, order.side, order.dest_currency,
+                             resp["amount"],
+                             resp["price"]))
+
+        elif order_action == "hold":
+
+            if resp is None:
+                self.log(self.LOG_INFO, "ActionOrder: skipping update because of empty resp from exchange")
+                self._reschedule_order(order)
+                return
+
+            market_data = self._data_request_list_values(data_requests, order.id)
+
+            self._update_order_from_exchange(order, resp, market_data)
 
+            if order.get_active_order() is not None:
+                if order.changed_from_last_update:
+                    self.log(self.LOG_INFO, str(order.get_active_order()))
+                    self.log(self.LOG_INFO, str(order))
+            else:
+                o = order.orders_history[-1]
+                self.log(self.LOG_INFO, "ActionOrder {} TradeOrder closed {} with status {} filled {}/{}".format(
+                    order.id, o.update_requests_count, o.status, o.filled,
+                    o.amount))
+
+        elif order_action == "cancel":
+
+            if resp is not None:
+                market_data = self._data_request_list_values(data_requests, order.id)
                 self._update_order_from_exchange(order, resp, market_data)
 
-                if order.get_active_order() is not None:
-                    if order.changed_from_last_update:
-                        self.log(self.LOG_INFO, str(order.get_active_order()))
-                        self.log(self.LOG_INFO, str(order))
-                else:
-                    o = order.orders_history[-1]
-                    self.log(self.LOG_INFO, "ActionOrder {} TradeOrder closed {} with status {} filled {}/{}".format(
-                        order.id, o.update_requests_count, o.status, o.filled,
-                        o.amount))
-
-            elif order_action == "cancel":
-                self.log(self.LOG_INFO, "ActionOrder {} Proceed to cancelling trade order# {} {} {} -{}-> {} ".format(
-                    order.id, order.get_active_order().id, order.get_active_order().symbol, order.start_currency,
-                    order.side, order.dest_currency))
-
-                # self.log(self.LOG_INFO, "... order {} Fetching ticker {}".format(order.id, order.symbol))
-                #
-                # price = self._fetch_taker_price_from_exchange_legacy(order)
-                #
-                # if price is None:
-                #     self.log(self.LOG_ERROR, "New price getting error. Skipping the order update")
-                #     continue
-                #
-                # self.log(self.LOG_INFO, ".. cancelling Order {} trade order {}".format(
-                #     order.id, order.get_active_order().id))
-
-                resp = self.cancel_order(order.get_active_order())
-
-                # if could not cancel - just skip
-                if resp is not None:
-
-                    if self.request_trades:
-                        order.active_trade_order.update_order_from_exchange_resp(resp)  # workaround
-
-                        if order.get_active_order().filled > 0:
-                            trades = self._get_trade_results(order.get_active_order())
-                            try:
-                                if trades is not None and trades["trades"] is not None and len(trades["trades"]) > 0:
-                                    for key, value in trades.items():
-                                        if value is not None:
-                                            resp[key] = value
-                            except Exception as e:
-                                self.log(self.LOG_ERROR, "Error collecting trades result")
-                                self.log(self.LOG_ERROR, type(e).__name__)
-                                self.log(self.LOG_ERROR, e.args)
-                                self.log(self.LOG_ERROR, "Trades: {}".format(trades))
-
-                    resp["status"] = "canceled"  # override exchange response
-                    # self._update_order_from_exchange(order, resp, {"price": price})
-                    o = order.get_active_order()
-                    self.log(self.LOG_INFO, "ActionOrder {} trade order closed {} with status {} filled {}/{}".format(
-                        order.id, o.update_requests_count,  o.status, o.filled,
-                        o.amount))
-
-                    market_data = self._data_request_list_values(data_requests, order.id)
-                    self._update_order_from_exchange(order, resp, market_data)
+            else:
+                self.log(self.LOG_ERROR, "Could not cancel. Skipping...")
+
+        if order.status != "open":
+
+            self.log(self.LOG_INFO, "ActionOrder {} Status: {}. State {}. Total filled {}/{}".format(order.id,
+                                                                                               order.status,
+                                                                                               order.state,
+                                                                                               order.filled,
+                                                                                               order.amount))
+
+            self._last_update_closed_orders.append(order)
+            # self.on_order_close(order)
+
+        self.order_store.update(order)
+        self._reschedule_order(order)
+        self._journal_order(order)
 
+    def _get_open_active_orders(self) -> List[ActionOrder]:
+        """
+        open ActionOrders with presented trade orders
+        """
+        return list(filter(lambda x: x.active_trade_order is not None, self.order_store.open_orders()))
+
+    def _order_ticker(self, symbol: str):
+        """
+        returns the ticker for symbol from the exchange's market data cache or the last fetched tickers without
+        requesting the exchange. None if there is no ticker.
+        """
+        tickers = self.exchange._cached_tickers(symbol)
+        if tickers is not None:
+            return tickers.get(symbol)
+
+        return self.exchange.tickers.get(symbol) if isinstance(self.exchange.tickers, dict) else None
+
+    def _on_order_command_changed(self, order: ActionOrder):
+        self._pending_orders[order.id] = order
+
+    def _due_orders(self) -> List[ActionOrder]:
+        """
+        returns the open orders with active trade orders to be proceeded now in the order of adding. If
+        self.poll_scheduler is set - only the pending orders (see self._pending_orders) and the orders which poll time
+        has come are taken, so the open orders waiting for their poll time are not iterated. Otherwise - all the open
+        orders. Orders with deferred retries are skipped till their retry time.
+        """
+        if self.poll_scheduler is None:
+            orders = self._get_open_active_orders()
+        else:
+            order_ids = self.poll_scheduler.due_orders()
+            order_ids.update(self._pending_orders)
+            self._pending_orders = dict()
+            orders = list()
+
+            for order in self.order_store.orders_by_ids(order_ids):
+                if order.status == "closed":
+                    self.poll_scheduler.remove(order.id)
+                elif order.active_trade_order is None:
+                    self._pending_orders[order.id] = order
                 else:
-                    self.log(self.LOG_ERROR, "Could not cancel. Skipping...")
+                    orders.append(order)
 
-            else:
-                raise OwaManagerError("Unknown order command")
+        if len(self._deferred_retries) > 0:
+            now = self._get_retry_policy().time_func()
+            due = list()
 
-            if order.status != "open":
+            for order in orders:
+                if (self._deferred_retry_at(order.get_active_order()) or now) <= now:
+                    due.append(order)
+                elif self.poll_scheduler is not None:
+                    self._pending_orders[order.id] = order
 
-                self.log(self.LOG_INFO, "ActionOrder {} Status: {}. State {}. Total filled {}/{}".format(order.id,
-                                                                                                   order.status,
-                                                                                                   order.state,
-                                                                                                   order.filled,
-                                                                                                   order.amount))
+            orders = due
 
-                self._last_update_closed_orders.append(order)
-                # self.on_order_close(order)
+        return orders
+
+    def _reschedule_order(self, order: ActionOrder):
+        if self.poll_scheduler is None:
+            return
+
+        if order.status == "closed":
+            self.poll_scheduler.remove(order.id)
+            self._pending_orders.pop(order.id, None)
+        elif self._order_action(order.order_command) != "hold":
+            self._pending_orders[order.id] = order
+        else:
+            self.poll_scheduler.schedule(order, self._order_ticker(order.symbol))
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                                   thread_name_prefix="ActionOrderManager")
+        return self._executor
+
+    def shutdown_executor(self, wait: bool = True):
+        """
+        shuts down the thread pool of executor mode. The new one will be created on the next proceed_orders() if needed.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def _order_io_in_slot(self, order: ActionOrder) -> dict:
+        """
+        _order_io within the exchange's concurrent requests limit (see ccxtExchangeWrapper.set_max_concurrent_requests)
+        """
+        with self.exchange.requests_slot():
+            return self._order_io(order)
+
+    def proceed_orders(self):
+
+        self._last_update_closed_orders = list()
+        self._prev_orders_versions = dict()
+        self._proceed_order_events()
+        open_active_orders = self._due_orders()
+        self._prepare_data_for_orders(open_active_orders)
+        self._prepare_order_updates(open_active_orders)
+
+        if self.max_workers is not None and len(open_active_orders) > 0:
+            for order in open_active_orders:
+                self._prev_orders_versions.setdefault(order.id, order.version)
+
+            # exchange requests are sent from the thread pool, but the orders are updated here one by one in the same
+            # order as in sequential mode
+            futures = [self._get_executor().submit(self._order_io_in_slot, order) for order in open_active_orders]
+
+            for order, future in zip(open_active_orders, futures):
+                self._apply_order_io(order, future.result())
+
+        else:
+            # iterate through open ActionOrders with presented trade orders.
+            # so there should be always active trade order within the ActionOrder
+            #
+            for order in open_active_orders:
+
+                self._prev_orders_versions.setdefault(order.id, order.version)
+
+                io_result = self._order_io(order)
+                self._apply_order_io(order, io_result)
 
         # let's clean data_for_orders in the the end of orders iteration
+        self._reset_tick_data()
+        self._flush_journal()
+
+    def _concurrent_requests(self, request, items: list) -> list:
+        """
+        calls request(item) for every item concurrently (within the exchange's concurrent requests limit) and returns
+        the list of (result, exception) tuples in the order of items
+        """
+
+        def call(item):
+            with self.exchange.requests_slot():
+                try:
+                    return request(item), None
+                except Exception as e:
+                    return None, e
+
+        if len(items) < 2:
+            return [call(item) for item in items]
+
+        return list(self._get_executor().map(call, items))
+
+    def cancel_all(self, orders: List[ActionOrder] = None, exchange_cancel_all: bool = False) -> List[ActionOrder]:
+        """
+        Kill switch: force closes all the open ActionOrders (or the given orders) within one call. Cancel requests for
+        all the active trade orders are sent concurrently (or one cancel-all request per symbol if exchange_cancel_all is
+        set and the exchange supports it), then the final states of trade orders are fetched concurrently and the fills
+        are reconciled with one trades request per symbol (see ccxtExchangeWrapper.get_orders_trades_results).
+
+        Trade orders which are still open after this are cancelled with the usual cancel_order() retries. ActionOrders
+        are closed regardless of their own logic (so no new trade orders are created) and tagged with "#force_close".
+
+        :param orders: list of ActionOrders to close. All open orders if not set
+        :param exchange_cancel_all: use the exchange's cancel all orders endpoint. Note: it cancels also the orders of
+        the symbols which are not managed by this manager.
+        :return: list of closed ActionOrders (same as get_closed_orders())
+        """
+        self._last_update_closed_orders = list()
+        self._prev_orders_versions = dict()
+
+        orders = [o for o in (orders if orders is not None else self.get_open_orders()) if o.status == "open"]
+
+        for order in orders:
+            self._prev_orders_versions.setdefault(order.id, order.version)
+            order.force_close()
+
+        cancelling = [o for o in orders if o.status == "open" and o.get_active_order() is not None
+                      and self._order_action(o.order_command) == "cancel"]
+        trade_orders = [o.get_active_order() for o in cancelling]
+
+        for trade_order in trade_orders:
+            self._deferred_retries.pop(trade_order.internal_id, None)
+
+        self.log(self.LOG_INFO, "Cancelling {} trade orders".format(len(trade_orders)))
+
+        if exchange_cancel_all and self.exchange.has_cancel_all_orders():
+            symbols = sorted({o.symbol for o in trade_orders})
+            cancel_results = self._concurrent_requests(self.exchange.cancel_all_orders, symbols)
+        else:
+            cancel_results = self._concurrent_requests(self._cancel_order, trade_orders)
+
+        for _, e in cancel_results:
+            if e is not None:
+                self.log(self.LOG_ERROR, "Cancel error...")
+                self.log(self.LOG_ERROR, type(e).__name__)
+                self.log(self.LOG_ERROR, e.args)
+
+        responses = list()
+        updates = self._concurrent_requests(self.exchange.get_order_update, trade_orders)
+
+        # kill switch does not leave the orders for the next proceed_orders(): retries are not deferred here
+        defer_retries = self.defer_retries
+        self.defer_retries = False
+        try:
+            for trade_order, (resp, _) in zip(trade_orders, updates):
+
+                if resp is None or resp.get("status") not in ("closed", "canceled"):
+                    resp = self.cancel_order(trade_order)
+
+                if resp is not None and self.request_trades:
+                    trade_order.update_order_from_exchange_resp(resp)  # workaround
+
+                responses.append(resp)
+        finally:
+            self.defer_retries = defer_retries
+
+        if self.request_trades:
+            filled = [o for o, resp in zip(trade_orders, responses) if resp is not None and o.filled > 0]
+            trades = dict()
+            try:
+                trades = self.exchange.get_orders_trades_results(filled)
+            except Exception as e:
+                self._log_trades_error(e, None)
+
+            for trade_order, resp in zip(trade_orders, responses):
+                if resp is not None and trade_order.filled > 0:
+                    self._merge_trades_into_resp(resp, trades.get(trade_order.id))
+
+        for order, resp in zip(cancelling, responses):
+            if resp is None:
+                self.log(self.LOG_ERROR, "ActionOrder {} could not cancel trade order. Skipping...".format(order.id))
+                continue
+
+            self._on_trade_order_canceled_resp(order, resp)
+            self._apply_order_io(order, {"action": "cancel", "resp": resp})
+
+        for order in orders:
+            active_trade_order = order.get_active_order()
+
+            # orders which logic requested the next trade order after cancelling are closed here
+            if order.status == "open" and (active_trade_order is None or active_trade_order.status != "open"):
+                if active_trade_order is not None and active_trade_order.status in ("closed", "canceled"):
+                    order._close_active_order()
+                order.close_order()
+
+            if order.status != "open" and order not in self._last_update_closed_orders:
+                self._last_update_closed_orders.append(order)
+                self.order_store.update(order)
+                self._reschedule_order(order)
+
+            self._journal_order(order)
+
+        self._flush_journal()
+
+        return self._last_update_closed_orders
+
+    def flatten(self) -> List[ActionOrder]:
+        """
+        emergency stop: closes all the open ActionOrders via cancel_all() using the exchange's cancel all orders
+        endpoint (where supported) and stops the order events stream
+        """
+        if self.order_events_enabled:
+            self.exchange.stop_order_events()
+            self.order_events_enabled = False
+
+        return self.cancel_all(exchange_cancel_all=True)
+
+    def _journal_order(self, order: ActionOrder):
+        if self.journal is not None:
+            self.journal.record(order)
+
+    def _flush_journal(self):
+        """
+        writes the journal records of the tick to the file or makes the snapshot of open orders (and the orders closed
+        since the previous snapshot, see OrderJournal.snapshot) if it's due
+        """
+        if self.journal is None:
+            return
+
+        if self.journal.snapshot_due():
+            self.journal.snapshot(self.get_open_orders())
+        else:
+            self.journal.flush()
+
+    def restore_from_journal(self, reconcile: bool = True) -> List[ActionOrder]:
+        """
+        restores the orders from self.journal (see OrderJournal) and adds them to the manager. If reconcile is set -
+        the open orders are proceeded once with the bulk order updates (see ccxtExchangeWrapper.get_open_orders_updates)
+        so their states are synced with the exchange.
+
+        Note: if the process was stopped between the placing of trade order and the journal's flush, the restored order
+        has "new" command and the trade order will be placed again.
+
+        :return: list of restored orders
+        """
+        orders = self.journal.load_orders()
+
+        for order in orders:
+            order.set_clock(self._get_clock())
+            order.set_command_listener(self._on_order_command_changed)
+            self._pending_orders[order.id] = order
+            self.order_store.add(order)
+
+        self.log(self.LOG_INFO, "Restored {} orders from journal".format(len(orders)))
+
+        if reconcile and self.have_open_orders():
+            bulk_order_updates = self.bulk_order_updates
+            self.bulk_order_updates = True
+            try:
+                self.proceed_orders()
+            finally:
+                self.bulk_order_updates = bulk_order_updates
+
+        return orders
+
+    def _reset_tick_data(self):
         self.data_for_orders = dict()
+        self._prepared_data_for_orders = dict()
+        self._bulk_order_updates = dict()
+        self.data_providers.end_tick()
+
+    def get_changed_orders(self) -> List[ActionOrder]:
+        """
+        returns the list of orders which tracked fields were changed during the last proceed_orders() (see
+        ActionOrder.changes_since(version) for getting the changes)
+        """
+        orders = self.get_open_orders() + self._last_update_closed_orders
+        return [o for o in orders if o.id in self._prev_orders_versions and
+                o.version != self._prev_orders_versions[o.id]]
 
     def get_closed_orders(self):
         """
@@ -564,8 +1286,8 @@ class ActionOrderManager(object):
         returns the count of open orders waiting to perform "new" or "cancel" commands
         """
 
-        orders_with_actions = list(filter(lambda x: x.status != "closed" and x.active_trade_order is not None
+        orders_with_actions = list(filter(lambda x: x.active_trade_order is not None
                                                     and self._order_action(x.order_command) in ("new", "cancel"),
-                                          self.orders))
+                                          self.order_store.open_orders()))
 
         return len(orders_with_actions)
@@ -0,0 +1,169 @@
+import heapq
+import itertools
+from .clock import current_time
+
+
+class OrderPollScheduler(object):
+    """
+    Schedules the polling of open ActionOrders: every order gets it's next poll time and only the orders which are due
+    are updated by the order manager.
+
+    The poll interval is between min_interval and max_interval and grows with:
+     - the age of the active trade order (till age_horizon seconds)
+     - the distance of the order's price from the best price of ticker (till distance_horizon, relative to price)
+
+    If the order's filled amount was changed since the previous poll it's polled again after min_interval.
+
+    Due orders are kept in the heap of (next poll time, sequence number, order id), so getting the due orders does not
+    depend on the number of orders waiting for their time.
+
+    Usage:
+        scheduler = OrderPollScheduler(min_interval=0.5, max_interval=10)
+        scheduler.schedule(order, ticker)
+        ...
+        for order_id in scheduler.due_orders():
+            ...
+
+    """
+
+    def __init__(self, min_interval: float = 0.0, max_interval: float = 5.0, age_horizon: float = 60.0,
+                 distance_horizon: float = 0.01, age_weight: float = 1.0, distance_weight: float = 1.0,
+                 time_func=current_time):
+        """
+        :param min_interval: min time in seconds between polls of the order
+        :param max_interval: max time in seconds between polls of the order
+        :param age_horizon: age of trade order in seconds when the age part of interval reaches max_interval
+        :param distance_horizon: relative distance from the best price when the distance part of interval reaches
+        max_interval
+        :param age_weight: weight of the age part of interval
+        :param distance_weight: weight of the distance part of interval (used if the ticker is available)
+        :param time_func: function which returns current time in seconds
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.age_horizon = age_horizon
+        self.distance_horizon = distance_horizon
+        self.age_weight = age_weight
+        self.distance_weight = distance_weight
+        self.time_func = time_func
+
+        self._heap = list()  # heap of (next_poll_time, seq, order_id)
+        self._counter = itertools.count()
+        self.next_poll = dict()  # {order_id: next poll time}
+
+        self._trade_orders_seen = dict()  # {order_id: (trade order id, time of the first schedule)}
+        self._last_filled = dict()  # {order_id: filled amount on the last schedule}
+
+    def __len__(self):
+        return len(self.next_poll)
+
+    def __contains__(self, order_id):
+        return order_id in self.next_poll
+
+    @staticmethod
+    def price_distance(order, ticker: dict):
+        """
+        returns the relative distance of order's price from the best price to be matched with (ask for buy order and
+        bid for sell order) or None if ticker has no price. Returns 0 if the order's price crosses the best price.
+        """
+        if not ticker or not order.price:
+            return None
+
+        if order.side == "buy":
+            best = ticker.get("ask")
+            distance = (best - order.price) / order.price if best else None
+        else:
+            best = ticker.get("bid")
+            distance = (order.price - best) / order.price if best else None
+
+        return max(distance, 0.0) if distance is not None else None
+
+    def poll_interval(self, order, ticker: dict = None, timestamp: float = None) -> float:
+        """
+        returns the time in seconds till the next poll of order
+        """
+        timestamp = timestamp if timestamp is not None else self.time_func()
+
+        filled = order.filled
+        if self._last_filled.get(order.id, filled) != filled:
+            return self.min_interval
+
+        trade_order = order.get_active_order()
+        trade_order_id = trade_order.id if trade_order is not None else None
+
+        seen = self._trade_orders_seen.get(order.id)
+        first_seen = seen[1] if seen is not None and seen[0] == trade_order_id else timestamp
+
+        age_part = min((timestamp - first_seen) / self.age_horizon, 1.0) if self.age_horizon else 1.0
+        slowness = age_part * self.age_weight
+        weights = self.age_weight
+
+        distance = self.price_distance(order, ticker)
+        if distance is not None:
+            distance_part = min(distance / self.distance_horizon, 1.0) if self.distance_horizon else 1.0
+            slowness += distance_part * self.distance_weight
+            weights += self.distance_weight
+
+        slowness = slowness / weights if weights > 0 else 0.0
+
+        return self.min_interval + (self.max_interval - self.min_interval) * slowness
+
+    def schedule(self, order, ticker: dict = None, timestamp: float = None) -> float:
+        """
+        sets the next poll time of order in accordance to poll_interval() and returns it
+        """
+        timestamp = timestamp if timestamp is not None else self.time_func()
+
+        next_poll = timestamp + self.poll_interval(order, ticker, timestamp)
+
+        trade_order = order.get_active_order()
+        trade_order_id = trade_order.id if trade_order is not None else None
+        seen = self._trade_orders_seen.get(order.id)
+        if seen is None or seen[0] != trade_order_id:
+            self._trade_orders_seen[order.id] = (trade_order_id, timestamp)
+
+        self._last_filled[order.id] = order.filled
+
+        self.next_poll[order.id] = next_poll
+        heapq.heappush(self._heap, (next_poll, next(self._counter), order.id))
+
+        return next_poll
+
+    def remove(self, order_id):
+        self.next_poll.pop(order_id, None)
+        self._trade_orders_seen.pop(order_id, None)
+        self._last_filled.pop(order_id, None)
+
+    def is_due(self, order_id, timestamp: float = None) -> bool:
+        """
+        True if order is not scheduled or it's poll time has come
+        """
+        timestamp = timestamp if timestamp is not None else self.time_func()
+        next_poll = self.next_poll.get(order_id)
+        return next_poll is None or next_poll <= timestamp
+
+    def due_orders(self, timestamp: float = None) -> set:
+        """
+        returns the set of ids of scheduled orders which poll time has come and removes them from the queue
+        """
+        timestamp = timestamp if timestamp is not None else self.time_func()
+        due = set()
+
+        while len(self._heap) > 0 and self._heap[0][0] <= timestamp:
+            next_poll, _, order_id = heapq.heappop(self._heap)
+
+            # skip the outdated entries of rescheduled or removed orders
+            if self.next_poll.get(order_id) == next_poll:
+                del self.next_poll[order_id]
+                due.add(order_id)
+
+        return due
+
+    def next_poll_time(self):
+        """
+        returns the nearest poll time of scheduled orders or None
+        """
+        while len(self._heap) > 0 and self.next_poll.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+        return self._heap[0][0] if len(self._heap) > 0 else None
@@ -0,0 +1,182 @@
+import collections
+import itertools
+import json
+from typing import List
+
+
+class OrderStore(object):
+    """
+    Registry of ActionOrders indexed by order id, status and symbol.
+
+    Open orders are kept in the order of adding, so iterating the open orders does not depend on the number of closed
+    ones. The status index is updated via update(order) when the order's status could have been changed (or lazily when
+    the open orders are requested). All the orders are kept in the store by default. If max_closed is set - only the
+    last max_closed closed orders are kept in the store: the older ones are moved to the bounded archive (archive_size
+    last orders) and, if journal_file is set, appended to the journal as the json lines of order.report().
+
+    Usage:
+        store = OrderStore(max_closed=100, archive_size=1000, journal_file="orders.jsonl")
+        store.add(order)
+        for order in store.open_orders():
+            ...
+            store.update(order)
+    """
+
+    CLOSED = "closed"
+
+    def __init__(self, max_closed: int = None, archive_size: int = 10000, journal_file: str = None):
+        """
+        :param max_closed: max number of closed orders kept in the store. None - keep all
+        :param archive_size: max number of orders in archive
+        :param journal_file: path to the file where archived orders are appended as json lines. None - no journal
+        """
+
+        self.max_closed = max_closed
+        self.archive_size = archive_size
+        self.journal_file = journal_file
+
+        self._orders = dict()  # {order_id: order} of all the orders in store
+        self._by_status = dict()  # {status: {order_id: order}}
+        self._by_symbol = dict()  # {symbol: {order_id: order}}
+        self._indexed_status = dict()  # {order_id: status}
+        self._seq = dict()  # {order_id: sequence number of adding}
+        self._counter = itertools.count()
+
+        self.archive = collections.OrderedDict()  # {order_id: order} of archived orders
+        self.archived_count = 0  # total number of archived orders
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __iter__(self):
+        return iter(self.orders())
+
+    def __contains__(self, order_id):
+        return order_id in self._orders
+
+    def add(self, order):
+        if order.id in self._orders:
+            return
+
+        self._orders[order.id] = order
+        self._seq[order.id] = next(self._counter)
+        self._by_symbol.setdefault(order.symbol, dict())[order.id] = order
+        self._index_status(order, order.status)
+
+        if order.status == self.CLOSED:
+            self._archive_excess()
+
+    def _index_status(self, order, status):
+        self._by_status.setdefault(status, dict())[order.id] = order
+        self._indexed_status[order.id] = status
+
+    def update(self, order) -> bool:
+        """
+        updates the status index of order. Should be called after the order's status could have been changed.
+
+        :return: True if status was changed
+        """
+        prev_status = self._indexed_status.get(order.id)
+
+        if prev_status is None or prev_status == order.status:
+            return False
+
+        del self._by_status[prev_status][order.id]
+        self._index_status(order, order.status)
+
+        if order.status == self.CLOSED:
+            self._archive_excess()
+
+        return True
+
+    def _archive_excess(self):
+        if self.max_closed is None:
+            return
+
+        closed = self._by_status.get(self.CLOSED, dict())
+
+        while len(closed) > self.max_closed:
+            order_id = next(iter(closed))
+            self._archive(closed.pop(order_id))
+
+    def _archive(self, order):
+        del self._orders[order.id]
+        del self._indexed_status[order.id]
+        del self._seq[order.id]
+
+        symbol_orders = self._by_symbol[order.symbol]
+        del symbol_orders[order.id]
+        if len(symbol_orders) == 0:
+            del self._by_symbol[order.symbol]
+
+        if self.journal_file is not None:
+            with open(self.journal_file, "a") as f:
+                f.write(json.dumps(order.report(), default=str) + "\n")
+
+        if self.archive_size:
+            self.archive[order.id] = order
+            while len(self.archive) > self.archive_size:
+                self.archive.popitem(last=False)
+
+        self.archived_count += 1
+
+    def get(self, order_id):
+        """
+        returns the order from the store or archive by id or None
+        """
+        order = self._orders.get(order_id)
+        if order is None:
+            order = self.archive.get(order_id)
+        return order
+
+    def orders(self) -> List:
+        """
+        all the orders in the store (excluding archived) in the order of adding
+        """
+        return list(self._orders.values())
+
+    def orders_by_ids(self, order_ids) -> List:
+        """
+        orders in the store (excluding archived) with the ids in the order of adding. Unknown ids are skipped.
+        """
+        orders = [self._orders[order_id] for order_id in order_ids if order_id in self._orders]
+        orders.sort(key=lambda x: self._seq[x.id])
+        return orders
+
+    def open_orders(self) -> List:
+        """
+        orders with status other than "closed" in the order of adding. Orders which were closed since the last update
+        are reindexed.
+        """
+        statuses = [s for s, orders in self._by_status.items() if s != self.CLOSED and len(orders) > 0]
+
+        open_orders = list()
+        for status in statuses:
+            open_orders.extend(self._by_status[status].values())
+
+        if len(statuses) > 1:
+            open_orders.sort(key=lambda x: self._seq[x.id])
+
+        result = list()
+        for order in open_orders:
+            if order.status == self.CLOSED:
+                self.update(order)
+            else:
+                result.append(order)
+
+        return result
+
+    def has_open_orders(self) -> bool:
+        return len(self.open_orders()) > 0
+
+    def closed_orders(self) -> List:
+        """
+        closed orders kept in the store (excluding archived) in the order of closing
+        """
+        return list(self._by_status.get(self.CLOSED, dict()).values())
+
+    def orders_by_status(self, status: str) -> List:
+        return list(self._by_status.get(status, dict()).values())
+
+    def orders_by_symbol(self, symbol: str) -> List:
+        return sorted(self._by_symbol.get(symbol, dict()).values(), key=lambda x: self._seq[x.id])
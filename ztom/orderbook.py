@@ -1,5 +1,17 @@
+import bisect
 import itertools
 import math
+import numpy as np
+
+
+class OrderBookError(Exception):
+    """Basic exception for errors raised by order books"""
+    pass
+
+
+class OrderBookSequenceError(OrderBookError):
+    """Exception for the gap in sequence numbers of order book updates. Order book should be reloaded from snapshot"""
+    pass
 
 
 class Depth:
@@ -197,3 +209,375 @@ class OrderBook:
             return self.get_depth(start_amount, "sell", "base")
 
         return False
+
+    def get_depths(self, amounts, direction, currency="base"):
+        """
+        batch version of get_depth: returns the list of Depth objects for the list of amounts of the same currency and
+        direction. For the amounts which could not be evaluated (zero or negative amount or empty order book side) None
+        is set in the resulting list.
+
+        :param amounts: list of amounts
+        :param direction: "buy" or "sell"
+        :param currency: "base" or "quote"
+        :return: list of Depth objects or None if currency is wrong
+        """
+
+        if currency not in ("base", "quote"):
+            return None
+
+        depths = list()
+        for amount in amounts:
+            try:
+                depths.append(self.get_depth(amount, direction, currency) if amount > 0 else None)
+            except ZeroDivisionError:
+                depths.append(None)
+
+        return depths
+
+    def get_depths_for_trade_side(self, start_amounts, side: str):
+        """
+        batch version of get_depth_for_trade_side for the list of start currency amounts
+        """
+
+        if side == "buy":
+            return self.get_depths(start_amounts, "buy", "quote")
+
+        if side == "sell":
+            return self.get_depths(start_amounts, "sell", "base")
+
+        return False
+
+
+class ArrayOrderBook(OrderBook):
+    """
+    Order book which keeps the prices and quantities of levels in contiguous numpy arrays together with the precomputed
+    cumulative sums of base and quote amounts. Depth queries are answered with the binary search over the cumulative
+    sums instead of the levels walk. Results are the same as of the OrderBook.get_depth.
+
+    The asks and bids lists of Order objects are created only on request (for printing and csv export).
+    """
+
+    def __init__(self, symbol, asks, bids):
+        self.symbol = symbol
+
+        self.ask_prices, self.ask_quantities = self._sorted_levels(asks, reverse=False)
+        self.bid_prices, self.bid_quantities = self._sorted_levels(bids, reverse=True)
+
+        # cumulative sums of base quantity and quote amount (quantity * price) of levels
+        self._cum_base = {"buy": np.cumsum(self.ask_quantities), "sell": np.cumsum(self.bid_quantities)}
+        self._cum_quote = {"buy": np.cumsum(self.ask_quantities * self.ask_prices),
+                           "sell": np.cumsum(self.bid_quantities * self.bid_prices)}
+
+        self._asks = None
+        self._bids = None
+
+    @staticmethod
+    def _sorted_levels(levels, reverse: bool):
+        """
+        returns the arrays of prices and quantities sorted by price in same order as in OrderBook (stable sort, so the
+        levels with the same price keep the original order)
+        """
+        if isinstance(levels, np.ndarray):
+            levels_array = levels.astype(np.float64, copy=False)[:, :2]
+        else:
+            levels_array = np.array([[float(x[0]) if x[0] else 0.0, float(x[1]) if x[1] else 0.0] for x in levels],
+                                    dtype=np.float64).reshape(-1, 2)
+
+        prices = levels_array[:, 0]
+        order = np.argsort(-prices if reverse else prices, kind="stable")
+
+        return np.ascontiguousarray(prices[order]), np.ascontiguousarray(levels_array[:, 1][order])
+
+    @property
+    def asks(self):
+        if self._asks is None:
+            self._asks = [Order(p, q) for p, q in zip(self.ask_prices.tolist(), self.ask_quantities.tolist())]
+        return self._asks
+
+    @property
+    def bids(self):
+        if self._bids is None:
+            self._bids = [Order(p, q) for p, q in zip(self.bid_prices.tolist(), self.bid_quantities.tolist())]
+        return self._bids
+
+    def _levels(self, direction, currency):
+        """
+        returns the tuple of prices, cumulative amounts of requested currency, cumulative totals of resulting currency
+        and resulting currency for the direction or None if currency is wrong
+        """
+        side = "buy" if direction == "buy" else "sell"
+        prices = self.ask_prices if side == "buy" else self.bid_prices
+
+        if currency == "base":
+            return prices, self._cum_base[side], self._cum_quote[side], "quote"
+
+        if currency == "quote":
+            return prices, self._cum_quote[side], self._cum_base[side], "base"
+
+        return None
+
+    def get_depth(self, amount, direction, currency="base"):
+        """
+        get order book depth for taker positions, qty and average price for amount of base or quote currency amount
+        for buy or sell side. Same as OrderBook.get_depth but uses the cumulative sums of levels.
+
+        :param amount:
+        :param direction:
+        :param currency:
+        :return: Depth object
+        """
+
+        levels = self._levels(direction, currency)
+
+        if levels is None:
+            return None
+
+        prices, cum_amount, cum_total, currency = levels
+
+        # first level where the cumulative amount reaches the requested amount
+        level = int(np.searchsorted(cum_amount, amount, side="left")) if amount > 0 else 0
+
+        total_quantity = float(cum_total[level - 1]) if level > 0 else 0
+        amount_filled = float(cum_amount[level - 1]) if level > 0 else 0
+
+        if amount <= 0:
+            depth = 0
+
+        elif level < len(prices):
+            level_price = float(prices[level])
+            rest = Order(level_price, amount - amount_filled).quantity
+
+            if currency == "quote":
+                total_quantity += rest * level_price
+            else:
+                total_quantity += Order(level_price, rest / level_price).quantity
+
+            amount_filled = amount
+            depth = level + 1
+
+        else:
+            depth = len(prices)
+
+        if direction == "buy":
+            price = amount_filled / total_quantity
+
+        if direction == "sell":
+            price = total_quantity / amount_filled
+
+        return Depth(total_quantity, price, depth, currency, amount_filled / amount)
+
+    def get_depths(self, amounts, direction, currency="base"):
+        """
+        batch version of get_depth: evaluates the depths for the all amounts in one vectorized pass over the cumulative
+        sums of levels. Results are the same as of OrderBook.get_depths.
+
+        :param amounts: list or numpy array of amounts
+        :param direction: "buy" or "sell"
+        :param currency: "base" or "quote"
+        :return: list of Depth objects or None if currency is wrong
+        """
+
+        levels = self._levels(direction, currency)
+
+        if levels is None:
+            return None
+
+        prices, cum_amount, cum_total, result_currency = levels
+
+        amounts = np.asarray(amounts, dtype=np.float64).reshape(-1)
+        levels_count = len(prices)
+
+        level = np.searchsorted(cum_amount, amounts, side="left")
+        has_prev = level > 0
+        prev_index = np.maximum(level - 1, 0)
+
+        if levels_count > 0:
+            total_quantity = np.where(has_prev, cum_total[prev_index], 0.0)
+            amount_filled = np.where(has_prev, cum_amount[prev_index], 0.0)
+            level_price = prices[np.minimum(level, levels_count - 1)]
+        else:
+            total_quantity = amount_filled = level_price = np.zeros(len(amounts))
+
+        partial = level < levels_count
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rest = amounts - amount_filled
+
+            if result_currency == "quote":
+                total_quantity = np.where(partial, total_quantity + rest * level_price, total_quantity)
+            else:
+                total_quantity = np.where(partial, total_quantity + rest / level_price, total_quantity)
+
+            amount_filled = np.where(partial, amounts, amount_filled)
+            price = amount_filled / total_quantity if direction == "buy" else total_quantity / amount_filled
+            filled_share = amount_filled / amounts
+
+        depth = np.where(partial, level + 1, levels_count)
+        valid = (amounts > 0) & ((total_quantity if direction == "buy" else amount_filled) != 0)
+
+        depths = list()
+        for v, q, p, d, f in zip(valid.tolist(), total_quantity.tolist(), price.tolist(), depth.tolist(),
+                                 filled_share.tolist()):
+            depths.append(Depth(q, p, d, result_currency, f) if v else None)
+
+        return depths
+
+
+def get_depths_for_trade_sides(order_books: dict, start_amounts: dict, sides: dict) -> dict:
+    """
+    returns the depths for the several symbols and the several amounts of start currency per symbol in one call. Depths
+    are evaluated in accordance to OrderBook.get_depths_for_trade_side.
+
+    Example:
+        get_depths_for_trade_sides(order_books,
+                                   {"ETH/BTC": [0.1, 0.2, 0.5], "ETH/USDT": [1, 2, 3]},
+                                   {"ETH/BTC": "buy", "ETH/USDT": "sell"})
+
+    :param order_books: dict of {"symbol": OrderBook}
+    :param start_amounts: dict of {"symbol": list of start currency amounts}
+    :param sides: dict of {"symbol": "buy" or "sell"}
+    :return: dict of {"symbol": list of Depth}
+    """
+
+    depths = dict()
+    for symbol, amounts in start_amounts.items():
+        depths[symbol] = order_books[symbol].get_depths_for_trade_side(amounts, sides[symbol])
+
+    return depths
+
+
+class IncrementalOrderBook(object):
+    """
+    Order book which is maintained from the level diffs (price -> new quantity, zero quantity deletes the level) instead
+    of rebuilding from the whole fetched order book. The updates are checked against the sequence numbers, the
+    snapshot (OrderBook object) is created on demand and cached till the next update.
+
+    Usage:
+        ob = IncrementalOrderBook("ETH/BTC")
+        ob.load_snapshot(asks, bids, sequence=100)
+        ob.apply_update(asks_diff=[[0.0921, 0]], bids_diff=[[0.0919, 3.5]], sequence=101)
+        ob.get_depth(1, "sell")
+    """
+
+    def __init__(self, symbol, asks=None, bids=None, sequence: int = None, order_book_class=ArrayOrderBook):
+        """
+
+        :param symbol: order book symbol
+        :param asks: initial asks as list of [price, quantity]
+        :param bids: initial bids as list of [price, quantity]
+        :param sequence: sequence number of the initial snapshot. If None the sequence numbers will not be checked
+        until the first update with sequence.
+        :param order_book_class: class of order book returned by snapshot()
+        """
+        self.symbol = symbol
+        self.sequence = None
+        self.order_book_class = order_book_class
+
+        self._asks = dict()  # price: quantity
+        self._bids = dict()  # price: quantity
+        self._ask_prices = list()  # ascending prices
+        self._bid_prices = list()  # negated bid prices, so the list is ascending too
+
+        self._snapshot = None
+
+        self.load_snapshot(asks or list(), bids or list(), sequence)
+
+    def load_snapshot(self, asks, bids, sequence: int = None):
+        """
+        resets the order book with the full order book data
+        :param asks: list of [price, quantity]
+        :param bids: list of [price, quantity]
+        :param sequence: sequence number of the snapshot
+        """
+
+        self._asks = {float(a[0]): float(a[1]) for a in asks if a[1]}
+        self._bids = {float(b[0]): float(b[1]) for b in bids if b[1]}
+
+        self._ask_prices = sorted(self._asks)
+        self._bid_prices = sorted(-p for p in self._bids)
+
+        self.sequence = sequence
+        self._snapshot = None
+
+    @staticmethod
+    def _apply_levels(levels: dict, prices: list, diff, sign: float):
+        for level in diff:
+            price = float(level[0])
+            quantity = float(level[1]) if level[1] else 0.0
+
+            if quantity > 0:
+                if price not in levels:
+                    bisect.insort(prices, sign * price)
+                levels[price] = quantity
+
+            elif price in levels:
+                del levels[price]
+                del prices[bisect.bisect_left(prices, sign * price)]
+
+    def apply_update(self, asks_diff=None, bids_diff=None, sequence: int = None, first_sequence: int = None):
+        """
+        applies the diffs of levels to the order book.
+
+        If sequence is set, the update should continue the current sequence: first_sequence <= self.sequence + 1 <=
+        sequence (first_sequence equals sequence if not set). Updates which are older than the current sequence are
+        skipped.
+
+        :param asks_diff: list of [price, new_quantity], quantity 0 removes the level
+        :param bids_diff: list of [price, new_quantity], quantity 0 removes the level
+        :param sequence: sequence number (last sequence number) of the update
+        :param first_sequence: first sequence number of the update if the update covers several sequence numbers
+        :return: True if update was applied or False if update was skipped as outdated
+
+        :raises OrderBookSequenceError: if there is a gap between the current sequence and the update
+        """
+
+        if sequence is not None:
+            first_sequence = sequence if first_sequence is None else first_sequence
+
+            if self.sequence is not None:
+                if sequence <= self.sequence:
+                    return False
+
+                if first_sequence > self.sequence + 1:
+                    raise OrderBookSequenceError("{} order book update gap: current sequence {}, update {}-{}".format(
+                        self.symbol, self.sequence, first_sequence, sequence))
+
+            self.sequence = sequence
+
+        self._apply_levels(self._asks, self._ask_prices, asks_diff or list(), 1.0)
+        self._apply_levels(self._bids, self._bid_prices, bids_diff or list(), -1.0)
+
+        self._snapshot = None
+        return True
+
+    @property
+    def asks(self):
+        """
+        list of [price, quantity] of asks sorted by price
+        """
+        return [[p, self._asks[p]] for p in self._ask_prices]
+
+    @property
+    def bids(self):
+        """
+        list of [price, quantity] of bids sorted by price in descending order
+        """
+        return [[-p, self._bids[-p]] for p in self._bid_prices]
+
+    def snapshot(self):
+        """
+        returns the order book object (of order_book_class) for the current state. Snapshot is cached till the next
+        update.
+        """
+        if self._snapshot is None:
+            self._snapshot = self.order_book_class(self.symbol, self.asks, self.bids)
+        return self._snapshot
+
+    def get_depth(self, amount, direction, currency="base"):
+        return self.snapshot().get_depth(amount, direction, currency)
+
+    def get_depth_for_destination_currency(self, init_amount, dest_currency):
+        return self.snapshot().get_depth_for_destination_currency(init_amount, dest_currency)
+
+    def get_depth_for_trade_side(self, start_amount: float, side: str):
+        return self.snapshot().get_depth_for_trade_side(start_amount, side)
@@ -2,9 +2,9 @@ from ztom import core
 from ztom import errors
 from ztom import TradeOrder
 from ztom import ActionOrder
-import time
 import uuid
 from ztom import ccxtExchangeWrapper
+from .clock import get_clock
 
 
 
@@ -42,7 +42,7 @@ class RecoveryOrder(ActionOrder):
         super().__init__(symbol, 0.0, 1, "")
 
         self.id = str(uuid.uuid4())
-        self.timestamp = time.time()  # timestamp of object creation
+        self.timestamp = get_clock().time()  # timestamp of object creation
         self.timestamp_close = float()
 
         self.symbol = symbol
@@ -0,0 +1,182 @@
+import random
+import ccxt
+from .clock import get_clock
+
+
+class RetryPolicy(object):
+    """
+    Policy of retrying the exchange requests: number of attempts, exponential backoff with jitter between the attempts,
+    classification of errors and the deadline for all the attempts.
+
+    Network and rate limit errors (RETRYABLE_ERRORS) are retried, the errors which would not be fixed by retrying
+    (FATAL_ERRORS: insufficient funds, invalid order, authentication) fail fast. Other errors are retried if
+    retry_unknown_errors is set.
+
+    Pause before the attempt N (counted from 1) is base_delay * multiplier ** (N - 1) limited by max_delay and reduced
+    by the random part of jitter. So RetryPolicy(max_attempts=n, base_delay=d, multiplier=1, jitter=0) gives the plain
+    loop with the fixed pause.
+
+    Usage:
+        policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=10, deadline=30)
+        result = policy.run(lambda: exchange.get_order_update(order))
+    """
+
+    RETRYABLE_ERRORS = (ccxt.NetworkError,)  # includes DDoSProtection, RateLimitExceeded, RequestTimeout
+    FATAL_ERRORS = (ccxt.InsufficientFunds, ccxt.InvalidOrder, ccxt.AuthenticationError, ccxt.BadRequest)
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30.0,
+                 multiplier: float = 2.0, jitter: float = 0.5, deadline: float = None,
+                 retry_unknown_errors: bool = True, time_func=None, seed=None, clock=None):
+        """
+        :param max_attempts: max number of attempts including the first one
+        :param base_delay: pause in seconds before the first retry
+        :param max_delay: max pause in seconds
+        :param multiplier: multiplier of pause for every next retry
+        :param jitter: max part of the pause (0..1) which is randomly subtracted from the pause
+        :param deadline: max time in seconds from the first attempt when retry could be started. None - no deadline
+        :param retry_unknown_errors: retry the errors which are neither retryable nor fatal
+        :param time_func: function which returns current time in seconds. If not set - the time of clock
+        :param seed: seed of jitter's random generator
+        :param clock: Clock for the pauses and the current time. If None - the process wide clock (see
+        ztom.clock.get_clock)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_unknown_errors = retry_unknown_errors
+        self.clock = clock
+        self.time_func = time_func if time_func is not None else self._clock_time
+
+        self._random = random.Random(seed)
+
+    @classmethod
+    def fixed(cls, max_attempts: int, delay: float = 0.0, **kwargs):
+        """
+        returns the policy with fixed pause between the attempts
+        """
+        return cls(max_attempts=max_attempts, base_delay=delay, max_delay=delay, multiplier=1.0, jitter=0.0, **kwargs)
+
+    def _get_clock(self):
+        return self.clock if self.clock is not None else get_clock()
+
+    def _clock_time(self) -> float:
+        return self._get_clock().time()
+
+    def sleep(self, delay: float):
+        """
+        pause between the attempts via the policy's clock
+        """
+        self._get_clock().sleep(delay)
+
+    async def sleep_async(self, delay: float):
+        await self._get_clock().sleep_async(delay)
+
+    def is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, self.FATAL_ERRORS):
+            return False
+
+        if isinstance(error, self.RETRYABLE_ERRORS):
+            return True
+
+        return self.retry_unknown_errors
+
+    def delay(self, attempt: int) -> float:
+        """
+        returns the pause in seconds before the next attempt after the attempt number (counted from 1) failed
+        """
+        delay = min(self.base_delay * self.multiplier ** (attempt - 1), self.max_delay)
+        if self.jitter:
+            delay -= delay * self.jitter * self._random.random()
+        return delay
+
+    def should_retry(self, error: Exception, attempt: int, started: float = None) -> bool:
+        """
+        returns True if the request should be retried after the attempt number (counted from 1) which was started
+        at started timestamp had failed with error (None if the request returned empty result)
+        """
+        if error is not None and not self.is_retryable(error):
+            return False
+
+        if attempt >= self.max_attempts:
+            return False
+
+        if self.deadline is not None and started is not None and self.time_func() - started > self.deadline:
+            return False
+
+        return True
+
+    def run(self, request, on_error=None, before_retry=None, attempt: int = 0, started: float = None,
+            accept_empty: bool = False):
+        """
+        calls request() till it returns the non empty result or the policy stops retrying and returns the last result
+        (None if request raised the exception). Requests returned empty results are retried without pause (if
+        accept_empty is not set).
+
+        :param request: function without parameters which sends the request
+        :param on_error: function on_error(error, attempt) called on every exception
+        :param before_retry: function before_retry(error, attempt, delay) called before the pause. Could raise the
+        exception to interrupt the retries
+        :param attempt: number of attempts already made (if retries are continued)
+        :param started: timestamp of the first attempt (if retries are continued)
+        :param accept_empty: return the result of the request without exception even if it's empty
+        :return: result of request
+        """
+        started = started if started is not None else self.time_func()
+        result = None
+
+        while True:
+            attempt += 1
+            error = None
+            try:
+                result = request()
+                if result or accept_empty:
+                    return result
+            except Exception as e:
+                result = None
+                error = e
+                if on_error is not None:
+                    on_error(e, attempt)
+
+            if not self.should_retry(error, attempt, started):
+                return result
+
+            delay = self.delay(attempt) if error is not None else 0.0
+            if before_retry is not None:
+                before_retry(error, attempt, delay)
+
+            if delay > 0:
+                self.sleep(delay)
+
+    async def run_async(self, request, on_error=None, before_retry=None, attempt: int = 0, started: float = None,
+                        accept_empty: bool = False):
+        """
+        async version of run(): request is the function which returns the awaitable
+        """
+        started = started if started is not None else self.time_func()
+        result = None
+
+        while True:
+            attempt += 1
+            error = None
+            try:
+                result = await request()
+                if result or accept_empty:
+                    return result
+            except Exception as e:
+                result = None
+                error = e
+                if on_error is not None:
+                    on_error(e, attempt)
+
+            if not self.should_retry(error, attempt, started):
+                return result
+
+            delay = self.delay(attempt) if error is not None else 0.0
+            if before_retry is not None:
+                before_retry(error, attempt, delay)
+
+            if delay > 0:
+                await self.sleep_async(delay)
@@ -1,9 +1,180 @@
-from datetime import datetime
-import time
 import collections
+import threading
+import heapq
+import itertools
+from .clock import get_clock
+
+
+class ThrottleAcquireMixin(object):
+    """
+    Waiting for the requests budget with priorities. Used by Throttle and WindowThrottle: the throttle object should
+    call _init_acquire() with it's lock and implement sleep_time() and add_request().
+
+    Waiting requests are queued by (priority, arrival order) - the lower priority value the earlier request will be
+    served. Only the first request in the queue is waiting for the throttle's sleep time, so the high priority requests
+    (cancel_order, fetch_order) are never starved by the bursts of normal (fetch_tickers, create_order) and low priority
+    (fetch_balance, load_markets) requests. The priority of the single request could be set in acquire().
+    """
+
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 1
+    PRIORITY_LOW = 2
+
+    REQUEST_TYPE_PRIORITY = {
+        "cancel_order": PRIORITY_HIGH,
+        "fetch_order": PRIORITY_HIGH,
+        "fetch_balance": PRIORITY_LOW,
+        "load_markets": PRIORITY_LOW}
+
+    ASYNC_POLL_INTERVAL = 0.01  # max pause in seconds between the checks of the queue in acquire_async
+
+    def _init_acquire(self, lock):
+        self.request_priorities = dict(ThrottleAcquireMixin.REQUEST_TYPE_PRIORITY)
+        self._condition = threading.Condition(lock)
+        self._waiters = list()  # heap of (priority, arrival number)
+        self._waiters_counter = itertools.count()
+        self.backoff_until = 0.0  # timestamp till which the requests should not be sent (see backoff())
+        self.clock = None  # Clock of the throttle. If None - the process wide clock (see ztom.clock.get_clock)
+
+    @property
+    def lock(self):
+        """
+        re-entrant lock guarding the throttle's state
+        """
+        return self._condition
+
+    def _get_clock(self):
+        return self.clock if self.clock is not None else get_clock()
+
+    def _time(self) -> float:
+        return self._get_clock().time()
+
+    def backoff(self, seconds: float, timestamp: float = None):
+        """
+        blocks the requests budget for the number of seconds from timestamp (for example after the exchange's "too
+        many requests" error): sleep_time() will be not less than the remaining backoff time.
+
+        :param seconds: backoff time in seconds
+        :param timestamp: start of backoff. If not set - the current timestamp of the throttle's clock will be taken
+        """
+        if timestamp is None:
+            timestamp = self._time()
+
+        with self._condition:
+            self.backoff_until = max(self.backoff_until, timestamp + seconds)
+            self._condition.notify_all()
+
+    def _backoff_sleep_time(self, timestamp: float) -> float:
+        return self.backoff_until - timestamp if self.backoff_until > timestamp else 0.0
 
+    def request_priority(self, request_type: str) -> int:
+        return self.request_priorities.get(request_type, self.PRIORITY_NORMAL)
 
-class Throttle(object):
+    def _enqueue(self, request_type: str, priority: int = None):
+        if priority is None:
+            priority = self.request_priority(request_type)
+
+        ticket = (priority, next(self._waiters_counter))
+        heapq.heappush(self._waiters, ticket)
+        self._condition.notify_all()
+        return ticket
+
+    def _dequeue(self, ticket):
+        if self._waiters and self._waiters[0] == ticket:
+            heapq.heappop(self._waiters)
+        elif ticket in self._waiters:
+            self._waiters.remove(ticket)
+            heapq.heapify(self._waiters)
+
+        self._condition.notify_all()
+
+    def _request_sleep_time(self, request_type: str):
+        return self.sleep_time()
+
+    def _ticket_sleep_time(self, ticket, request_type: str):
+        """
+        returns the sleep time for the request with ticket or None if there are requests with higher priority in the
+        queue
+        """
+        if self._waiters[0] != ticket:
+            return None
+        return self._request_sleep_time(request_type)
+
+    def acquire(self, request_type: str = "single", priority: int = None, requests: int = 1,
+                timeout: float = None) -> bool:
+        """
+        waits until the requests budget is available and all the requests with the higher priority are served and adds
+        the request to the throttle
+
+        :param request_type: type of request
+        :param priority: PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW or any int (lower value - higher priority). If
+        not set - the priority from request_priorities for request type is used.
+        :param requests: number of requests
+        :param timeout: max time to wait in seconds. None - wait forever
+        :return: True if the request was added or False on timeout
+        """
+        clock = self._get_clock()
+        deadline = clock.time() + timeout if timeout is not None else None
+
+        with self._condition:
+            ticket = self._enqueue(request_type, priority)
+            try:
+                while True:
+                    sleep_time = self._ticket_sleep_time(ticket, request_type)
+
+                    if sleep_time is not None and sleep_time <= 0:
+                        self.add_request(request_type=request_type, requests=requests)
+                        return True
+
+                    if deadline is not None:
+                        remaining = deadline - clock.time()
+                        if remaining <= 0:
+                            return False
+                        sleep_time = remaining if sleep_time is None else min(sleep_time, remaining)
+
+                    if clock.virtual and sleep_time is not None:
+                        clock.sleep(sleep_time)  # virtual time: only the waiting for other requests is real
+                    else:
+                        self._condition.wait(sleep_time)
+            finally:
+                self._dequeue(ticket)
+
+    async def acquire_async(self, request_type: str = "single", priority: int = None, requests: int = 1,
+                            timeout: float = None) -> bool:
+        """
+        async version of acquire(): waits via the clock's sleep_async so the event loop is not blocked. Shares the
+        queue of waiting requests with acquire().
+        """
+        clock = self._get_clock()
+        deadline = clock.time() + timeout if timeout is not None else None
+
+        with self._condition:
+            ticket = self._enqueue(request_type, priority)
+
+        try:
+            while True:
+                with self._condition:
+                    sleep_time = self._ticket_sleep_time(ticket, request_type)
+
+                    if sleep_time is not None and sleep_time <= 0:
+                        self.add_request(request_type=request_type, requests=requests)
+                        return True
+
+                pause = self.ASYNC_POLL_INTERVAL if sleep_time is None else sleep_time
+
+                if deadline is not None:
+                    remaining = deadline - clock.time()
+                    if remaining <= 0:
+                        return False
+                    pause = min(pause, remaining)
+
+                await clock.sleep_async(pause)
+        finally:
+            with self._condition:
+                self._dequeue(ticket)
+
+
+class Throttle(ThrottleAcquireMixin):
 
     REQUEST_TYPE_WEIGHT = {
         "single": 1,
@@ -43,7 +214,7 @@ class Throttle(object):
         self._period_start_timestamp = 0.0
         self._requests_in_current_period = int()
 
-        self.request_weights = Throttle.REQUEST_TYPE_WEIGHT
+        self.request_weights = dict(Throttle.REQUEST_TYPE_WEIGHT)
 
         if requests_weights is not None:
             self.request_weights.update(requests_weights)
@@ -54,6 +225,10 @@ class Throttle(object):
 
         self.periods_since_start = 0
 
+        # guards the requests accounting when the throttle is shared between threads
+        self._lock = threading.RLock()
+        self._init_acquire(self._lock)
+
     def update(self, current_time_stamp: float = None):
         """
         updates the internal time. If the time passed since the last update greater than period duration - the new
@@ -66,6 +241,10 @@ class Throttle(object):
         :param current_time_stamp:
         :return:
         """
+        with self._lock:
+            return self._update(current_time_stamp)
+
+    def _update(self, current_time_stamp: float = None):
 
         if len(self.requests_current_period) > 0:
             self._period_start_timestamp = self.requests_current_period[0]["timestamp"]
@@ -74,7 +253,7 @@ class Throttle(object):
             return False
 
         if current_time_stamp is None:
-            current_time_stamp = datetime.now().timestamp()
+            current_time_stamp = self._time()
 
         last_period_start_timestamp = self._period_start_timestamp
 
@@ -111,17 +290,18 @@ class Throttle(object):
     def add_request(self, timestamp=None,  request_type: str ="single", requests: int = 1):
         """
         adds the requests and updates the state of throttle  object
-        :param timestamp: current or request's timestamp. if not set current system's timestamp will be used
+        :param timestamp: current or request's timestamp. if not set - the clock's current timestamp is used
         :param request_type:
         :param requests
         :return:
         """
 
         if timestamp is None:
-            timestamp = datetime.timestamp(datetime.now())
+            timestamp = self._time()
 
-        self._add_request_for_current_period_time(timestamp, request_type, requests )
-        self.update(timestamp)
+        with self._lock:
+            self._add_request_for_current_period_time(timestamp, request_type, requests)
+            self._update(timestamp)
 
     def _calc_time_sleep_to_recover_requests_rate(self, current_period_time, requests_in_current_period) -> float:
         """
@@ -140,18 +320,388 @@ class Throttle(object):
         """
         get the current sleep time in seconds in order to maintain the maximun requests per period.
 
-        :param timestamp: if not set - the current system's timestamp will be taken
+        :param timestamp: if not set - the current timestamp of the throttle's clock will be taken
         :return: sleep time in seconds
         """
         if timestamp is None:
-            timestamp = datetime.timestamp(datetime.now())
+            timestamp = self._time()
 
        # self.update(timestamp)
 
-        requests_in_current_period = 0
-        if len(self.requests_current_period) > 0:
-            requests_in_current_period = self.total_requests_current_period
+        with self._lock:
+            requests_in_current_period = 0
+            if len(self.requests_current_period) > 0:
+                requests_in_current_period = self.total_requests_current_period
+
+            return max(self._calc_time_sleep_to_recover_requests_rate(timestamp - self._period_start_timestamp,
+                                                                      requests_in_current_period),
+                       self._backoff_sleep_time(timestamp))
+
+
+
+class WindowThrottle(ThrottleAcquireMixin):
+    """
+    Thread-safe requests throttle with O(1) amortized adding of requests and querying of the requests budget. Requests
+    are stored in the deque of (timestamp, request_type, requests, weight) together with the running total of their
+    weights, so the expired requests are just popped from the left side of the deque.
+
+    Two window modes are supported:
+
+    - sliding (default): requests made during the last `period` seconds are counted. sleep_time returns the time to
+      wait till the oldest requests leave the window and the requests budget is available again.
+    - fixed (sliding=False): the same semantics as Throttle - the period starts with the oldest request in the period
+      and sleep_time is calculated to maintain the constant requests rate within the period.
+
+    Has the same interface as Throttle: add_request, update, sleep_time, total_requests_current_period and
+    requests_current_period.
+    """
+
+    def __init__(self, period: float = 60.0, requests_per_period: int = 60, requests_weights: dict = None,
+                 sliding: bool = True):
+        """
+        :param period: period (window size) in seconds
+        :param requests_per_period: maximum amount of weighted requests during the period
+        :param requests_weights: weights of request types which override the Throttle.REQUEST_TYPE_WEIGHT
+        :param sliding: True for sliding window, False for fixed period
+        """
+
+        self.period = period
+        self.requests_per_period = requests_per_period
+        self.sliding = sliding
+
+        self.request_weights = dict(Throttle.REQUEST_TYPE_WEIGHT)
+
+        if requests_weights is not None:
+            self.request_weights.update(requests_weights)
+
+        # min allowed time between single requests
+        self.allowed_time_for_single_request = self.period / self.requests_per_period \
+            if self.requests_per_period != 0 else 0
+
+        self.total_requests_current_period = 0
+        self.periods_since_start = 0
+
+        # of (timestamp, request_type, requests, weight, cumulative weight of added requests including this one)
+        self._requests = collections.deque()
+        self._added_weight = 0  # running sum of weights of all the added requests
+        self._period_start_timestamp = 0.0
+        self._current_period_time = 0.0
+
+        self._lock = threading.RLock()
+        self._init_acquire(self._lock)
+
+    @property
+    def requests_current_period(self):
+        """
+        list of requests in current period in the format of Throttle.requests_current_period
+        """
+        with self._lock:
+            return [{"timestamp": r[0], "request_type": r[1], "added": r[2]} for r in self._requests]
+
+    def __len__(self):
+        return len(self._requests)
+
+    def _expire(self, boundary: float, inclusive: bool):
+        """
+        removes the requests with timestamp earlier than boundary (or equal if inclusive)
+        """
+        requests = self._requests
+        while requests and (requests[0][0] < boundary or (inclusive and requests[0][0] == boundary)):
+            self.total_requests_current_period -= requests.popleft()[3]
+
+    def _update(self, timestamp: float):
+
+        if not self._requests:
+            return False
+
+        if self.sliding:
+            self._expire(timestamp - self.period, True)
+            self._period_start_timestamp = self._requests[0][0] if self._requests else timestamp
+            self._current_period_time = timestamp - self._period_start_timestamp
+            return True
+
+        self._period_start_timestamp = self._requests[0][0]
+        periods = (timestamp - self._period_start_timestamp) // self.period
+
+        if periods > 0:
+            self._period_start_timestamp += periods * self.period
+            self.periods_since_start += int(periods)
+            self._expire(self._period_start_timestamp, False)
+
+        self._current_period_time = timestamp - self._period_start_timestamp
+        return True
+
+    def update(self, current_time_stamp: float = None):
+        """
+        removes the requests which are out of the current window
+
+        :param current_time_stamp: if not set - the current timestamp of the throttle's clock will be taken
+        """
+        if current_time_stamp is None:
+            current_time_stamp = self._time()
+
+        with self._lock:
+            return self._update(current_time_stamp)
+
+    def _append(self, timestamp: float, request_type: str, requests: int, weight):
+        self._added_weight += weight
+        self._requests.append((timestamp, request_type, requests, weight, self._added_weight))
+        self.total_requests_current_period += weight
+
+    def add_request(self, timestamp=None, request_type: str = "single", requests: int = 1):
+        """
+        adds the requests and updates the state of throttle object
+
+        :param timestamp: current or request's timestamp. if not set - the clock's current timestamp is used
+        :param request_type: type of request from request_weights
+        :param requests: number of requests
+        """
+        if timestamp is None:
+            timestamp = self._time()
+
+        weight = self.request_weights[request_type] * requests
+
+        with self._lock:
+            self._append(timestamp, request_type, requests, weight)
+            self._update(timestamp)
+
+    def sleep_time(self, timestamp=None):
+        """
+        get the current sleep time in seconds in order to maintain the maximum requests per period.
+
+        :param timestamp: if not set - the current timestamp of the throttle's clock will be taken
+        :return: sleep time in seconds
+        """
+        if timestamp is None:
+            timestamp = self._time()
+
+        with self._lock:
+            return max(self._budget_sleep_time(timestamp), self._backoff_sleep_time(timestamp))
+
+    def _budget_sleep_time(self, timestamp: float) -> float:
+        """
+        sleep time to maintain the requests budget, should be called within the lock
+        """
+        if not self._requests:
+            return 0.0
+
+        if not self.sliding:
+            sleep_time = self.total_requests_current_period * self.allowed_time_for_single_request \
+                         - (timestamp - self._period_start_timestamp)
+            return sleep_time if sleep_time > 0 else 0.0
+
+        self._update(timestamp)
+
+        # the weight of oldest requests to expire in order to get the budget for the next single request
+        excess = self.total_requests_current_period - self.requests_per_period + 1
+        if excess <= 0:
+            return 0.0
+
+        # binary search of the first request which cumulative weight since the head of window covers the excess
+        requests = self._requests
+        head = requests[0]
+        target = head[4] - head[3] + excess
+
+        if requests[-1][4] < target:
+            return 0.0
+
+        low, high = 0, len(requests) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if requests[middle][4] < target:
+                low = middle + 1
+            else:
+                high = middle
+
+        return max(requests[low][0] + self.period - timestamp, 0.0)
+
+    def set_used_requests(self, used: float, timestamp: float = None):
+        """
+        corrects the local count of requests in the current window to the number of used requests (weight) reported by
+        the exchange. If the exchange reports more - the difference is added as the "correction" request (requests made
+        by other clients with the same limits). If less - the oldest requests are removed from the window.
+
+        :param used: number of used requests (weight) in current window reported by exchange
+        :param timestamp: if not set - the current timestamp of the throttle's clock will be taken
+        """
+        if timestamp is None:
+            timestamp = self._time()
+
+        with self._lock:
+            self._update(timestamp)
+            correction = used - self.total_requests_current_period
+
+            if correction > 0:
+                self._append(timestamp, "correction", 0, correction)
+
+            requests = self._requests
+            while correction < 0 and requests:
+                request = requests.popleft()
+                if request[3] + correction > 0:
+                    # partially remove the oldest request
+                    requests.appendleft((request[0], request[1], request[2], request[3] + correction, request[4]))
+                    self.total_requests_current_period += correction
+                    correction = 0
+                else:
+                    self.total_requests_current_period -= request[3]
+                    correction += request[3]
+
+            if not self._requests:
+                self.total_requests_current_period = 0
+
+
+class CompositeThrottle(ThrottleAcquireMixin):
+    """
+    Throttle which evaluates several limits (buckets) together, for example the requests weight per minute, orders per
+    10 seconds and orders per day. Every bucket is a throttle object with it's own period, requests budget and request
+    type weights: request is counted only in the buckets which have the weight for it's request type.
+
+    sleep_time() returns the sleep time of the binding (the most restrictive) bucket.
+
+    Attributes period, requests_per_period, request_weights, total_requests_current_period and requests_current_period
+    are taken from the primary (first) bucket, so the object could be used in place of Throttle.
+    """
+
+    def __init__(self, buckets: dict):
+        """
+        :param buckets: dict of {bucket_name: throttle object}
+        """
+        if not buckets:
+            raise ValueError("No buckets for CompositeThrottle")
+
+        self.buckets = collections.OrderedDict(buckets)
+        self.primary_bucket = next(iter(self.buckets))
+
+        self._lock = threading.RLock()
+        self._init_acquire(self._lock)
+
+    @classmethod
+    def from_limits(cls, limits: dict, default_weights: dict = None):
+        """
+        creates the CompositeThrottle of WindowThrottle buckets from the limits declaration:
+
+            {"weight": {"period": 60, "requests_per_period": 1200},
+             "orders_10s": {"period": 10, "requests_per_period": 100, "weights": {"create_order": 1}},
+             "orders_day": {"period": 86400, "requests_per_period": 200000, "weights": {"create_order": 1},
+                            "sliding": False}}
+
+        "weights" - the weights of counted request types. If not set - default_weights (or Throttle.REQUEST_TYPE_WEIGHT)
+        are used. "sliding" - window mode, True by default.
 
-        return self._calc_time_sleep_to_recover_requests_rate(timestamp - self._period_start_timestamp,
-                                                              requests_in_current_period)
+        :param limits: dict of buckets declarations
+        :param default_weights: request type weights for the buckets without "weights"
+        :return: CompositeThrottle
+        """
+        buckets = collections.OrderedDict()
+
+        for name, limit in limits.items():
+            weights = limit.get("weights")
+            if weights is None:
+                weights = default_weights if default_weights is not None else Throttle.REQUEST_TYPE_WEIGHT
+
+            bucket = WindowThrottle(limit["period"], limit["requests_per_period"], sliding=limit.get("sliding", True))
+            bucket.request_weights = dict(weights)  # only declared request types are counted in the bucket
+            buckets[name] = bucket
+
+        return cls(buckets)
+
+    @property
+    def primary(self):
+        return self.buckets[self.primary_bucket]
+
+    @property
+    def period(self):
+        return self.primary.period
+
+    @property
+    def requests_per_period(self):
+        return self.primary.requests_per_period
+
+    @property
+    def request_weights(self):
+        return self.primary.request_weights
+
+    @property
+    def total_requests_current_period(self):
+        return self.primary.total_requests_current_period
+
+    @property
+    def requests_current_period(self):
+        return self.primary.requests_current_period
+
+    def update(self, current_time_stamp: float = None):
+        if current_time_stamp is None:
+            current_time_stamp = self._time()
+
+        with self._lock:
+            for bucket in self.buckets.values():
+                bucket.update(current_time_stamp)
+
+    def add_request(self, timestamp=None, request_type: str = "single", requests: int = 1):
+        """
+        adds the requests to the buckets which count the request type
+
+        :param timestamp: current or request's timestamp. if not set - the clock's current timestamp is used
+        :param request_type: type of request
+        :param requests: number of requests
+        """
+        if timestamp is None:
+            timestamp = self._time()
+
+        with self._lock:
+            for bucket in self.buckets.values():
+                if request_type in bucket.request_weights:
+                    bucket.add_request(timestamp, request_type, requests)
+
+    def bucket_sleep_times(self, timestamp=None, request_type: str = None) -> dict:
+        """
+        returns the sleep times of the buckets as {bucket_name: sleep_time}
+
+        :param timestamp: if not set - the current timestamp of the throttle's clock will be taken
+        :param request_type: if set - only the buckets which count the request type are evaluated
+        """
+        if timestamp is None:
+            timestamp = self._time()
+
+        with self._lock:
+            return {name: bucket.sleep_time(timestamp) for name, bucket in self.buckets.items()
+                    if request_type is None or request_type in bucket.request_weights}
+
+    def binding_bucket(self, timestamp=None):
+        """
+        returns the name of the bucket with the greatest sleep time
+        """
+        sleep_times = self.bucket_sleep_times(timestamp)
+        return max(sleep_times, key=sleep_times.get)
+
+    def sleep_time(self, timestamp=None):
+        """
+        get the sleep time in seconds of the binding bucket
+
+        :param timestamp: if not set - the current timestamp of the throttle's clock will be taken
+        :return: sleep time in seconds
+        """
+        if timestamp is None:
+            timestamp = self._time()
+
+        return max(max(self.bucket_sleep_times(timestamp).values()), self._backoff_sleep_time(timestamp))
+
+    def _request_sleep_time(self, request_type: str):
+        timestamp = self._time()
+        return max(max(self.bucket_sleep_times(timestamp, request_type).values(), default=0.0),
+                   self._backoff_sleep_time(timestamp))
+
+    def set_used_requests(self, used: float, timestamp: float = None, bucket: str = None):
+        """
+        corrects the local count of requests of the bucket to the number reported by exchange (see
+        WindowThrottle.set_used_requests)
+
+        :param used: number of used requests (weight) reported by exchange
+        :param timestamp: if not set - the current timestamp of the throttle's clock will be taken
+        :param bucket: bucket name. If not set - the primary bucket is corrected
+        """
+        if timestamp is None:
+            timestamp = self._time()
 
+        with self._lock:
+            self.buckets[bucket if bucket is not None else self.primary_bucket].set_used_requests(used, timestamp)
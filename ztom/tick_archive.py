@@ -0,0 +1,224 @@
+import array
+import json
+import mmap
+import os
+import struct
+import numpy as np
+from .tickers_csv import TICKER_FLOAT_FIELDS, iter_tickers_csv
+
+RECORD_DTYPE = np.dtype([("fetch_id", "<i8"), ("timestamp", "<i8"), ("symbol", "<u4"), ("ask", "<f8"),
+                         ("bid", "<f8"), ("askVolume", "<f8"), ("bidVolume", "<f8")])
+
+INDEX_DTYPE = np.dtype([("fetch_id", "<i8"), ("start", "<i8")])
+
+NO_TIMESTAMP = -1
+
+
+def convert_tickers_csv(csv_file: str, archive_file: str = None) -> str:
+    """
+    converts the tickers csv file (see ccxtExchangeWrapper.load_tickers_from_csv) to the tick archive. The csv is
+    streamed, so the file of any size could be converted.
+
+    :param csv_file: path to the tickers csv file
+    :param archive_file: path to the archive. If not set - csv_file with TickArchive.EXTENSION instead of ".csv"
+    :return: path to the archive
+    """
+    if archive_file is None:
+        archive_file = os.path.splitext(csv_file)[0] + TickArchive.EXTENSION
+
+    with open(csv_file, newline="") as f:
+        TickArchive.write(archive_file, iter_tickers_csv(f))
+
+    return archive_file
+
+
+class TickArchive(object):
+    """
+    Compact binary archive of offline tickers for the fast replay. The file is memory mapped and the records are read
+    via the zero-copy NumPy views, so opening of the archive does not depend on it's size.
+
+    File layout:
+        MAGIC
+        records: fixed width RECORD_DTYPE records (fetch_id, timestamp, symbol id, ask, bid, askVolume, bidVolume)
+        ordered by fetch_id. Missing prices and volumes are NaN, missing timestamp is NO_TIMESTAMP.
+        index: INDEX_DTYPE (fetch_id, number of the first record of fetch) for every fetch
+        footer: json with the symbols dictionary (symbol id is the position in the list) and the counts
+        footer length (uint64)
+        MAGIC
+
+    Has the same read only dict interface {fetch_id: {symbol: ticker}} as IndexedTickersCsv, so the archive could be
+    used by ccxtExchangeWrapper.set_offline_mode in place of the tickers csv file.
+
+    Usage:
+        convert_tickers_csv("tickers.csv")  # creates tickers.tka
+        exchange.set_offline_mode("markets.json", "tickers.tka")
+    """
+
+    MAGIC = b"ZTOMTKA1"
+    EXTENSION = ".tka"
+    VERSION = 1
+
+    _FOOTER_TAIL = struct.Struct("<Q")
+
+    def __init__(self, path: str):
+        """
+        :param path: path to the archive file
+        """
+        self.path = path
+
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("Empty tick archive {}".format(path))
+
+        tail_size = self._FOOTER_TAIL.size + len(self.MAGIC)
+        if self._mmap[:len(self.MAGIC)] != self.MAGIC or self._mmap[-len(self.MAGIC):] != self.MAGIC:
+            self.close()
+            raise ValueError("{} is not a tick archive".format(path))
+
+        footer_length = self._FOOTER_TAIL.unpack_from(self._mmap, len(self._mmap) - tail_size)[0]
+        footer_offset = len(self._mmap) - tail_size - footer_length
+        footer = json.loads(self._mmap[footer_offset:footer_offset + footer_length].decode("utf-8"))
+
+        if footer["version"] != self.VERSION:
+            self.close()
+            raise ValueError("Unsupported tick archive version {}".format(footer["version"]))
+
+        self.symbols = footer["symbols"]
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        self.records = np.frombuffer(self._mmap, RECORD_DTYPE, footer["records"], len(self.MAGIC))
+        self.index = np.frombuffer(self._mmap, INDEX_DTYPE, footer["fetches"], footer["index_offset"])
+        self.fetch_ids = self.index["fetch_id"]
+
+    @classmethod
+    def is_archive(cls, path: str) -> bool:
+        """
+        returns True if the file starts with the archive's MAGIC
+        """
+        with open(path, "rb") as f:
+            return f.read(len(cls.MAGIC)) == cls.MAGIC
+
+    @classmethod
+    def write(cls, path: str, fetches):
+        """
+        writes the archive from the iterable of (fetch_id, {symbol: ticker}) ordered by fetch_id. Tickers are written
+        one fetch at a time.
+
+        :param path: path to the archive file
+        :param fetches: iterable of (fetch_id, {symbol: ticker}), for example the generator of iter_tickers_csv
+        """
+        symbol_ids = dict()
+        index = array.array("q")
+        records_count = 0
+        last_fetch_id = None
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(cls.MAGIC)
+
+            for fetch_id, tickers in fetches:
+                if last_fetch_id is not None and fetch_id <= last_fetch_id:
+                    raise ValueError("Fetches are not ordered by fetch_id: {} after {}".format(fetch_id,
+                                                                                            last_fetch_id))
+                last_fetch_id = fetch_id
+
+                records = np.empty(len(tickers), RECORD_DTYPE)
+                records["fetch_id"] = fetch_id
+                records["symbol"] = [symbol_ids.setdefault(symbol, len(symbol_ids)) for symbol in tickers]
+
+                timestamps = [t.get("timestamp") for t in tickers.values()]
+                records["timestamp"] = [ts if ts is not None else NO_TIMESTAMP for ts in timestamps]
+
+                for field in TICKER_FLOAT_FIELDS:
+                    # None is converted to NaN
+                    records[field] = np.array([t.get(field) for t in tickers.values()], dtype=float)
+
+                index.extend((fetch_id, records_count))
+                records_count += len(records)
+                f.write(records.tobytes())
+
+            index_offset = f.tell()
+            f.write(index.tobytes())
+
+            footer = json.dumps({"version": cls.VERSION, "symbols": list(symbol_ids), "records": records_count,
+                                 "fetches": len(index) // 2, "index_offset": index_offset}).encode("utf-8")
+            f.write(footer)
+            f.write(cls._FOOTER_TAIL.pack(len(footer)))
+            f.write(cls.MAGIC)
+
+        os.replace(tmp_path, path)
+
+    def _position(self, fetch_id: int) -> int:
+        position = int(np.searchsorted(self.fetch_ids, fetch_id))
+        if position == len(self.fetch_ids) or self.fetch_ids[position] != fetch_id:
+            raise KeyError(fetch_id)
+        return position
+
+    def fetch_records(self, fetch_id: int) -> np.ndarray:
+        """
+        returns the zero-copy view of the records of fetch_id
+        """
+        position = self._position(fetch_id)
+        start = self.index["start"][position]
+        end = self.index["start"][position + 1] if position + 1 < len(self.index) else len(self.records)
+        return self.records[start:end]
+
+    def __getitem__(self, fetch_id: int) -> dict:
+        tickers = dict()
+
+        for _, timestamp, symbol_id, ask, bid, ask_volume, bid_volume in self.fetch_records(fetch_id).tolist():
+            ticker = {"ask": ask if ask == ask else None,  # NaN is the missing value
+                      "bid": bid if bid == bid else None,
+                      "askVolume": ask_volume if ask_volume == ask_volume else None,
+                      "bidVolume": bid_volume if bid_volume == bid_volume else None}
+
+            if timestamp != NO_TIMESTAMP:
+                ticker["timestamp"] = timestamp
+
+            tickers[self.symbols[symbol_id]] = ticker
+
+        return tickers
+
+    def get(self, fetch_id: int, default=None):
+        try:
+            return self[fetch_id]
+        except KeyError:
+            return default
+
+    def __contains__(self, fetch_id) -> bool:
+        try:
+            self._position(fetch_id)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self.fetch_ids)
+
+    def __iter__(self):
+        return iter(self.fetch_ids.tolist())
+
+    def keys(self):
+        return self.fetch_ids.tolist()
+
+    def close(self):
+        """
+        releases the memory map. Views of records returned before are not valid after closing.
+        """
+        self.records = None
+        self.index = None
+        self.fetch_ids = None
+
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # views of records are still in use, the map is released with them
+            self._mmap = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
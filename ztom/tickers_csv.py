@@ -0,0 +1,268 @@
+import array
+import bisect
+import collections
+import csv
+import io
+import json
+import os
+
+TICKER_FLOAT_FIELDS = ("ask", "bid", "askVolume", "bidVolume")
+
+
+def _to_float(value: str):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _timestamp_ms(value: str):
+    """
+    ticker's timestamp in ms from the csv value. Timestamps in seconds (as saved by examples/tickers_to_csv.py) are
+    converted to ms.
+    """
+    try:
+        timestamp = float(value)
+    except ValueError:
+        return None
+    return int(timestamp * 1000) if timestamp < 1e11 else int(timestamp)
+
+
+def iter_tickers_csv(f, header: list = None):
+    """
+    generator of (fetch_id, {symbol: ticker}) groups of the consecutive rows with the same fetch_id from the tickers csv
+    file object (or the iterable of text lines). The group is yielded when the first row of the next group is read, so
+    only one group is kept in memory.
+
+    :param f: text file object opened with newline="" and positioned at the header or at the start of the group
+    :param header: csv header if f is positioned after it
+    """
+    reader = csv.reader(f)
+
+    if header is None:
+        header = next(reader, None)
+        if header is None:
+            return
+
+    columns = {name: i for i, name in enumerate(header)}
+    fetch_id_column = columns["fetch_id"]
+    symbol_column = columns["symbol"]
+    float_columns = [(field, columns[field]) for field in TICKER_FLOAT_FIELDS]
+    timestamp_column = columns.get("timestamp")
+
+    fetch_id = None
+    tickers = None
+
+    for row in reader:
+        if not row:
+            continue
+
+        row_fetch_id = int(row[fetch_id_column])
+        if row_fetch_id != fetch_id:
+            if tickers is not None:
+                yield fetch_id, tickers
+            fetch_id = row_fetch_id
+            tickers = dict()
+
+        ticker = {field: _to_float(row[i]) for field, i in float_columns}
+
+        if timestamp_column is not None and row[timestamp_column]:
+            ticker["timestamp"] = _timestamp_ms(row[timestamp_column])
+
+        tickers[row[symbol_column]] = ticker
+
+    if tickers is not None:
+        yield fetch_id, tickers
+
+
+class IndexedTickersCsv(object):
+    """
+    Lazily streamed offline tickers from the tickers csv file (fetch_id, timestamp, symbol, ask, bid, askVolume,
+    bidVolume - as saved by examples/tickers_to_csv.py). Could be used by ccxtExchangeWrapper instead of the tickers
+    loaded into memory by load_tickers_from_csv (see set_offline_mode), so the replay of large recordings starts
+    instantly and uses the constant memory.
+
+    Rows of every fetch_id should be consecutive and fetch_ids should increase through the file.
+
+    The object has the read only dict interface {fetch_id: {symbol: ticker}} of loaded tickers. Tickers are read on
+    demand: the groups requested sequentially are streamed by the generator (see iter_tickers) and the last
+    cache_size groups are kept in memory. Request of other fetch_id seeks to it's position in the file via the offset
+    index.
+
+    The offset index (fetch_id and file offset of every group) is saved to the sidecar file <csv file>.idx on the
+    first use and rebuilt if the csv file was changed.
+
+    Usage:
+        exchange.set_offline_mode("markets.json", "tickers.csv", stream_tickers=True)
+        # or
+        tickers = IndexedTickersCsv("tickers.csv")
+        for fetch_id, fetch_tickers in tickers.iter_tickers(start_fetch_id=1000):
+            ...
+    """
+
+    INDEX_SUFFIX = ".idx"
+    INDEX_VERSION = 1
+
+    def __init__(self, csv_file: str, index_file: str = None, cache_size: int = 16):
+        """
+        :param csv_file: path to the tickers csv file
+        :param index_file: path to the offset index file. If not set - csv_file + INDEX_SUFFIX
+        :param cache_size: number of the last read fetches kept in memory
+        """
+        self.csv_file = csv_file
+        self.index_file = index_file if index_file is not None else csv_file + self.INDEX_SUFFIX
+        self.cache_size = cache_size
+
+        self.header = list()
+        self.fetch_ids = array.array("q")  # fetch_ids of groups in the order of the file
+        self.offsets = array.array("q")  # offsets of the groups first rows in the file
+
+        self._cache = collections.OrderedDict()
+        self._reader = None  # generator of groups started from _reader_position
+        self._reader_position = None
+
+        self._load_index()
+
+    def _csv_signature(self) -> dict:
+        stat = os.stat(self.csv_file)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def _load_index(self):
+        signature = self._csv_signature()
+
+        if os.path.exists(self.index_file):
+            with open(self.index_file, "rb") as f:
+                try:
+                    meta = json.loads(f.readline())
+                except ValueError:
+                    meta = None
+
+                if meta is not None and meta.get("version") == self.INDEX_VERSION and meta.get("csv") == signature:
+                    self.header = meta["header"]
+                    self.fetch_ids.fromfile(f, meta["count"])
+                    self.offsets.fromfile(f, meta["count"])
+                    return
+
+        self.build_index()
+        self._save_index(signature)
+
+    def build_index(self):
+        """
+        scans the csv file and collects the offsets of fetch_id groups. Only the fetch_id of rows is parsed.
+        """
+        fetch_ids = array.array("q")
+        offsets = array.array("q")
+
+        with open(self.csv_file, "rb") as f:
+            header_line = f.readline()
+            self.header = next(csv.reader([header_line.decode("utf-8")]), list())
+            fetch_id_column = self.header.index("fetch_id")
+
+            offset = len(header_line)
+            last_fetch_id = None
+
+            for line in f:
+                if line.strip():
+                    fetch_id = int(line.split(b",", fetch_id_column + 1)[fetch_id_column])
+
+                    if fetch_id != last_fetch_id:
+                        if last_fetch_id is not None and fetch_id < last_fetch_id:
+                            raise ValueError("Tickers file {} is not ordered by fetch_id: {} after {}".format(
+                                self.csv_file, fetch_id, last_fetch_id))
+
+                        fetch_ids.append(fetch_id)
+                        offsets.append(offset)
+                        last_fetch_id = fetch_id
+
+                offset += len(line)
+
+        self.fetch_ids = fetch_ids
+        self.offsets = offsets
+        self._cache.clear()
+        self._reader = None
+
+    def _save_index(self, signature: dict):
+        meta = {"version": self.INDEX_VERSION, "csv": signature, "header": self.header, "count": len(self.fetch_ids)}
+        tmp_path = self.index_file + ".tmp"
+
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(json.dumps(meta).encode("utf-8") + b"\n")
+                self.fetch_ids.tofile(f)
+                self.offsets.tofile(f)
+
+            os.replace(tmp_path, self.index_file)
+
+        except OSError:
+            # read only location: the index is kept in memory only
+            pass
+
+    def _position(self, fetch_id: int) -> int:
+        position = bisect.bisect_left(self.fetch_ids, fetch_id)
+        if position == len(self.fetch_ids) or self.fetch_ids[position] != fetch_id:
+            raise KeyError(fetch_id)
+        return position
+
+    def iter_tickers(self, start_fetch_id: int = None):
+        """
+        generator of (fetch_id, {symbol: ticker}) from the start_fetch_id (or from the beginning of the file)
+        """
+        if len(self.fetch_ids) == 0:
+            return
+
+        position = self._position(start_fetch_id) if start_fetch_id is not None else 0
+
+        with open(self.csv_file, "rb") as f:
+            f.seek(self.offsets[position])
+            yield from iter_tickers_csv(io.TextIOWrapper(f, encoding="utf-8", newline=""), self.header)
+
+    def __getitem__(self, fetch_id: int) -> dict:
+        tickers = self._cache.get(fetch_id)
+        if tickers is not None:
+            self._cache.move_to_end(fetch_id)
+            return tickers
+
+        position = self._position(fetch_id)
+
+        if self._reader is None or self._reader_position != position:
+            self._reader = self.iter_tickers(fetch_id)
+
+        _, tickers = next(self._reader)
+        self._reader_position = position + 1
+
+        self._cache[fetch_id] = tickers
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return tickers
+
+    def get(self, fetch_id: int, default=None):
+        try:
+            return self[fetch_id]
+        except KeyError:
+            return default
+
+    def __contains__(self, fetch_id) -> bool:
+        try:
+            self._position(fetch_id)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self.fetch_ids)
+
+    def __iter__(self):
+        return iter(self.fetch_ids)
+
+    def keys(self):
+        return list(self.fetch_ids)
+
+    def close(self):
+        """
+        closes the file of the current reader
+        """
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+            self._reader_position = None
@@ -1,43 +1,54 @@
 from datetime import datetime
-import time
 import collections
+from .clock import get_clock
 
 class Timer:
 
-    def __init__(self):
-        self.start_time = datetime.now()
+    def __init__(self, clock=None):
+        """
+        :param clock: Clock for the notches and pauses. If None - the process wide clock (see ztom.clock.get_clock)
+        """
+        self.clock = clock
+        self.start_time = self._now()
         self.notches = []
 
         self.bucket_size = 0
         self.tokens = 0
         self.bucket_seconds = 0
 
-        self.now = datetime.now()
+        self.now = self._now()
         self.request_time = self.now
         self.timestamp_before_request = datetime(1, 1, 1, 1, 1, 0)
 
         self.max_requests_per_lap = int
         self.lap_time = int
 
+    def _get_clock(self):
+        return self.clock if self.clock is not None else get_clock()
+
+    def _now(self) -> datetime:
+        return self._get_clock().now()
 
     def notch(self, name):
         last = self.start_time if len(self.notches) == 0 else self.notches[-1]['time']
+        now = self._now()
         self.notches.append({
             'name': name,
-            'time': datetime.now(),
-            'duration': (datetime.now() - last).total_seconds()
+            'time': now,
+            'duration': (now - last).total_seconds()
         })
 
     def check_timer(self):
 
-        self.now = datetime.now()
+        self.now = self._now()
         self.request_time = (self.now - self.timestamp_before_request).total_seconds()
         self.timestamp_before_request = self.now
 
-        if 1 / self.request_time > self.max_requests_per_lap / self.lap_time:
+        # same as 1 / request_time > max_requests_per_lap / lap_time, but zero interval (virtual clock) is a pause too
+        if self.request_time * self.max_requests_per_lap < self.lap_time:
             print("Pause for:", self.lap_time / self.max_requests_per_lap - self.request_time)
-            time.sleep(self.lap_time / self.max_requests_per_lap - self.request_time)
-            self.timestamp_before_request = datetime.now()
+            self._get_clock().sleep(self.lap_time / self.max_requests_per_lap - self.request_time)
+            self.timestamp_before_request = self._now()
 
 
     # TODO change to use map
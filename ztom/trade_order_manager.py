@@ -1,7 +1,7 @@
 from ztom import TradeOrder
 from ztom.exchange_wrapper import ccxtExchangeWrapper
+from ztom.retry import RetryPolicy
 from datetime import datetime
-import time
 
 class OrderManagerError(Exception):
     pass
@@ -36,7 +36,7 @@ class OrderManagerFok(object):
     LOG_CRITICAL = "CRITICAL"
 
     def __init__(self, order: TradeOrder, limits=None, updates_to_kill=100, max_cancel_attempts=10,
-                 max_order_update_attempts=1, request_sleep=0.0):
+                 max_order_update_attempts=1, request_sleep=0.0, retry_policy: RetryPolicy = None):
         """
         Creates single order FOK order manager.
         :param order:
@@ -45,6 +45,8 @@ class OrderManagerFok(object):
         :param max_cancel_attempts:
         :param max_order_update_attempts:
         :param request_sleep:
+        :param retry_policy: RetryPolicy for placing and updating the order. If not set - requests are retried
+        max_order_update_attempts times with request_sleep pause
         :param cancel_threshold: cancel current trade order (when the other conditions are met) only if the remained
          amount to fill is greater than this threshold. This is for avoiding the situation of creating new order for
         less than minimun amount. Usually should be minimum order amount for the order's pair + commission (if applied).
@@ -60,6 +62,7 @@ class OrderManagerFok(object):
         self.max_cancel_attempts = max_cancel_attempts
         self.max_order_requests_attempts = max_order_update_attempts
         self.request_sleep = request_sleep
+        self.retry_policy = retry_policy
         # self.cancel_threshold = cancel_threshold
 
         self.order_update_requests = 0
@@ -145,40 +148,28 @@ class OrderManagerFok(object):
         self.last_response = response
         return response
 
-    def _create_order(self, exchange_wrapper: ccxtExchangeWrapper):
+    def _get_retry_policy(self) -> RetryPolicy:
+        if self.retry_policy is not None:
+            return self.retry_policy
+        return RetryPolicy.fixed(self.max_order_requests_attempts, self.request_sleep)
 
-        results = None
-        i = 0
-        while bool(results) is not True and i < self.max_order_requests_attempts:
-            self.log(self.LOG_INFO, ".. placing order #{}/{}".format(i, self.max_order_requests_attempts))
-            try:
-                results = exchange_wrapper.place_limit_order(self.order)
-            except Exception as e:
-                self.log(self.LOG_ERROR, type(e).__name__)
-                self.log(self.LOG_ERROR, e.args)
-                self.log(self.LOG_INFO, "retrying to place order... after sleep for {}s".format(self.request_sleep))
-                time.sleep(self.request_sleep)
-                self.log(self.LOG_INFO, "sleep done")
-            i += 1
+    def _on_request_error(self, e: Exception, attempt: int):
+        self.log(self.LOG_ERROR, type(e).__name__)
+        self.log(self.LOG_ERROR, e.args)
 
-        return results
+    def _on_request_retry(self, e: Exception, attempt: int, delay: float):
+        self.log(self.LOG_INFO, "retrying attempt #{}/{} after sleep for {}s".format(
+            attempt + 1, self._get_retry_policy().max_attempts, delay))
 
-    def _update_order(self, exchange_wrapper: ccxtExchangeWrapper):
-        results = None
-        i = 0
-        while bool(results) is not True and i < self.max_order_requests_attempts:
-            self.log(self.LOG_INFO, ".. getting update attempt #{}/{}".format(i, self.max_order_requests_attempts))
-            try:
-                results = exchange_wrapper.get_order_update(self.order)
-            except Exception as e:
-                self.log(self.LOG_ERROR, type(e).__name__)
-                self.log(self.LOG_ERROR, e.args)
-                self.log(self.LOG_INFO, "retrying to get order UPDATE... after sleep for {}s".format(self.request_sleep))
-                time.sleep(self.request_sleep)
-                self.log(self.LOG_INFO, "sleep done")
-            i += 1
+    def _create_order(self, exchange_wrapper: ccxtExchangeWrapper):
+        self.log(self.LOG_INFO, ".. placing order")
+        return self._get_retry_policy().run(lambda: exchange_wrapper.place_limit_order(self.order),
+                                            on_error=self._on_request_error, before_retry=self._on_request_retry)
 
-        return results
+    def _update_order(self, exchange_wrapper: ccxtExchangeWrapper):
+        self.log(self.LOG_INFO, ".. getting update")
+        return self._get_retry_policy().run(lambda: exchange_wrapper.get_order_update(self.order),
+                                            on_error=self._on_request_error, before_retry=self._on_request_retry)
 
     def _cancel_order(self, exchange_wrapper: ccxtExchangeWrapper):
         exchange_wrapper.cancel_order(self.order)
@@ -224,8 +215,10 @@ class OrderManagerFok(object):
                 self.log(self.LOG_ERROR, "Cancel error...")
                 self.log(self.LOG_ERROR, type(e).__name__)
                 self.log(self.LOG_ERROR, e.args)
-                self.log(self.LOG_INFO, "Pause for {}s".format(self.request_sleep))
-                time.sleep(self.request_sleep)
+                policy = self._get_retry_policy()
+                delay = policy.delay(cancel_attempt)
+                self.log(self.LOG_INFO, "Pause for {}s".format(delay))
+                policy.sleep(delay)
 
             finally:
                 self.log(self.LOG_INFO, "Updating the Trade Order to check if it was canceled or closed...")
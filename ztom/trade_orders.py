@@ -1,4 +1,5 @@
 from .orderbook import OrderBook
+from .change_tracking import ChangeTracking
 from ztom import core
 from datetime import datetime
 import pytz
@@ -23,7 +24,7 @@ class OrderErrorSideNotFound(OrderError):
     pass
 
 
-class TradeOrder(object):
+class TradeOrder(ChangeTracking):
     # todo create wrapper constructor for fake/real orders with any starting asset
     # different wrapper constructors for amount of available asset
     # so developer have not to implement the bid calculation
@@ -39,6 +40,10 @@ class TradeOrder(object):
                                     "remaining", "cost", "price", "info", "trades", "fee", "fees", "timestamp_open",
                                     "timestamp_closed"]
 
+    # fields with tracked changes (see ChangeTracking)
+    TRACKED_FIELDS = ("id", "status", "amount", "price", "filled", "remaining", "cost", "filled_start_amount",
+                      "filled_dest_amount")
+
     def __init__(self, type: str, symbol, amount, side, price=None, precision_amount=None, precision_price=None):
 
         self.id = str()  # order id from exchange
@@ -186,7 +191,7 @@ class TradeOrder(object):
     def report(self):
 
         report = dict((key, value) for key, value in self.__dict__.items()
-                      if not callable(value) and not key.startswith('__'))
+                      if not callable(value) and not key.startswith('__') and key not in self.UNTRACKED_FIELDS)
 
         return report
 
@@ -1,3 +1,4 @@
+import asyncio
 import os
 from typing import List
 
@@ -80,3 +81,19 @@ def dict_value_from_path(src_dict: dict, path: List[str], case_sensitive: bool =
 
     return s
 
+
+def event_loop():
+    """
+    returns the current asyncio event loop or sets the new one if there is no current loop or it was closed (for example
+    by asyncio.run())
+    """
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = None
+
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    return loop